@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Build a JSON catalog of every EA from its source.
+
+For each .mq4/.mq5 the catalog records the header banner (STRATEGY, LOGIC,
+TIMEFRAME, PAIRS and any other sections), the LICENSE_* defines,
+#property values and the full input list with type, default, comment,
+group and enum options. Per EA code it records the product details
+(name, version, description, number, category and the source of each
+dialect) that prisma/seed.ts, /api/eas and the download route read
+through src/lib/ea-catalog.ts. Product names and descriptions come from
+mql/products.json; EAs missing there fall back to the file name and the
+header banner.
+
+mql/catalog.json is committed so a deployed app can load it; rebuild it
+after changing an EA. Updates are incremental: files whose size and mtime
+(kept in the untracked .catalog_stat.json) are unchanged are taken from
+the existing catalog, files whose content hash is unchanged are reused
+as is, and the rest are parsed in parallel. Inputs are read with the
+EALicense includes expanded, so changing an include re-parses every file.
+
+Usage:
+    python3 scripts/build_ea_catalog.py [--output mql/catalog.json] [--force] [--jobs N]
+    python3 scripts/build_ea_catalog.py --show stochastic_scalper_ea
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import mql_source
+
+CATALOG_VERSION = 2
+DEFAULT_OUTPUT = os.path.join(mql_source.REPO_ROOT, "mql", "catalog.json")
+STAT_CACHE_PATH = os.path.join(mql_source.REPO_ROOT, ".catalog_stat.json")
+PRODUCTS_PATH = os.path.join(mql_source.REPO_ROOT, "mql", "products.json")
+
+# Product number ranges (the NN_ file prefix) -> downloads page category; anything else is "basic"
+CATEGORIES = [(1, 10, 'basic'), (11, 20, 'advanced'), (21, 30, 'martingale'), (31, 40, 'utility')]
+
+# Header fields promoted to top-level keys of each entry
+HEADER_FIELDS = ['STRATEGY', 'LOGIC', 'TIMEFRAME', 'PAIRS']
+
+BANNER_LINE_PATTERN = re.compile(r'^//\|(?P<text>.*?)\|?\s*$')
+SECTION_PATTERN = re.compile(r'^(?P<key>[A-Z][A-Z ]*[A-Z]):(?:\s+(?P<value>.*))?$')
+DEFINE_PATTERN = re.compile(r'^[ \t]*#define[ \t]+(?P<name>\w+)[ \t]+(?P<value>.+?)[ \t]*$', re.MULTILINE)
+PROPERTY_PATTERN = re.compile(r'^[ \t]*#property[ \t]+(?P<name>\w+)(?:[ \t]+(?P<value>.+?))?[ \t]*$', re.MULTILINE)
+ENUM_PATTERN = re.compile(r'\benum\s+(?P<name>\w+)\s*\{(?P<body>[^}]*)\}')
+INPUT_PATTERN = re.compile(
+    r'^\s*(?P<kind>s?input)\s+(?P<type>\w+)\s+(?P<name>\w+)\s*'
+    r'(?:=\s*(?P<default>(?:"(?:[^"\\]|\\.)*"|[^;"])*?))?\s*;\s*(?://\s*(?P<comment>.*?))?\s*$'
+)
+NUMBER_PREFIX_PATTERN = re.compile(r'^(?P<number>\d+)_')
+GROUP_PATTERN = re.compile(r'^\s*//-{2,}\s*(?P<name>.*?)\s*-*\s*$')
+
+
+def parse_header(content):
+    """Parse the //| banner at the top of the file into {SECTION: text}"""
+    sections = {}
+    current = None
+    block = False
+    for line in content.split('\n'):
+        if not line.startswith('//'):
+            break
+        match = BANNER_LINE_PATTERN.match(line.rstrip())
+        if not match:
+            continue
+        text = match.group('text').strip()
+        if not text:
+            current = None  # blank banner line closes the section
+            continue
+        section = SECTION_PATTERN.match(text)
+        if section and not (block and current):
+            current = section.group('key')
+            block = not section.group('value')
+            sections[current] = section.group('value') or ''
+        elif current:
+            sections[current] = f"{sections[current]}\n{text}" if sections[current] else text
+    return sections
+
+
+def parse_value(raw, value_type=None):
+    """Convert an MQL literal to a JSON value; identifiers (enum values, colors) stay strings"""
+    if raw is None:
+        return None
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        return raw[1:-1]
+    if raw in ('true', 'false'):
+        return raw == 'true'
+    try:
+        if value_type in ('double', 'float') or re.search(r'[.eE]', raw):
+            return float(raw)
+        return int(raw, 0)
+    except ValueError:
+        return raw
+
+
+def parse_inputs(content, enums):
+    inputs = []
+    group = None
+    for line in content.split('\n'):
+        group_match = GROUP_PATTERN.match(line)
+        if group_match and group_match.group('name'):
+            group = group_match.group('name')
+            continue
+        match = INPUT_PATTERN.match(line)
+        if not match:
+            continue
+        entry = {
+            'name': match.group('name'),
+            'type': match.group('type'),
+            'default': parse_value(match.group('default'), match.group('type')),
+            'comment': match.group('comment') or None,
+            'group': group,
+        }
+        if match.group('kind') == 'sinput':
+            entry['static'] = True
+        if match.group('type') in enums:
+            entry['options'] = enums[match.group('type')]
+        inputs.append(entry)
+    return inputs
+
+
+def display_name(filepath):
+    """01_MA_Crossover_EA.mq5 -> MA Crossover EA"""
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return re.sub(r'^\d+_', '', stem).replace('_', ' ')
+
+
+def parse_ea(filepath, content):
+    """
+    Return the catalog entry for one EA source. Inputs and enums are read
+    with the EALicense includes expanded, where find_duplicate_blocks.py
+    --extract moves shared input groups; the banner, defines and
+    #property values are the file's own.
+    """
+    dialect = mql_source.dialect_of(filepath)
+    masked = mql_source.code_mask(content, blank_strings=False)
+    defines = {m.group('name'): parse_value(m.group('value')) for m in DEFINE_PATTERN.finditer(masked)}
+    properties = {m.group('name'): parse_value(m.group('value')) if m.group('value') else True
+                  for m in PROPERTY_PATTERN.finditer(masked)}
+    expanded = mql_source.with_shared_includes(content, dialect)
+    enums = {m.group('name'): [value.split('=')[0].strip() for value in m.group('body').split(',') if value.strip()]
+             for m in ENUM_PATTERN.finditer(mql_source.code_mask(expanded, blank_strings=False))}
+    sections = parse_header(content)
+
+    entry = {
+        'eaCode': defines.get('LICENSE_EA_CODE'),
+        'version': defines.get('LICENSE_EA_VERSION'),
+        'name': display_name(filepath),
+        'file': os.path.relpath(filepath, mql_source.REPO_ROOT),
+        'dialect': dialect,
+    }
+    for field in HEADER_FIELDS:
+        entry[field.lower()] = sections.get(field)
+    entry['sections'] = {key: value for key, value in sections.items() if key not in HEADER_FIELDS}
+    entry['properties'] = properties
+    entry['defines'] = defines
+    entry['inputs'] = parse_inputs(expanded, enums)
+    return entry
+
+
+def index_file(filepath):
+    """Worker: read, hash and parse one file"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    return filepath, digest, parse_ea(filepath, data.decode('utf-8', errors='ignore'))
+
+
+def read_catalog(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_catalog(path, includes=None):
+    """{file: entry} of an existing catalog; empty if it was built against other includes"""
+    catalog = read_catalog(path)
+    if catalog.get('catalogVersion') != CATALOG_VERSION:
+        return {}
+    if includes is not None and catalog.get('includesHash') != includes:
+        return {}
+    return {entry['file']: entry for entry in catalog.get('files', [])}
+
+
+def ea_number(filepath):
+    """01_MA_Crossover_EA.mq5 -> 1; templates and helper EAs without a prefix -> None"""
+    match = NUMBER_PREFIX_PATTERN.match(os.path.basename(filepath))
+    return int(match.group('number')) if match else None
+
+
+def category_of(number):
+    for low, high, category in CATEGORIES:
+        if low <= number <= high:
+            return category
+    return 'basic'
+
+
+def describe(entry):
+    """One-paragraph description from the DESCRIPTION section, or STRATEGY and LOGIC"""
+    text = entry['sections'].get('DESCRIPTION')
+    if not text:
+        text = '. '.join(part.rstrip('.') for part in (entry['strategy'], entry['logic']) if part)
+        text = f"{text}." if text else None
+    if text and entry['timeframe']:
+        text = f"{text} Timeframe: {entry['timeframe']}."
+    return ' '.join(text.split()) if text else None
+
+
+def load_products(path=PRODUCTS_PATH):
+    """eaCode -> {name, description} as customers see them"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def summarize_eas(files, products):
+    """eaCode -> product details, preferring the MQL5 entry for shared fields"""
+    eas = {}
+    for entry in sorted(files, key=lambda entry: entry['dialect'] != 'mql5'):
+        code = entry['eaCode']
+        if not code:
+            continue
+        if code not in eas:
+            number = ea_number(entry['file'])
+            product = products.get(code, {})
+            eas[code] = {
+                'name': product.get('name') or entry['name'],
+                'version': entry['version'],
+                'description': product.get('description') or describe(entry),
+                'number': number,
+                'category': category_of(number) if number is not None else None,
+                'files': {},
+            }
+        eas[code]['files'][entry['dialect']] = entry['file']
+    return {code: eas[code] for code in sorted(eas)}
+
+
+def load_stats(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_stats(path, stats):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def includes_hash():
+    """Fingerprint of the EALicense includes: inputs can live there, so changing one re-parses every EA"""
+    digest = hashlib.sha256()
+    for path in mql_source.shared_include_files():
+        digest.update(os.path.relpath(path, mql_source.REPO_ROOT).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def file_hash(filepath):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_catalog(output, force=False, jobs=None, stat_path=STAT_CACHE_PATH):
+    includes = includes_hash()
+    previous = {} if force else load_catalog(output, includes)
+    stats = {} if force else load_stats(stat_path)
+    sources = mql_source.list_sources('mql5') + mql_source.list_sources('mql4')
+
+    entries = {}
+    new_stats = {}
+    to_parse = []
+    reused = rehashed = 0
+    for path in sources:
+        rel = os.path.relpath(path, mql_source.REPO_ROOT)
+        stat = os.stat(path)
+        old = previous.get(rel)
+        known = stats.get(rel)
+        if old and known == [stat.st_size, stat.st_mtime_ns, old['sha256']]:
+            entries[rel] = old
+            reused += 1
+        elif old and old['size'] == stat.st_size and old['sha256'] == file_hash(path):
+            entries[rel] = old
+            rehashed += 1
+        else:
+            to_parse.append(path)
+            continue
+        new_stats[rel] = [stat.st_size, stat.st_mtime_ns, old['sha256']]
+
+    if to_parse:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for path, digest, entry in pool.map(index_file, to_parse, chunksize=4):
+                stat = os.stat(path)
+                entry.update(sha256=digest, size=stat.st_size)
+                entries[entry['file']] = entry
+                new_stats[entry['file']] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    files = [entries[key] for key in sorted(entries)]
+    catalog = {'catalogVersion': CATALOG_VERSION, 'includesHash': includes,
+               'eas': summarize_eas(files, load_products()), 'files': files}
+    # Editing mql/products.json changes only the product details
+    changed = bool(to_parse) or set(previous) != set(entries) or catalog['eas'] != read_catalog(output).get('eas')
+    if changed:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        tmp_path = f"{output}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Committed to the repo: stable key order and one value per line keep diffs reviewable
+            json.dump(catalog, f, indent=1, ensure_ascii=False)
+            f.write('\n')
+        os.replace(tmp_path, output)
+    if new_stats != stats:
+        save_stats(stat_path, new_stats)
+
+    print(f"Catalog: {len(files)} files, {len(catalog['eas'])} EA codes "
+          f"({len(to_parse)} parsed, {rehashed} rehashed, {reused} unchanged)"
+          f"{'' if changed else ' - up to date'}")
+    return catalog
+
+
+def show(output, ea_code):
+    """Print the catalog entries of one EA code"""
+    entries = load_catalog(output)
+    matches = [entry for entry in entries.values() if entry['eaCode'] == ea_code]
+    if not matches:
+        print(f"No EA with code {ea_code} in {output}")
+        return
+    print(json.dumps(matches, indent=2, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a JSON catalog of EA metadata and inputs")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Catalog path (default: mql/catalog.json)")
+    parser.add_argument("--force", action="store_true", help="Re-parse every file")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--show", metavar="EA_CODE", help="Print the catalog entries for an EA code")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.output, args.show)
+        return
+    build_catalog(args.output, args.force, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
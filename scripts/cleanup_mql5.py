@@ -8,13 +8,8 @@ import re
 
 MQL5_EXPERTS_DIR = "/Users/nut/Downloads/ea-license-system/mql/MQL5/Experts"
 
-def cleanup_file(filepath):
-    """Clean up remnant license code from a file"""
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original_content = content
+def cleanup_content(content):
+    """Return content with remnant license code removed"""
     
     # Remove CLicenseValidator* g_license; line
     content = re.sub(r'CLicenseValidator\*?\s+g_license\s*;\s*\n', '', content)
@@ -55,6 +50,16 @@ def cleanup_file(filepath):
     # Clean up excessive empty lines
     content = re.sub(r'\n{3,}', '\n\n', content)
     
+    return content
+
+def cleanup_file(filepath):
+    """Clean up remnant license code from a file"""
+    
+    with open(filepath, 'r', encoding='utf-8') as f:
+        original_content = f.read()
+    
+    content = cleanup_content(original_content)
+    
     if content != original_content:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Python tools in scripts/.
+
+Subcommands map to the existing scripts, which are only imported when
+their command runs, so `cli.py lint` never loads numpy or the transform
+templates. Modules stay loaded for the life of the process, together with
+their compiled patterns (module-level re.compile constants and re's own
+cache for the transforms' inline patterns), which is what batch and serve
+are for:
+
+  batch   reads one job per line on stdin and answers one JSON line per
+          job on stdout; a build system keeps the pipe open and sends it
+          hundreds of jobs
+  serve   the same protocol on a Unix socket, one connection at a time
+  call    sends one job to a running serve and exits with its status
+  startup measures cold start of every command in fresh interpreters and
+          appends the timings to .startup_times.jsonl
+
+A job is a JSON argv list (["transform", "mql/MQL5/Experts/05_Stochastic_Scalper_EA.mq5"])
+or an object {"id": ..., "argv": [...]}. The reply is
+{"id", "exit", "stdout", "stderr", "ms"}.
+
+Usage:
+    python3 scripts/cli.py COMMAND [ARGS...]
+    python3 scripts/cli.py transform [--dry-run] [--verify] FILE [FILE ...]
+    python3 scripts/cli.py batch < jobs.jsonl
+    python3 scripts/cli.py serve --socket /tmp/ea-tools.sock
+    python3 scripts/cli.py call --socket /tmp/ea-tools.sock lint mql/MQL5/Experts/05_Stochastic_Scalper_EA.mq5
+    python3 scripts/cli.py startup [--repeat 5]
+"""
+
+import importlib
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+STARTUP_LOG = os.path.join(REPO_ROOT, ".startup_times.jsonl")
+
+# Subcommand -> (module, summary). Each module exposes main() and parses sys.argv itself.
+COMMANDS = {
+    'pipeline': ('run_pipeline', "Run all MQL transforms in a single pass per file"),
+    'compile': ('compile_eas', "Compile EAs in parallel with a content-addressed cache"),
+    'catalog': ('build_ea_catalog', "Build a JSON catalog of EA metadata and inputs"),
+    'lint': ('lint_eas', "Check EA sources for pipeline invariants"),
+    'verify': ('verify_transforms', "Check that MQL transforms only change managed blocks"),
+    'duplicates': ('find_duplicate_blocks', "Report duplicated code blocks across EAs"),
+    'import-trades': ('import_trade_journal', "Bulk import Trade Journal EA CSV files"),
+    'analytics': ('validation_log_analytics', "Columnar ValidationLog export and analytics"),
+    'risk': ('martingale_risk', "Monte Carlo ruin analysis for martingale EAs"),
+    'market-data': ('market_data', "Memory-mapped OHLC/tick store"),
+    'indicators': ('indicators', "Streaming MetaTrader indicators"),
+    'license': ('license_client', "Validate EA licenses against /api/validate"),
+    'package': ('package_downloads', "Build per-customer EA download bundles"),
+}
+
+# Built into this file; summaries only, the handlers are defined below
+BUILTIN_SUMMARIES = {
+    'transform': "Run the transform chain on individual files",
+    'batch': "Run JSON-line jobs from stdin in this process",
+    'serve': "Run JSON-line jobs from a Unix socket",
+    'call': "Send one job to a running serve",
+    'startup': "Measure and record cold-start time of every command",
+}
+
+
+def usage():
+    width = max(map(len, list(COMMANDS) + list(BUILTIN_SUMMARIES)))
+    lines = ["usage: cli.py COMMAND [ARGS...]", "", "commands:"]
+    for name, (module, summary) in COMMANDS.items():
+        lines.append(f"  {name:<{width}}  {summary}")
+    lines.append("")
+    for name, summary in BUILTIN_SUMMARIES.items():
+        lines.append(f"  {name:<{width}}  {summary}")
+    return '\n'.join(lines)
+
+
+def exit_code(code):
+    """Normalize a main() return value or SystemExit code the way the interpreter does"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def dispatch(argv):
+    """Run one command in this process and return its exit status"""
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    name, args = argv[0], argv[1:]
+    if name in BUILTINS:
+        handler = BUILTINS[name]
+    elif name in COMMANDS:
+        handler = importlib.import_module(COMMANDS[name][0]).main
+    else:
+        print(f"cli.py: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    saved_argv = sys.argv
+    sys.argv = [f"cli.py {name}", *args]
+    try:
+        return exit_code(handler())
+    except SystemExit as e:
+        return exit_code(e.code)
+    finally:
+        sys.argv = saved_argv
+
+
+#=============================================================================
+# Built-in commands
+#=============================================================================
+def transform():
+    """Per-file version of `pipeline`, for build systems that schedule one job per file"""
+    import argparse
+    import run_pipeline
+    import verify_transforms
+
+    parser = argparse.ArgumentParser(description=BUILTIN_SUMMARIES['transform'])
+    parser.add_argument("files", nargs="+", help=".mq4/.mq5/.mqh files")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing files")
+    parser.add_argument("--verify", action="store_true",
+                        help="Don't write files whose changes reach outside the managed blocks")
+    args = parser.parse_args()
+
+    verifier = verify_transforms.Verifier() if args.verify else None
+
+    errors = 0
+    for filepath in args.files:
+        chain = run_pipeline.select_chain(os.path.abspath(filepath))
+        if chain is None:
+            print(f"SKIPPED: {filepath} (not part of the pipeline)")
+            continue
+        try:
+            changes = run_pipeline.process_file(filepath, chain, args.dry_run, verifier)
+        except Exception as e:
+            print(f"ERROR: {filepath}: {str(e)}")
+            errors += 1
+            continue
+        if not changes:
+            print(f"UNCHANGED: {filepath}")
+            continue
+        print(f"{'WOULD UPDATE' if args.dry_run else 'UPDATED'}: {filepath}")
+        for name, added, removed, notes in changes:
+            print(f"  [{name}] +{added} -{removed} lines")
+    if verifier is not None:
+        verifier.save()
+    return 1 if errors else 0
+
+
+def run_job(line):
+    """Parse and run one JSON job line, returning the JSON reply line"""
+    import contextlib
+    import io
+    import json
+
+    job_id = None
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    started = time.perf_counter()
+    try:
+        job = json.loads(line)
+        if isinstance(job, dict):
+            job_id, argv = job.get('id'), job.get('argv')
+        else:
+            argv = job
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv) or not argv:
+            raise ValueError("job must be a non-empty argv list or {\"argv\": [...]}")
+        if argv[0] in ('batch', 'serve'):
+            raise ValueError(f"{argv[0]} cannot be run as a job")
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = dispatch(argv)
+    except ValueError as e:
+        stderr.write(f"invalid job: {e}\n")
+        code = 2
+    except Exception as e:
+        stderr.write(f"{type(e).__name__}: {e}\n")
+        code = 1
+    return json.dumps({
+        'id': job_id,
+        'exit': code,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+def batch():
+    for line in sys.stdin:
+        if line.strip():
+            sys.stdout.write(run_job(line) + '\n')
+            sys.stdout.flush()
+    return 0
+
+
+def serve():
+    import argparse
+    import socketserver
+
+    parser = argparse.ArgumentParser(description=BUILTIN_SUMMARIES['serve'])
+    parser.add_argument("--socket", required=True, help="Unix socket path")
+    args = parser.parse_args()
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode('utf-8', errors='replace')
+                if line.strip():
+                    self.wfile.write((run_job(line) + '\n').encode('utf-8'))
+                    self.wfile.flush()
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    # Jobs redirect the process-wide stdout, so connections are served one at a time
+    with socketserver.UnixStreamServer(args.socket, JobHandler) as server:
+        print(f"Serving on {args.socket}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(args.socket)
+    return 0
+
+
+def call():
+    import json
+    import socket
+
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] != '--socket':
+        print("usage: cli.py call --socket PATH COMMAND [ARGS...]", file=sys.stderr)
+        return 2
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(args[1])
+        client.sendall((json.dumps(args[2:]) + '\n').encode('utf-8'))
+        reply = json.loads(client.makefile('rb').readline())
+    sys.stdout.write(reply['stdout'])
+    sys.stderr.write(reply['stderr'])
+    return reply['exit']
+
+
+def startup():
+    import argparse
+    import json
+    import subprocess
+
+    parser = argparse.ArgumentParser(description=BUILTIN_SUMMARIES['startup'])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is kept (default: 5)")
+    parser.add_argument("--no-record", action="store_true", help="Don't append to .startup_times.jsonl")
+    args = parser.parse_args()
+
+    def fastest(command):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_ROOT)
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 1)
+
+    cli = os.path.abspath(__file__)
+    timings = {'python': fastest([sys.executable, '-c', 'pass']), 'cli': fastest([sys.executable, cli, '--help'])}
+    for name, (module, summary) in COMMANDS.items():
+        # Importing the module and building its parser is the fixed cost of every invocation
+        timings[name] = fastest([sys.executable, cli, name, '--help'])
+
+    previous = None
+    if os.path.exists(STARTUP_LOG):
+        with open(STARTUP_LOG, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        if lines:
+            previous = json.loads(lines[-1])['timings']
+
+    print(f"{'command':<14} {'ms':>8} {'change':>8}")
+    for name, ms in timings.items():
+        change = f"{ms - previous[name]:+.1f}" if previous and name in previous else ''
+        print(f"{name:<14} {ms:>8.1f} {change:>8}")
+
+    if not args.no_record:
+        try:
+            revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                      cwd=REPO_ROOT).stdout.strip() or None
+        except OSError:
+            revision = None
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'revision': revision,
+                  'python': sys.version.split()[0], 'timings': timings}
+        with open(STARTUP_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+    return 0
+
+
+BUILTINS = {
+    'transform': transform,
+    'batch': batch,
+    'serve': serve,
+    'call': call,
+    'startup': startup,
+}
+
+
+def main():
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    return dispatch(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Parallel, cached compiler for the MQL4/MQL5 Expert Advisors.
+
+Python replacement for scripts/windows/compile_mql*.bat:
+  - Each artifact is keyed on a hash of the source, every resolved #include
+    (EALicense and friends) and the compiler version. Unchanged EAs are
+    restored from the content-addressed cache instead of being recompiled,
+    together with the warnings of the compile that produced them.
+  - Compiles run in parallel on a bounded worker pool.
+  - Compiler logs are parsed into structured results (errors, warnings)
+    instead of only checking whether the .ex4/.ex5 file exists.
+  - The compiler is pluggable: "metaeditor" drives MetaEditor (optionally
+    through wine), "command" runs any command template, and "stub" fakes a
+    compile so the orchestration can be exercised on Linux.
+
+Usage:
+    python3 scripts/compile_eas.py --dialect mql5 --compiler metaeditor \\
+        --metaeditor "C:\\Program Files\\MetaTrader 5\\metaeditor64.exe"
+    python3 scripts/compile_eas.py --dialect mql4 --compiler stub --jobs 8
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, ".compile_cache")
+
+DIALECTS = {
+    'mql5': {
+        'source_ext': '.mq5',
+        'artifact_ext': '.ex5',
+        'source_dir': os.path.join(REPO_ROOT, "mql", "MQL5", "Experts"),
+        'include_dir': os.path.join(REPO_ROOT, "mql", "MQL5", "Include"),
+        'metaeditor': r"C:\Program Files\MetaTrader 5\metaeditor64.exe",
+    },
+    'mql4': {
+        'source_ext': '.mq4',
+        'artifact_ext': '.ex4',
+        'source_dir': os.path.join(REPO_ROOT, "mql", "MQL4", "Experts"),
+        'include_dir': os.path.join(REPO_ROOT, "mql", "MQL4", "Include"),
+        'metaeditor': r"C:\Program Files (x86)\MetaTrader 4\metaeditor.exe",
+    },
+}
+
+INCLUDE_PATTERN = re.compile(r'^\s*#include\s*([<"])([^>"]+)[>"]', re.MULTILINE)
+
+# MetaEditor log lines, e.g.
+#   C:\...\02_RSI_Reversal_EA.mq5(120,7) : error 256: 'foo' - undeclared identifier
+#   Result: 1 errors, 0 warnings, 812 msec elapsed         (MetaEditor 5)
+#   C:\...\02_RSI_Reversal_EA.mq4 : 0 error(s), 0 warning(s) (MetaEditor 4)
+LOG_MESSAGE_PATTERN = re.compile(r'^(?P<file>.*?)\((?P<line>\d+),(?P<column>\d+)\)\s*:\s*(?P<level>error|warning)\s+(?P<code>\d+)\s*:\s*(?P<message>.*)$')
+LOG_RESULT_PATTERN = re.compile(r'(?:^|[\s:])(?P<errors>\d+)\s+errors?(?:\(s\))?,\s*(?P<warnings>\d+)\s+warnings?(?:\(s\))?', re.IGNORECASE)
+
+
+@dataclass
+class CompileMessage:
+    level: str
+    file: str
+    line: int
+    column: int
+    code: int
+    message: str
+
+
+@dataclass
+class CompileResult:
+    source: str
+    status: str  # "cached", "compiled" or "failed"
+    key: str
+    errors: int = 0
+    warnings: int = 0
+    seconds: float = 0.0
+    messages: list = field(default_factory=list)
+
+
+#=============================================================================
+# Compiler backends
+#=============================================================================
+class MetaEditorCompiler:
+    """Drives MetaEditor's command line (/compile /inc /log), optionally via wine"""
+
+    def __init__(self, executable, wine=False):
+        self.executable = executable
+        self.wine = wine
+
+    def version(self):
+        # MetaEditor has no --version switch; the binary itself is the version
+        with open(self.executable, 'rb') as f:
+            return "metaeditor:" + hashlib.sha256(f.read()).hexdigest()
+
+    def windows_path(self, path):
+        """MetaEditor under wine only understands Windows paths; Linux paths live on Z:"""
+        if not self.wine:
+            return path
+        try:
+            converted = subprocess.run(["winepath", "-w", path], capture_output=True, text=True).stdout.strip()
+        except OSError:
+            converted = ""
+        return converted or "Z:" + os.path.abspath(path).replace('/', '\\')
+
+    def compile(self, source, include_dir, output, log_path):
+        command = [self.executable, f'/compile:{self.windows_path(source)}', f'/inc:{self.windows_path(include_dir)}',
+                   f'/log:{self.windows_path(log_path)}']
+        if self.wine:
+            command.insert(0, "wine")
+        started = time.time()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # MetaEditor always writes the artifact next to the source; ignore a stale one
+        built = os.path.splitext(source)[0] + os.path.splitext(output)[1]
+        if os.path.exists(built) and os.path.getmtime(built) >= started - 1:
+            shutil.copyfile(built, output)
+
+
+class CommandCompiler:
+    """Runs a command template with {source}, {include_dir}, {output} and {log} placeholders"""
+
+    def __init__(self, template, version_string=None):
+        self.template = template
+        self.version_string = version_string
+
+    def version(self):
+        return "command:" + (self.version_string or hashlib.sha256(self.template.encode('utf-8')).hexdigest())
+
+    def compile(self, source, include_dir, output, log_path):
+        command = [part.format(source=source, include_dir=include_dir, output=output, log=log_path)
+                   for part in shlex.split(self.template)]
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class StubCompiler:
+    """Fake compiler for Linux: writes a placeholder artifact and a MetaEditor-style log"""
+
+    def version(self):
+        return "stub:1"
+
+    def compile(self, source, include_dir, output, log_path):
+        with open(source, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(f"stub artifact for {os.path.basename(source)} {digest}\n")
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(f"{source} : information: compiling '{os.path.basename(source)}'\n")
+            f.write("Result: 0 errors, 0 warnings, 0 msec elapsed\n")
+
+
+#=============================================================================
+# Cache keys
+#=============================================================================
+def resolve_include(name, quoted, source_dir, include_dir):
+    """Return the path an #include resolves to, or None if it cannot be found"""
+    name = name.replace('\\', '/')
+    candidates = []
+    if quoted:
+        candidates.append(os.path.join(source_dir, name))
+    candidates.append(os.path.join(include_dir, name))
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return os.path.normpath(candidate)
+    return None
+
+
+def compute_key(source, include_dir, compiler_version):
+    """Hash the source, all transitively included files and the compiler version"""
+    digest = hashlib.sha256()
+    digest.update(compiler_version.encode('utf-8'))
+
+    pending = [source]
+    seen = set()
+    while pending:
+        path = pending.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest.update(b'\0' + os.path.basename(path).encode('utf-8') + b'\0' + data)
+
+        text = data.decode('utf-8', errors='ignore')
+        for match in INCLUDE_PATTERN.finditer(text):
+            resolved = resolve_include(match.group(2), match.group(1) == '"', os.path.dirname(path), include_dir)
+            if resolved:
+                pending.append(resolved)
+            else:
+                digest.update(b'\0missing:' + match.group(2).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+#=============================================================================
+# Log parsing
+#=============================================================================
+def read_log(log_path):
+    """MetaEditor writes UTF-16LE logs; stub/command compilers usually write UTF-8"""
+    if not os.path.exists(log_path):
+        return ""
+    with open(log_path, 'rb') as f:
+        data = f.read()
+    if data.startswith(b'\xff\xfe') or data[1:2] == b'\0':
+        return data.decode('utf-16-le', errors='ignore').lstrip('\ufeff')
+    return data.decode('utf-8', errors='ignore')
+
+
+def parse_log(text):
+    """Return (errors, warnings, [CompileMessage]) from a compiler log"""
+    messages = []
+    errors = None
+    warnings = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        match = LOG_MESSAGE_PATTERN.match(line)
+        if match:
+            messages.append(CompileMessage(
+                level=match.group('level'),
+                file=re.split(r'[\\/]', match.group('file'))[-1],
+                line=int(match.group('line')),
+                column=int(match.group('column')),
+                code=int(match.group('code')),
+                message=match.group('message'),
+            ))
+            continue
+
+        match = LOG_RESULT_PATTERN.search(line)
+        if match:
+            errors = int(match.group('errors'))
+            warnings = int(match.group('warnings'))
+
+    # Fall back to counting messages when the summary line is missing
+    if errors is None:
+        errors = sum(1 for message in messages if message.level == 'error')
+    if warnings is None:
+        warnings = sum(1 for message in messages if message.level == 'warning')
+
+    return errors, warnings, messages
+
+
+#=============================================================================
+# Orchestration
+#=============================================================================
+def compile_one(source, dialect, compiler, compiler_version, include_dir, cache_dir, output_dir=None, force=False):
+    """Compile a single EA, restoring it from the cache when the key is unchanged"""
+    started = time.time()
+    config = DIALECTS[dialect]
+    artifact_name = os.path.splitext(os.path.basename(source))[0] + config['artifact_ext']
+    artifact = os.path.join(output_dir or os.path.dirname(source), artifact_name)
+    key = compute_key(source, include_dir, compiler_version)
+    cached_artifact = os.path.join(cache_dir, key + config['artifact_ext'])
+    cached_log = os.path.join(cache_dir, key + ".json")
+
+    if not force and os.path.exists(cached_artifact):
+        if not os.path.exists(artifact) or not same_file_content(cached_artifact, artifact):
+            copy_atomic(cached_artifact, artifact)
+        warnings, messages = read_cached_warnings(cached_log)
+        return CompileResult(source=source, status="cached", key=key, warnings=warnings,
+                             seconds=time.time() - started, messages=messages)
+
+    with tempfile.TemporaryDirectory(prefix="ea_compile_") as work_dir:
+        output = os.path.join(work_dir, os.path.basename(artifact))
+        log_path = os.path.join(work_dir, "compile.log")
+
+        compiler.compile(source, include_dir, output, log_path)
+        errors, warnings, messages = parse_log(read_log(log_path))
+
+        if errors == 0 and os.path.exists(output):
+            # The warnings entry goes first so a cached artifact always has one
+            write_cached_warnings(cached_log, warnings, messages)
+            copy_atomic(output, cached_artifact)
+            copy_atomic(output, artifact)
+            status = "compiled"
+        else:
+            status = "failed"
+            if errors == 0:
+                errors = 1
+                messages.append(CompileMessage("error", os.path.basename(source), 0, 0, 0, "compiler produced no artifact"))
+
+    return CompileResult(source=source, status=status, key=key, errors=errors, warnings=warnings,
+                         seconds=time.time() - started, messages=messages)
+
+
+def read_cached_warnings(path):
+    """Return (warnings, [CompileMessage]) stored with a cached artifact"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return 0, []
+    return entry.get('warnings', 0), [CompileMessage(**message) for message in entry.get('messages', [])]
+
+
+def write_cached_warnings(path, warnings, messages):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'warnings': warnings, 'messages': [asdict(message) for message in messages]}, f)
+    os.replace(tmp_path, path)
+
+
+def same_file_content(path_a, path_b):
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+        return a.read() == b.read()
+
+
+def copy_atomic(source, destination):
+    """Copy via a temporary file so concurrent readers never see a partial artifact"""
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def compile_all(sources, dialect, compiler, include_dir, cache_dir, jobs, output_dir=None, force=False):
+    """Compile sources on a bounded worker pool. Returns results in source order"""
+    os.makedirs(cache_dir, exist_ok=True)
+    compiler_version = compiler.version()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(compile_one, source, dialect, compiler, compiler_version, include_dir, cache_dir,
+                               output_dir, force)
+                   for source in sources]
+        return [future.result() for future in futures]
+
+
+def build_compiler(args, dialect):
+    if args.compiler == "metaeditor":
+        return MetaEditorCompiler(args.metaeditor or DIALECTS[dialect]['metaeditor'], wine=args.wine)
+    if args.compiler == "command":
+        if not args.command:
+            raise SystemExit("--command is required with --compiler command")
+        return CommandCompiler(args.command, args.compiler_version)
+    return StubCompiler()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile EAs in parallel with a content-addressed cache")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default="mql5")
+    parser.add_argument("--source-dir", help="Folder with .mq4/.mq5 sources (default: repo Experts folder)")
+    parser.add_argument("--include-dir", help="Include folder passed to the compiler (default: repo Include folder)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--output-dir", help="Where to place .ex4/.ex5 files (default: next to the sources)")
+    parser.add_argument("--compiler", choices=["metaeditor", "command", "stub"], default="metaeditor")
+    parser.add_argument("--metaeditor", help="Path to metaeditor.exe / metaeditor64.exe")
+    parser.add_argument("--wine", action="store_true", help="Run MetaEditor through wine")
+    parser.add_argument("--command", help="Command template for --compiler command")
+    parser.add_argument("--compiler-version", help="Version string for --compiler command (part of the cache key)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--force", action="store_true", help="Ignore the cache and recompile everything")
+    parser.add_argument("--report", help="Write structured results as JSON to this path")
+    args = parser.parse_args()
+
+    config = DIALECTS[args.dialect]
+    source_dir = args.source_dir or config['source_dir']
+    include_dir = args.include_dir or config['include_dir']
+
+    if not os.path.exists(source_dir):
+        print(f"Source directory not found: {source_dir}")
+        return 1
+
+    sources = [os.path.join(source_dir, f) for f in sorted(os.listdir(source_dir)) if f.endswith(config['source_ext'])]
+    compiler = build_compiler(args, args.dialect)
+
+    # Never let placeholder artifacts overwrite the real compiled EAs
+    output_dir = args.output_dir
+    if args.compiler == "stub" and not output_dir:
+        output_dir = os.path.join(args.cache_dir, "stub-artifacts")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    started = time.time()
+    results = compile_all(sources, args.dialect, compiler, include_dir, args.cache_dir, max(1, args.jobs),
+                          output_dir, args.force)
+
+    for result in results:
+        name = os.path.basename(result.source)
+        if result.status == "failed":
+            print(f"FAILED: {name} ({result.errors} errors, {result.warnings} warnings)")
+            for message in result.messages:
+                if message.level == "error":
+                    print(f"  {message.file}({message.line},{message.column}): {message.message}")
+        else:
+            print(f"{result.status.upper()}: {name}" + (f" ({result.warnings} warnings)" if result.warnings else ""))
+
+    counts = {status: sum(1 for r in results if r.status == status) for status in ("compiled", "cached", "failed")}
+    print(f"\nCompleted in {time.time() - started:.1f}s: {counts['compiled']} compiled, "
+          f"{counts['cached']} cached, {counts['failed']} failed")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
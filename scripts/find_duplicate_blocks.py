@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate code blocks across all EAs and optionally move shared
+functions into Include/EALicense/*.mqh.
+
+Detection uses winnowing: every file is reduced to normalized lines
+(comments and whitespace removed), k consecutive lines are hashed with a
+Karp-Rabin rolling hash, and the minimum hash of each window of w hashes is
+kept as a fingerprint. Fingerprints shared by at least --min-files EAs are
+merged into regions, and regions with similar fingerprint sets are
+clustered and reported with their total footprint.
+
+--extract rewrites top-level functions that are identical (ignoring
+whitespace and comments) in at least --min-files EAs of a dialect into
+Include/EALicense/<Function>.mqh, and input groups (a "//--- NAME ---"
+header followed by input declarations) that are identical including their
+comments, which are the labels MetaTrader shows, into
+Include/EALicense/<Name>Inputs.mqh. Each copy is replaced with an #include
+directive at the same position, so the compiled code and the order of the
+inputs dialog are unchanged. The transforms, lint_eas.py,
+build_ea_catalog.py, martingale_risk.py and verify_transforms.py read
+what an EALicense include provides as part of the EA.
+
+--extract --check runs the extraction on a scratch copy of mql/ and
+scripts/ and fails if the catalog, the lint findings or the inputs
+martingale_risk.py simulates differ from the ones before extraction.
+
+Usage:
+    python3 scripts/find_duplicate_blocks.py [--dialect mql5|mql4|both] [--json]
+    python3 scripts/find_duplicate_blocks.py --extract [--dry-run | --check]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+import mql_source
+
+K_LINES = 6           # lines per k-gram
+WINDOW = 4            # winnowing window (<= K_LINES keeps coverage contiguous)
+SIMILARITY = 0.7      # Jaccard similarity for clustering regions
+ROLLING_BASE = 1000003
+ROLLING_MOD = (1 << 61) - 1
+
+INCLUDE_SUBDIR = "EALicense"
+MIN_GROUP_INPUTS = 2  # input groups with fewer declarations are left inline
+
+INPUT_GROUP_HEADER_PATTERN = re.compile(r'^[ \t]*//-{2,}[ \t]*(?P<title>[^\n]*?)[ \t-]*$')
+INPUT_LINE_PATTERN = re.compile(r'^[ \t]*s?input\s')
+
+
+def normalize_lines(content):
+    """Return [(original_line_no, normalized_text)] with comments, blanks and whitespace dropped"""
+    stripped = mql_source.code_mask(content, blank_strings=False)
+    result = []
+    for line_no, line in enumerate(stripped.split('\n')):
+        text = re.sub(r'\s+', ' ', line).strip()
+        if text:
+            result.append((line_no + 1, text))
+    return result
+
+
+def line_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def kgram_hashes(line_hashes, k=K_LINES):
+    """Karp-Rabin rolling hash over k consecutive line hashes"""
+    if len(line_hashes) < k:
+        return []
+    high = pow(ROLLING_BASE, k - 1, ROLLING_MOD)
+    current = 0
+    for value in line_hashes[:k]:
+        current = (current * ROLLING_BASE + value) % ROLLING_MOD
+    hashes = [current]
+    for idx in range(k, len(line_hashes)):
+        current = (current - line_hashes[idx - k] * high) % ROLLING_MOD
+        current = (current * ROLLING_BASE + line_hashes[idx]) % ROLLING_MOD
+        hashes.append(current)
+    return hashes
+
+
+def winnow(hashes, window=WINDOW):
+    """Return [(position, hash)] selected by winnowing (rightmost minimum per window)"""
+    if not hashes:
+        return []
+    if len(hashes) <= window:
+        pos = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [(pos, hashes[pos])]
+
+    selected = []
+    last = -1
+    for start in range(len(hashes) - window + 1):
+        best = start
+        for idx in range(start, start + window):
+            if hashes[idx] <= hashes[best]:
+                best = idx
+        if best != last:
+            selected.append((best, hashes[best]))
+            last = best
+    return selected
+
+
+def fingerprint_file(filepath):
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    lines = normalize_lines(content)
+    hashes = kgram_hashes([line_hash(text) for _, text in lines])
+    return {
+        'path': filepath,
+        'lines': lines,
+        'fingerprints': winnow(hashes),
+    }
+
+
+def find_regions(files, min_files):
+    """Merge fingerprints shared by >= min_files files into per-file regions"""
+    occurrences = defaultdict(set)
+    for index, info in enumerate(files):
+        for _, value in info['fingerprints']:
+            occurrences[value].add(index)
+    shared = {value for value, owners in occurrences.items() if len(owners) >= min_files}
+
+    regions = []
+    for info in files:
+        covered = {}
+        for pos, value in info['fingerprints']:
+            if value in shared:
+                for idx in range(pos, pos + K_LINES):
+                    covered.setdefault(idx, set()).add(value)
+
+        current = None
+        for idx in sorted(covered):
+            if current and idx == current['last'] + 1:
+                current['last'] = idx
+                current['fingerprints'] |= covered[idx]
+            else:
+                if current:
+                    regions.append(current)
+                current = {'path': info['path'], 'first': idx, 'last': idx, 'fingerprints': set(covered[idx]), 'lines': info['lines']}
+        if current:
+            regions.append(current)
+
+    for region in regions:
+        lines = region.pop('lines')
+        region['start_line'] = lines[region['first']][0]
+        region['end_line'] = lines[region['last']][0]
+        region['line_count'] = region['end_line'] - region['start_line'] + 1
+        region['functions'] = [m.group('name') for _, text in lines[region['first']:region['last'] + 1]
+                               for m in [mql_source.FUNCTION_HEADER_PATTERN.match(text)] if m]
+    return regions
+
+
+def cluster_regions(regions, min_files):
+    """Greedy clustering of regions by Jaccard similarity of their fingerprint sets"""
+    clusters = []
+    for region in sorted(regions, key=lambda r: -len(r['fingerprints'])):
+        for cluster in clusters:
+            reference = cluster['fingerprints']
+            union = len(reference | region['fingerprints'])
+            if union and len(reference & region['fingerprints']) / union >= SIMILARITY:
+                cluster['regions'].append(region)
+                break
+        else:
+            clusters.append({'fingerprints': region['fingerprints'], 'regions': [region]})
+
+    result = []
+    for cluster in clusters:
+        files = {region['path'] for region in cluster['regions']}
+        if len(files) < min_files:
+            continue
+        total_lines = sum(region['line_count'] for region in cluster['regions'])
+        largest = max(cluster['regions'], key=lambda r: r['line_count'])
+        functions = sorted({name for region in cluster['regions'] for name in region['functions']})
+        result.append({
+            'files': len(files),
+            'copies': len(cluster['regions']),
+            'total_lines': total_lines,
+            'saved_lines': total_lines - largest['line_count'],
+            'functions': functions,
+            'example': f"{os.path.basename(largest['path'])}:{largest['start_line']}-{largest['end_line']}",
+        })
+    return sorted(result, key=lambda c: -c['saved_lines'])
+
+
+def report(dialect, min_files, min_lines, as_json):
+    sources = mql_source.list_sources(dialect)
+    files = [fingerprint_file(path) for path in sources]
+    corpus_lines = sum(len(info['lines']) for info in files)
+
+    clusters = [c for c in cluster_regions(find_regions(files, min_files), min_files)
+                if c['total_lines'] / c['copies'] >= min_lines]
+    duplicated = sum(c['saved_lines'] for c in clusters)
+
+    if as_json:
+        return {'dialect': dialect, 'files': len(files), 'code_lines': corpus_lines,
+                'duplicated_lines': duplicated, 'clusters': clusters}
+
+    print(f"=== {dialect.upper()}: {len(files)} EAs, {corpus_lines} code lines ===")
+    for cluster in clusters:
+        names = ', '.join(cluster['functions']) or '(no function header)'
+        print(f"{cluster['saved_lines']:6d} lines saved | {cluster['copies']:3d} copies in {cluster['files']:3d} EAs | "
+              f"{names} | e.g. {cluster['example']}")
+    share = (100.0 * duplicated / corpus_lines) if corpus_lines else 0
+    print(f"Duplicated footprint: {duplicated} of {corpus_lines} code lines ({share:.1f}%)\n")
+    return None
+
+
+#=============================================================================
+# Shared include extraction
+#=============================================================================
+def normalized_function_text(text):
+    return re.sub(r'\s+', ' ', mql_source.code_mask(text, blank_strings=False)).strip()
+
+
+def collect_shared_functions(sources, min_files, min_lines):
+    """Group identical top-level functions. Returns {(name, key): [(path, function), ...]}"""
+    groups = defaultdict(list)
+    for path in sources:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        masked = mql_source.code_mask(content)
+        for function in mql_source.find_functions(content, masked):
+            if function['name'].startswith('On'):
+                continue  # event handlers are EA-specific entry points
+            text = content[function['start']:function['end']]
+            if text.count('\n') + 1 < min_lines:
+                continue
+            key = hashlib.sha256(normalized_function_text(text).encode('utf-8')).hexdigest()[:12]
+            groups[(function['name'], key)].append((path, content, function))
+    return {group: members for group, members in groups.items() if len({m[0] for m in members}) >= min_files}
+
+
+def include_names(shared):
+    """Dominant variant of each block gets <Name>.mqh, other variants <Name>_<hash>.mqh"""
+    by_name = defaultdict(list)
+    for (name, key), members in shared.items():
+        by_name[name].append((len(members), key))
+    names = {}
+    for name, variants in by_name.items():
+        variants.sort(reverse=True)
+        for rank, (_, key) in enumerate(variants):
+            names[(name, key)] = f"{name}.mqh" if rank == 0 else f"{name}_{key[:8]}.mqh"
+    return names
+
+
+def input_groups(content):
+    """Return [(title, start, end)] for each "//--- TITLE ---" header followed by input declarations"""
+    masked = mql_source.code_mask(content)
+    groups = []
+    lines = content.split('\n')
+    masked_lines = masked.split('\n')
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+
+    index = 0
+    while index < len(lines):
+        header = INPUT_GROUP_HEADER_PATTERN.match(lines[index])
+        # The header must be a real comment line, not inside a block comment or string
+        if not header or masked_lines[index].strip() or not header.group('title'):
+            index += 1
+            continue
+        last = None
+        inputs = 0
+        cursor = index + 1
+        while cursor < len(lines):
+            if INPUT_LINE_PATTERN.match(masked_lines[cursor]):
+                last = cursor
+                inputs += 1
+            elif lines[cursor].strip():
+                break
+            cursor += 1
+        if inputs >= MIN_GROUP_INPUTS:
+            groups.append((header.group('title'), offsets[index], offsets[last] + len(lines[last])))
+        index = cursor if last is None else last + 1
+    return groups
+
+
+def input_group_name(title):
+    """Include name for a group title: TRAILING STOP & BREAK EVEN -> TrailingStopBreakEvenInputs"""
+    return ''.join(word.capitalize() for word in re.findall(r'[A-Za-z0-9]+', title)) + "Inputs"
+
+
+def collect_shared_inputs(sources, min_files):
+    """Group identical input groups. Returns {(name, key): [(path, content, span), ...]}"""
+    groups = defaultdict(list)
+    for path in sources:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        for title, start, end in input_groups(content):
+            # Comments are the labels in the inputs dialog, so they are part of the identity
+            text = re.sub(r'\s+', ' ', content[start:end]).strip()
+            key = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+            groups[(input_group_name(title), key)].append((path, content, {'start': start, 'end': end}))
+    return {group: members for group, members in groups.items() if len({m[0] for m in members}) >= min_files}
+
+
+def extract(dialect, min_files, min_lines, dry_run):
+    sources = mql_source.list_sources(dialect)
+    include_dir = os.path.join(mql_source.INCLUDE_DIRS[dialect], INCLUDE_SUBDIR)
+    shared = collect_shared_functions(sources, min_files, min_lines)
+    # Functions start at their leading comment; input groups are taken as they are
+    blocks = [(group, members, True) for group, members in shared.items()]
+    shared_inputs = collect_shared_inputs(sources, min_files)
+    blocks += [(group, members, False) for group, members in shared_inputs.items()]
+    names = include_names({**shared, **shared_inputs})
+
+    def span(content, block, with_comment):
+        start = mql_source.leading_comment_start(content, block['start']) if with_comment else block['start']
+        return start, block['end']
+
+    replacements = defaultdict(list)  # path -> [(start, end, directive)]
+    for group, members, with_comment in sorted(blocks, key=lambda block: block[0]):
+        include_file = names[group]
+        _, content, block = members[0]
+        start, end = span(content, block, with_comment)
+        body = content[start:end]
+
+        header = (f"//+------------------------------------------------------------------+\n"
+                  f"//| {include_file}\n"
+                  f"//| Shared by {len(members)} EAs - {mql_source.GENERATED_INCLUDE_MARKER}\n"
+                  f"//+------------------------------------------------------------------+\n")
+        include_path = os.path.join(include_dir, include_file)
+        print(f"{'WOULD WRITE' if dry_run else 'WRITE'}: {os.path.relpath(include_path, mql_source.REPO_ROOT)} "
+              f"({body.count(chr(10)) + 1} lines x {len(members)} EAs)")
+        if not dry_run:
+            os.makedirs(include_dir, exist_ok=True)
+            with open(include_path, 'w', encoding='utf-8') as f:
+                f.write(header + body + "\n")
+
+        for path, content, block in members:
+            start, end = span(content, block, with_comment)
+            replacements[path].append((start, end, f"#include <{INCLUDE_SUBDIR}/{include_file}>"))
+
+    for path, edits in sorted(replacements.items()):
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for start, end, directive in sorted(edits, reverse=True):
+            content = content[:start] + directive + content[end:]
+        if not dry_run:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        print(f"  {'WOULD UPDATE' if dry_run else 'UPDATED'}: {os.path.basename(path)} ({len(edits)} blocks)")
+
+
+#=============================================================================
+# Extraction check
+#=============================================================================
+def snapshot():
+    """What the readers of the EA sources see: catalog entries, lint findings and risk inputs"""
+    import build_ea_catalog
+    import lint_eas
+    import martingale_risk
+
+    sources = mql_source.list_sources('mql5') + mql_source.list_sources('mql4')
+    entries = []
+    for path in sources:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            entries.append(build_ea_catalog.parse_ea(path, f.read()))
+    findings, _ = lint_eas.lint(sources, jobs=1, use_cache=False)
+    result = {'catalog': {entry['file']: entry for entry in entries},
+              'eas': build_ea_catalog.summarize_eas(entries),
+              # Line numbers move when blocks become one-line #include directives
+              'lint': {os.path.relpath(path, mql_source.REPO_ROOT): sorted([rule, message] for _, rule, message in found)
+                       for path, found in findings.items()},
+              'risk': {}}
+    for dialect in ('mql5', 'mql4'):
+        for number, name, params in martingale_risk.load_eas(range(100), dialect):
+            result['risk'][f"{dialect}:{number}"] = {'name': name, 'params': params,
+                                                     'managedExits': martingale_risk.managed_exits(params)}
+    return result
+
+
+def check_extract(dialects, min_files, min_lines):
+    """Extract in a scratch copy of the repo and compare what the readers see before and after"""
+    scratch = tempfile.mkdtemp(prefix="extract-check-")
+    try:
+        for name in ('mql', 'scripts'):
+            shutil.copytree(os.path.join(mql_source.REPO_ROOT, name), os.path.join(scratch, name),
+                            ignore=shutil.ignore_patterns('__pycache__'))
+        script = os.path.join(scratch, 'scripts', os.path.basename(__file__))
+
+        def run(*args):
+            return subprocess.run([sys.executable, script, *args], check=True, capture_output=True, text=True).stdout
+
+        before = json.loads(run('--snapshot'))
+        for dialect in dialects:
+            run('--extract', '--dialect', dialect, '--min-files', str(min_files), '--min-lines', str(min_lines))
+        after = json.loads(run('--snapshot'))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    differences = 0
+    for section in ('catalog', 'eas', 'lint', 'risk'):
+        for key in sorted(set(before[section]) | set(after[section])):
+            old, new = before[section].get(key), after[section].get(key)
+            if old == new:
+                continue
+            differences += 1
+            fields = sorted(field for field in set(old or {}) | set(new or {})
+                            if (old or {}).get(field) != (new or {}).get(field)) if isinstance(old, dict) else []
+            print(f"CHANGED {section} {key}" + (f": {', '.join(fields)}" if fields else f": {old} -> {new}"))
+    print(f"{differences} differences after extraction")
+    return 1 if differences else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report duplicated code blocks across EAs")
+    parser.add_argument("--dialect", choices=["mql5", "mql4", "both"], default="both")
+    parser.add_argument("--min-files", type=int, default=5, help="Minimum number of EAs sharing a block")
+    parser.add_argument("--min-lines", type=int, default=10, help="Minimum block size in lines")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--extract", action="store_true", help="Move shared functions and input groups into Include/EALicense/*.mqh")
+    parser.add_argument("--dry-run", action="store_true", help="With --extract, report without writing")
+    parser.add_argument("--check", action="store_true",
+                        help="With --extract, extract in a scratch copy and compare catalog, lint and risk inputs")
+    parser.add_argument("--snapshot", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    dialects = ["mql5", "mql4"] if args.dialect == "both" else [args.dialect]
+
+    if args.snapshot:
+        print(json.dumps(snapshot()))
+        return
+    if args.extract and args.check:
+        raise SystemExit(check_extract(dialects, args.min_files, args.min_lines))
+    if args.extract:
+        for dialect in dialects:
+            print(f"=== Extracting shared {dialect.upper()} functions and inputs ===")
+            extract(dialect, args.min_files, args.min_lines, args.dry_run)
+        return
+
+    results = [report(dialect, args.min_files, args.min_lines, args.json) for dialect in dialects]
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Final fix script to add missing ValidateLicense and PeriodicLicenseCheck functio
 import os
 import re
 
+import mql_source
+
 MQL5_EXPERTS_DIR = "/Users/nut/Downloads/ea-license-system/mql/MQL5/Experts"
 
 LICENSE_VALIDATOR_CODE = '''//=============================================================================
@@ -82,6 +84,27 @@ bool PeriodicLicenseCheck()
 
 '''
 
+def fix_content(content):
+    """Return content with the license validator inserted before OnInit (if missing)"""
+    
+    # Check if file already has ValidateLicense function
+    if 'bool ValidateLicense()' in mql_source.with_shared_includes(content, 'mql5'):
+        return content
+    
+    # Check if file has LICENSE_API_URL (was updated by script)
+    if '#define LICENSE_API_URL' not in content:
+        return content
+    
+    # Find position after global variables (before OnInit)
+    # Look for pattern: int OnInit()
+    oninit_match = re.search(r'\n(int OnInit\(\))', content)
+    if not oninit_match:
+        return content
+    
+    # Insert the license validator code before OnInit
+    insert_pos = oninit_match.start()
+    return content[:insert_pos] + '\n' + LICENSE_VALIDATOR_CODE + content[insert_pos:]
+
 def fix_file(filepath):
     """Add missing ValidateLicense function to a file"""
     
@@ -89,7 +112,7 @@ def fix_file(filepath):
         content = f.read()
     
     # Check if file already has ValidateLicense function
-    if 'bool ValidateLicense()' in content:
+    if 'bool ValidateLicense()' in mql_source.with_shared_includes(content, 'mql5'):
         print(f"OK: {os.path.basename(filepath)}")
         return False
     
@@ -98,17 +121,11 @@ def fix_file(filepath):
         print(f"SKIP (not updated): {os.path.basename(filepath)}")
         return False
     
-    # Find position after global variables (before OnInit)
-    # Look for pattern: int OnInit()
-    oninit_match = re.search(r'\n(int OnInit\(\))', content)
-    if not oninit_match:
+    new_content = fix_content(content)
+    if new_content == content:
         print(f"ERROR (no OnInit): {os.path.basename(filepath)}")
         return False
     
-    # Insert the license validator code before OnInit
-    insert_pos = oninit_match.start()
-    new_content = content[:insert_pos] + '\n' + LICENSE_VALIDATOR_CODE + content[insert_pos:]
-    
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(new_content)
     
@@ -0,0 +1,1003 @@
+#!/usr/bin/env python3
+"""
+Streaming indicators that follow the MetaTrader 5 built-ins used by the EAs.
+
+Each indicator keeps its own incremental state. push() commits a closed bar
+and returns that bar's buffer value(s). peek() returns the value the
+still-forming bar would have right now, without changing state, so tick
+feeds can be replayed. Updates are O(1) in the length of history:
+rolling sums use MetaTrader's own recurrences, and rolling highs/lows use
+monotonic deques.
+
+The formulas mirror MQL5/Indicators/Examples (MovingAverages.mqh, RSI,
+BB, MACD, Stochastic, ATR, Ichimoku, ParabolicSAR, WPR, ADX):
+
+  - SMA/EMA/SMMA, RSI, MACD, ATR, ADX, WPR, Stochastic, Ichimoku and SAR
+    use the same recurrences and summation order as the terminal.
+  - LWMA and the Bands deviation use running sums instead of the
+    terminal's O(period) loops, so they agree to float rounding (~1e-12).
+    The sums are recomputed exactly once per period to stop drift.
+
+Values the terminal leaves empty during warm-up are returned as None (NaN
+in batch()).
+Keltner Channel is the EMA +/- ATR * multiplier combination from
+17_Keltner_Channel_EA.
+
+batch() runs an indicator over whole series for history with NumPy: the
+same recurrences evaluated as array operations (cumulative sums, blocked
+first-order linear recurrences, van Herk/Gil-Werman rolling extremes),
+then the indicator is left in the state push() would have reached, so a
+feed can continue bar by bar. SMA, ATR and the rolling highs/lows match
+push() exactly; the EMA-style recurrences, LWMA and Bands agree to float
+rounding. ParabolicSAR has no array form and is pushed bar by bar. push()
+and peek() are stdlib only; batch() needs numpy. verify compares against
+buffers exported from the terminal.
+
+Usage:
+    python3 scripts/indicators.py verify export.csv --indicator rsi --params 14
+    python3 scripts/indicators.py bench [--bars 1000000]
+"""
+
+import argparse
+import csv
+import math
+import random
+import time
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # push()/peek() work without it; batch() needs it
+
+PRICE_CLOSE, PRICE_OPEN, PRICE_HIGH, PRICE_LOW, PRICE_MEDIAN, PRICE_TYPICAL, PRICE_WEIGHTED = range(1, 8)
+MODE_SMA, MODE_EMA, MODE_SMMA, MODE_LWMA = range(4)
+
+EMPTY_VALUE = 1.7976931348623157e308  # DBL_MAX, what the terminal exports for empty buffers
+RECURRENCE_BLOCK = 128  # bars per matrix product in linear_recurrence()
+VARIANCE_CANCELLATION = 1e-6  # Bands: running variance below this share of the mean square is recomputed
+
+
+def applied_price(open_, high, low, close, mode=PRICE_CLOSE):
+    if mode == PRICE_CLOSE:
+        return close
+    if mode == PRICE_OPEN:
+        return open_
+    if mode == PRICE_HIGH:
+        return high
+    if mode == PRICE_LOW:
+        return low
+    if mode == PRICE_MEDIAN:
+        return (high + low) / 2.0
+    if mode == PRICE_TYPICAL:
+        return (high + low + close) / 3.0
+    return (high + low + 2 * close) / 4.0
+
+
+#=============================================================================
+# Building blocks
+#=============================================================================
+class WindowExtreme:
+    """Rolling max (or min) over the last `period` values, including partial windows"""
+
+    def __init__(self, period, highest=True):
+        self.period = period
+        self.highest = highest
+        self.items = deque()  # (index, value), values monotonic from the front
+
+    def _beats(self, a, b):
+        return a >= b if self.highest else a <= b
+
+    def push(self, index, value):
+        items = self.items
+        while items and self._beats(value, items[-1][1]):
+            items.pop()
+        items.append((index, value))
+        if items[0][0] <= index - self.period:
+            items.popleft()
+        return items[0][1]
+
+    def peek(self, index, value):
+        for item_index, item_value in self.items:
+            if item_index > index - self.period:
+                return value if self._beats(value, item_value) else item_value
+        return value
+
+    def load(self, values, count):
+        """Restore the state after `count` pushes ending with `values` (only the last `period` matter)"""
+        self.items.clear()
+        values = values[-self.period:]
+        for index, value in enumerate(values, count - len(values)):
+            self.push(index, value)
+
+
+class Ring:
+    """Fixed-size history of the last `size` values"""
+
+    def __init__(self, size):
+        self.values = [0.0] * size
+        self.size = size
+        self.pos = 0
+
+    def oldest(self):
+        """Value that the next push() overwrites (pushed `size` bars ago)"""
+        return self.values[self.pos]
+
+    def push(self, value):
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+
+    def ordered(self):
+        return self.values[self.pos:] + self.values[:self.pos]
+
+    def load(self, values, count):
+        """Restore the state after `count` pushes ending with `values` (only the last `size` matter)"""
+        self.pos = count % self.size
+        for back, value in enumerate(reversed(values[-self.size:]), 1):
+            self.values[(count - back) % self.size] = value
+
+    def last(self, count, extra=None):
+        """The most recent `count` values, oldest first; `extra` stands in for a not-yet-pushed value"""
+        if count <= 0:
+            return []
+        values = self.ordered() + ([extra] if extra is not None else [])
+        return values[-count:]
+
+
+class Indicator:
+    """Base class: subclasses implement _step(inputs, commit)"""
+    buffers = ('value',)
+
+    def __init__(self):
+        self.count = 0
+
+    def push(self, *inputs):
+        value = self._step(inputs, True)
+        self.count += 1
+        return value
+
+    def peek(self, *inputs):
+        return self._step(inputs, False)
+
+    def _step(self, inputs, commit):
+        raise NotImplementedError
+
+    def _batch(self, *series):
+        """
+        push() over whole float arrays from a fresh state: return one array
+        per buffer (NaN where push() returns None) and leave the state push()
+        would. None means there is no array form.
+        """
+        return None
+
+
+#=============================================================================
+# Array building blocks (batch mode)
+#=============================================================================
+def empty(count):
+    return np.full(count, np.nan)
+
+
+def running_sum(first, steps):
+    """first, first + steps[0], ...: the terminal's `prev + delta` recurrences, same rounding"""
+    return np.add.accumulate(np.concatenate(([first], steps)))
+
+
+def sequential_sum(values):
+    """Left-to-right sum, as the terminal's seeding loops add (np.sum is pairwise)"""
+    return float(np.add.accumulate(values)[-1]) if len(values) else 0.0
+
+
+def linear_recurrence(terms, factor, start):
+    """
+    y[i] = factor * y[i-1] + terms[i] with y[-1] = start. Each block of
+    RECURRENCE_BLOCK bars is one matrix product with the decay matrix; only
+    the block boundaries are carried in Python.
+    """
+    count = len(terms)
+    size = RECURRENCE_BLOCK
+    blocks = -(-count // size)
+    grid = np.zeros(blocks * size)
+    grid[:count] = terms
+    grid = grid.reshape(blocks, size)
+    lags = np.arange(size)
+    gaps = lags[:, None] - lags[None, :]
+    decay = np.where(gaps >= 0, factor ** np.maximum(gaps, 0), 0.0)
+    local = grid @ decay.T
+    carry = factor ** size
+    starts = [start]
+    for last in local[:-1, -1].tolist():
+        starts.append(carry * starts[-1] + last)
+    return (local + np.array(starts)[:, None] * factor ** (lags + 1)).ravel()[:count]
+
+
+def rolling_extreme(values, period, highest=True):
+    """WindowExtreme over a whole array (partial windows at the start), O(1) per bar"""
+    extreme = np.maximum if highest else np.minimum
+    count = len(values)
+    padded = np.concatenate((np.full(period - 1, values[0]), values))
+    blocks = -(-len(padded) // period)
+    padded = np.concatenate((padded, np.full(blocks * period - len(padded), values[-1]))).reshape(blocks, period)
+    prefix = extreme.accumulate(padded, axis=1).ravel()
+    suffix = extreme.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return extreme(suffix[:count], prefix[period - 1:period - 1 + count])
+
+
+def window_sums(values, period):
+    """Sums of each full window of `period` values, for the bar that ends it"""
+    return np.lib.stride_tricks.sliding_window_view(values, period).sum(axis=1)
+
+
+#=============================================================================
+# Moving averages
+#=============================================================================
+class MovingAverage(Indicator):
+    """iMA(period, 0, method) on a price series"""
+
+    def __init__(self, period=14, method=MODE_SMA):
+        super().__init__()
+        self.period = period
+        self.method = method
+        self.ring = Ring(period)
+        self.prev = None
+        self.alpha = 2.0 / (1.0 + period)
+        self.weight_sum = period * (period + 1) / 2.0
+        self.sum = 0.0   # LWMA weighted sum
+        self.lsum = 0.0  # LWMA plain sum
+
+    def _first_window(self, price):
+        values = self.ring.last(self.period - 1) + [price]
+        if self.method == MODE_LWMA:
+            weighted = 0.0
+            for k, value in enumerate(values, 1):
+                weighted += k * value
+            return weighted / self.weight_sum, weighted, sum(values)
+        total = 0.0
+        for value in values:
+            total += value
+        return total / self.period, 0.0, total
+
+    def _step(self, inputs, commit):
+        price = inputs[0]
+        n = self.count
+        period = self.period
+        weighted, plain = self.sum, self.lsum
+
+        if self.method == MODE_EMA:
+            value = price if n == 0 else price * self.alpha + self.prev * (1.0 - self.alpha)
+        elif n < period - 1:
+            value = None
+        elif n == period - 1:
+            value, weighted, plain = self._first_window(price)
+        elif self.method == MODE_SMA:
+            value = self.prev + (price - self.ring.oldest()) / period
+        elif self.method == MODE_SMMA:
+            value = (self.prev * (period - 1) + price) / period
+        else:
+            weighted = self.sum - self.lsum + price * period
+            plain = self.lsum - self.ring.oldest() + price
+            if self.ring.pos == 0:  # once per period: recompute exactly
+                value, weighted, plain = self._first_window(price)
+            else:
+                value = weighted / self.weight_sum
+
+        if commit:
+            self.ring.push(price)
+            self.prev = value
+            self.sum, self.lsum = weighted, plain
+        return value
+
+    def _batch(self, prices):
+        count = len(prices)
+        period = self.period
+        values = empty(count)
+        if self.method == MODE_EMA:
+            values[0] = prices[0]
+            values[1:] = linear_recurrence(prices[1:] * self.alpha, 1.0 - self.alpha, prices[0])
+        elif count >= period:
+            total = sequential_sum(prices[:period])
+            if self.method == MODE_SMA:
+                values[period - 1:] = running_sum(total / period, (prices[period:] - prices[:-period]) / period)
+            elif self.method == MODE_SMMA:
+                values[period - 1] = total / period
+                values[period:] = linear_recurrence(prices[period:] / period, (period - 1) / period, total / period)
+            else:
+                weights = np.arange(period, 0, -1, dtype=float)
+                values[period - 1:] = np.convolve(prices, weights, 'valid') / self.weight_sum
+                total = sequential_sum(prices[-period:])
+                self.sum = float(np.dot(weights[::-1], prices[-period:]))
+            self.lsum = total
+        self.ring.load(prices[-self.period:].tolist(), count)
+        last = values[-1]
+        self.prev = None if math.isnan(last) else float(last)
+        self.count = count
+        return (values,)
+
+
+#=============================================================================
+# Oscillators
+#=============================================================================
+class RSI(Indicator):
+    """iRSI(period): Wilder smoothing seeded with the simple average of the first `period` moves"""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.last_price = None
+        self.sum_pos = 0.0
+        self.sum_neg = 0.0
+        self.pos = 0.0
+        self.neg = 0.0
+
+    @staticmethod
+    def _value(pos, neg):
+        if neg != 0.0:
+            return 100.0 - (100.0 / (1.0 + pos / neg))
+        return 100.0 if pos != 0.0 else 50.0
+
+    def _step(self, inputs, commit):
+        price = inputs[0]
+        n = self.count
+        period = self.period
+        value = None
+        sum_pos, sum_neg, pos, neg = self.sum_pos, self.sum_neg, self.pos, self.neg
+
+        if n > 0:
+            diff = price - self.last_price
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            if n <= period:
+                sum_pos += up
+                sum_neg += down
+                if n == period:
+                    pos, neg = sum_pos / period, sum_neg / period
+                    value = self._value(pos, neg)
+            else:
+                pos = (pos * (period - 1) + up) / period
+                neg = (neg * (period - 1) + down) / period
+                value = self._value(pos, neg)
+
+        if commit:
+            self.last_price = price
+            self.sum_pos, self.sum_neg, self.pos, self.neg = sum_pos, sum_neg, pos, neg
+        return value
+
+    def _batch(self, prices):
+        count = len(prices)
+        period = self.period
+        values = empty(count)
+        diff = prices[1:] - prices[:-1]
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+        self.sum_pos = sequential_sum(up[:period])
+        self.sum_neg = sequential_sum(down[:period])
+        if count > period:
+            factor = (period - 1) / period
+            pos = linear_recurrence(up[period:] / period, factor, self.sum_pos / period)
+            neg = linear_recurrence(down[period:] / period, factor, self.sum_neg / period)
+            pos = np.concatenate(([self.sum_pos / period], pos))
+            neg = np.concatenate(([self.sum_neg / period], neg))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values[period:] = np.where(neg != 0.0, 100.0 - 100.0 / (1.0 + pos / neg),
+                                           np.where(pos != 0.0, 100.0, 50.0))
+            self.pos, self.neg = float(pos[-1]), float(neg[-1])
+        self.last_price = float(prices[-1])
+        self.count = count
+        return (values,)
+
+
+class MACD(Indicator):
+    """iMACD(fast, slow, signal): EMA(fast) - EMA(slow), signal = SMA of the main line"""
+    buffers = ('main', 'signal')
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        super().__init__()
+        self.fast = MovingAverage(fast, MODE_EMA)
+        self.slow = MovingAverage(slow, MODE_EMA)
+        self.signal = MovingAverage(signal, MODE_SMA)
+
+    def _step(self, inputs, commit):
+        price = inputs[0]
+        if commit:
+            main = self.fast.push(price) - self.slow.push(price)
+            return main, self.signal.push(main)
+        main = self.fast.peek(price) - self.slow.peek(price)
+        return main, self.signal.peek(main)
+
+    def _batch(self, prices):
+        main = self.fast._batch(prices)[0] - self.slow._batch(prices)[0]
+        self.count = len(prices)
+        return main, self.signal._batch(main)[0]
+
+
+class Stochastic(Indicator):
+    """iStochastic(K, D, slowing, MODE_SMA, STO_LOWHIGH)"""
+    buffers = ('main', 'signal')
+
+    def __init__(self, k_period=5, d_period=3, slowing=3):
+        super().__init__()
+        self.k_period = k_period
+        self.d_period = d_period
+        self.slowing = slowing
+        self.highest = WindowExtreme(k_period, True)
+        self.lowest = WindowExtreme(k_period, False)
+        self.spans = Ring(slowing)   # (close - lowest, highest - lowest) per bar
+        self.mains = Ring(d_period)
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        n = self.count
+        if commit:
+            top, bottom = self.highest.push(n, high), self.lowest.push(n, low)
+        else:
+            top, bottom = self.highest.peek(n, high), self.lowest.peek(n, low)
+        span = (close - bottom, top - bottom)
+
+        main = signal = None
+        main_start = self.k_period - 1 + self.slowing - 1
+        if n >= main_start:
+            sum_low = sum_high = 0.0
+            for low_part, high_part in self.spans.last(self.slowing, span):
+                sum_low += low_part
+                sum_high += high_part
+            main = 100.0 if sum_high == 0.0 else sum_low / sum_high * 100
+            if n >= main_start + self.d_period - 1:
+                total = 0.0
+                for value in reversed(self.mains.last(self.d_period, main)):
+                    total += value
+                signal = total / self.d_period
+
+        if commit:
+            self.spans.push(span)
+            self.mains.push(main if main is not None else 0.0)
+        return main, signal
+
+    def _batch(self, highs, lows, closes):
+        count = len(closes)
+        top = rolling_extreme(highs, self.k_period, True)
+        bottom = rolling_extreme(lows, self.k_period, False)
+        low_parts, high_parts = closes - bottom, top - bottom
+        main, signal = empty(count), empty(count)
+        main_start = self.k_period - 1 + self.slowing - 1
+        if count > main_start:
+            sum_low = window_sums(low_parts, self.slowing)[main_start - self.slowing + 1:]
+            sum_high = window_sums(high_parts, self.slowing)[main_start - self.slowing + 1:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                main[main_start:] = np.where(sum_high == 0.0, 100.0, sum_low / sum_high * 100)
+            if count > main_start + self.d_period - 1:
+                signal[main_start + self.d_period - 1:] = window_sums(main[main_start:], self.d_period) / self.d_period
+
+        self.highest.load(highs[-self.highest.period:].tolist(), count)
+        self.lowest.load(lows[-self.lowest.period:].tolist(), count)
+        tail = slice(-self.slowing, None)
+        self.spans.load(list(zip(low_parts[tail].tolist(), high_parts[tail].tolist())), count)
+        self.mains.load(np.nan_to_num(main[-self.d_period:], nan=0.0).tolist(), count)
+        self.count = count
+        return main, signal
+
+
+class WPR(Indicator):
+    """iWPR(period): -(HH - close) / (HH - LL) * 100, previous value when the range is flat"""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.highest = WindowExtreme(period, True)
+        self.lowest = WindowExtreme(period, False)
+        self.prev = 0.0
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        n = self.count
+        if commit:
+            top, bottom = self.highest.push(n, high), self.lowest.push(n, low)
+        else:
+            top, bottom = self.highest.peek(n, high), self.lowest.peek(n, low)
+        if n < self.period - 1:
+            return None
+        value = -(top - close) * 100 / (top - bottom) if top != bottom else self.prev
+        if commit:
+            self.prev = value
+        return value
+
+    def _batch(self, highs, lows, closes):
+        count = len(closes)
+        period = self.period
+        values = empty(count)
+        if count >= period:
+            top = rolling_extreme(highs, period, True)[period - 1:]
+            bottom = rolling_extreme(lows, period, False)[period - 1:]
+            flat = top == bottom
+            with np.errstate(divide='ignore', invalid='ignore'):
+                raw = -(top - closes[period - 1:]) * 100 / (top - bottom)
+            # A flat range repeats the previous value (the initial 0.0 before any)
+            last = np.maximum.accumulate(np.where(flat, -1, np.arange(len(raw))))
+            values[period - 1:] = np.where(last >= 0, raw[np.maximum(last, 0)], self.prev)
+            self.prev = float(values[-1])
+        self.highest.load(highs[-self.highest.period:].tolist(), count)
+        self.lowest.load(lows[-self.lowest.period:].tolist(), count)
+        self.count = count
+        return (values,)
+
+
+#=============================================================================
+# Volatility and trend
+#=============================================================================
+class Bands(Indicator):
+    """iBands(period, 0, deviation): SMA middle +/- deviation * population std dev"""
+    buffers = ('middle', 'upper', 'lower')
+
+    def __init__(self, period=20, deviation=2.0):
+        super().__init__()
+        self.period = period
+        self.deviation = deviation
+        self.ring = Ring(period)
+        self.origin = None   # prices are summed relative to the first one to limit cancellation
+        self.sum = 0.0
+        self.sum_sq = 0.0
+
+    def _exact_sums(self, price):
+        total = total_sq = 0.0
+        for value in self.ring.last(self.period - 1) + [price]:
+            total += value - self.origin
+            total_sq += (value - self.origin) ** 2
+        return total, total_sq
+
+    def _exact_variance(self, price):
+        """Two-pass variance of the window ending at price, as batch() computes it"""
+        window = [value - self.origin for value in self.ring.last(self.period - 1)] + [price - self.origin]
+        mean = sum(window) / self.period
+        return sum((value - mean) ** 2 for value in window) / self.period
+
+    def _step(self, inputs, commit):
+        price = inputs[0]
+        n = self.count
+        period = self.period
+        if self.origin is None:
+            self.origin = price
+        shifted = price - self.origin
+        total, total_sq = self.sum, self.sum_sq
+
+        if n < period:
+            total += shifted
+            total_sq += shifted * shifted
+        elif self.ring.pos == 0:
+            total, total_sq = self._exact_sums(price)
+        else:
+            old = self.ring.oldest() - self.origin
+            total += shifted - old
+            total_sq += shifted * shifted - old * old
+
+        result = (None, None, None)
+        if n >= period - 1:
+            mean = total / period
+            middle = self.origin + mean
+            std = 0.0
+            # The terminal only computes the deviation from bar `period` on
+            if n >= period:
+                variance = total_sq / period - mean * mean
+                # Near-flat windows: the running difference is mostly rounding error
+                if variance <= VARIANCE_CANCELLATION * total_sq / period:
+                    variance = self._exact_variance(price)
+                std = math.sqrt(max(variance, 0.0))
+            result = (middle, middle + self.deviation * std, middle - self.deviation * std)
+
+        if commit:
+            self.ring.push(price)
+            self.sum, self.sum_sq = total, total_sq
+        return result
+
+    def _batch(self, prices):
+        count = len(prices)
+        period = self.period
+        middle, upper, lower = empty(count), empty(count), empty(count)
+        self.origin = float(prices[0])
+        shifted = prices - self.origin
+        if count >= period:
+            windows = np.lib.stride_tricks.sliding_window_view(shifted, period)
+            step = max(1, (1 << 20) // period)  # bounds the (rows, period) temporaries
+            for start in range(0, len(windows), step):
+                rows = windows[start:start + step]
+                mean = rows.sum(axis=1) / period
+                std = np.sqrt(((rows - mean[:, None]) ** 2).sum(axis=1) / period)
+                if start == 0:
+                    std[0] = 0.0  # the terminal only computes the deviation from bar `period` on
+                at = slice(period - 1 + start, period - 1 + start + len(rows))
+                middle[at] = self.origin + mean
+                upper[at] = middle[at] + self.deviation * std
+                lower[at] = middle[at] - self.deviation * std
+        tail = shifted[-period:]
+        self.sum, self.sum_sq = sequential_sum(tail), sequential_sum(tail * tail)
+        self.ring.load(prices[-self.period:].tolist(), count)
+        self.count = count
+        return middle, upper, lower
+
+
+class ATR(Indicator):
+    """iATR(period): simple average of true range, updated with the terminal's recurrence"""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.ranges = Ring(period)
+        self.prev_close = None
+        self.first = 0.0
+        self.prev = None
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        n = self.count
+        period = self.period
+        value = None
+        first = self.first
+        true_range = 0.0
+
+        if n > 0:
+            true_range = max(high, self.prev_close) - min(low, self.prev_close)
+            if n <= period:
+                first += true_range
+                if n == period:
+                    value = first / period
+            else:
+                value = self.prev + (true_range - self.ranges.oldest()) / period
+
+        if commit:
+            if n > 0:
+                self.ranges.push(true_range)
+            self.prev_close = close
+            self.first = first
+            self.prev = value
+        return value
+
+    def _batch(self, highs, lows, closes):
+        count = len(closes)
+        period = self.period
+        values = empty(count)
+        prev_closes = closes[:-1]
+        ranges = np.maximum(highs[1:], prev_closes) - np.minimum(lows[1:], prev_closes)  # bars 1..count-1
+        self.first = sequential_sum(ranges[:period])
+        if count > period:
+            values[period:] = running_sum(self.first / period, (ranges[period:] - ranges[:-period]) / period)
+            self.prev = float(values[-1])
+        self.ranges.load(ranges[-self.period:].tolist(), count - 1)
+        self.prev_close = float(closes[-1])
+        self.count = count
+        return (values,)
+
+
+class Keltner(Indicator):
+    """Keltner Channel as 17_Keltner_Channel_EA builds it: EMA(close) +/- ATR * multiplier"""
+    buffers = ('middle', 'upper', 'lower')
+
+    def __init__(self, ema_period=20, atr_period=10, multiplier=2.0):
+        super().__init__()
+        self.ema = MovingAverage(ema_period, MODE_EMA)
+        self.atr = ATR(atr_period)
+        self.multiplier = multiplier
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        if commit:
+            middle, atr = self.ema.push(close), self.atr.push(high, low, close)
+        else:
+            middle, atr = self.ema.peek(close), self.atr.peek(high, low, close)
+        if atr is None:
+            return middle, None, None
+        return middle, middle + atr * self.multiplier, middle - atr * self.multiplier
+
+    def _batch(self, highs, lows, closes):
+        middle = self.ema._batch(closes)[0]
+        atr = self.atr._batch(highs, lows, closes)[0]
+        self.count = len(closes)
+        return middle, middle + atr * self.multiplier, middle - atr * self.multiplier
+
+
+class Ichimoku(Indicator):
+    """
+    iIchimoku(tenkan, kijun, senkou). senkou_a/senkou_b are the cloud values
+    at this bar, as CopyBuffer returns them for the shifted plots (computed
+    kijun bars ago). The *_ahead values are the ones computed on this bar,
+    which the chart plots kijun bars ahead. chikou is this bar's close,
+    plotted kijun bars back.
+    """
+    buffers = ('tenkan', 'kijun', 'senkou_a', 'senkou_b', 'senkou_a_ahead', 'senkou_b_ahead', 'chikou')
+
+    def __init__(self, tenkan=9, kijun=26, senkou=52):
+        super().__init__()
+        self.kijun_period = kijun
+        self.windows = [(WindowExtreme(p, True), WindowExtreme(p, False)) for p in (tenkan, kijun, senkou)]
+        self.spans = Ring(kijun)
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        n = self.count
+        mids = []
+        for highest, lowest in self.windows:
+            if commit:
+                mids.append((highest.push(n, high) + lowest.push(n, low)) / 2.0)
+            else:
+                mids.append((highest.peek(n, high) + lowest.peek(n, low)) / 2.0)
+        tenkan, kijun, span_b = mids
+        span_a = (tenkan + kijun) / 2.0
+        shifted = self.spans.oldest() if n >= self.kijun_period else (None, None)
+        if commit:
+            self.spans.push((span_a, span_b))
+        return tenkan, kijun, shifted[0], shifted[1], span_a, span_b, close
+
+    def _batch(self, highs, lows, closes):
+        count = len(closes)
+        mids = []
+        for highest, lowest in self.windows:
+            mids.append((rolling_extreme(highs, highest.period, True) + rolling_extreme(lows, lowest.period, False)) / 2.0)
+            highest.load(highs[-highest.period:].tolist(), count)
+            lowest.load(lows[-lowest.period:].tolist(), count)
+        tenkan, kijun, span_b = mids
+        span_a = (tenkan + kijun) / 2.0
+        shift = self.kijun_period
+        senkou_a, senkou_b = empty(count), empty(count)
+        senkou_a[shift:], senkou_b[shift:] = span_a[:-shift], span_b[:-shift]
+        self.spans.load(list(zip(span_a[-shift:].tolist(), span_b[-shift:].tolist())), count)
+        self.count = count
+        return tenkan, kijun, senkou_a, senkou_b, span_a, span_b, closes.copy()
+
+
+class ParabolicSAR(Indicator):
+    """iSAR(step, maximum), following ParabolicSAR.mq5 bar by bar"""
+
+    def __init__(self, step=0.02, maximum=0.2):
+        super().__init__()
+        self.step = step
+        self.maximum = maximum
+        self.state = None  # (next sar, ep, af, long, prev high, prev low, high/low since last reversal)
+
+    def _step(self, inputs, commit):
+        high, low, _ = inputs
+        n = self.count
+        step, maximum = self.step, self.maximum
+
+        if n == 0:
+            if commit:
+                # SAR[0] = high[0]; SAR[1] is set once bar 1 is known
+                self.state = (None, low, step, False, high, low, high, low)
+            return high
+
+        sar, ep, af, is_long, prev_high, prev_low, run_high, run_low = self.state
+        run_high, run_low = max(run_high, high), min(run_low, low)
+        if n == 1:
+            sar, ep = run_high, low
+
+        reversed_now = False
+        if is_long and sar > low:
+            is_long, sar, ep, af, reversed_now = False, run_high, low, step, True
+        elif not is_long and sar < high:
+            is_long, sar, ep, af, reversed_now = True, run_low, high, step, True
+        value = sar
+
+        if is_long:
+            if high > ep and not reversed_now:
+                ep, af = high, min(af + step, maximum)
+            next_sar = sar + af * (ep - sar)
+            if next_sar > low or next_sar > prev_low:
+                next_sar = min(low, prev_low)
+        else:
+            if low < ep and not reversed_now:
+                ep, af = low, min(af + step, maximum)
+            next_sar = sar + af * (ep - sar)
+            if next_sar < high or next_sar < prev_high:
+                next_sar = max(high, prev_high)
+
+        if reversed_now:
+            # GetHigh/GetLow restart from the reversal bar
+            run_high, run_low = high, low
+        if commit:
+            self.state = (next_sar, ep, af, is_long, high, low, run_high, run_low)
+        return value
+
+
+class ADX(Indicator):
+    """iADX(period): EMA-smoothed +DI/-DI and DX, as in ADX.mq5"""
+    buffers = ('adx', 'plus_di', 'minus_di')
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.alpha = 2.0 / (period + 1.0)
+        self.prev = None          # (high, low, close)
+        self.values = (0.0, 0.0, 0.0)
+
+    def _ema(self, price, prev):
+        return price * self.alpha + prev * (1.0 - self.alpha)
+
+    def _step(self, inputs, commit):
+        high, low, close = inputs
+        if self.count == 0:
+            if commit:
+                self.prev = inputs
+            return None, None, None
+
+        prev_high, prev_low, prev_close = self.prev
+        up = high - prev_high
+        down = prev_low - low
+        up = up if up > 0 else 0.0
+        down = down if down > 0 else 0.0
+        if up > down:
+            down = 0.0
+        elif up < down:
+            up = 0.0
+        else:
+            up = down = 0.0
+
+        true_range = max(max(abs(high - low), abs(high - prev_close)), abs(low - prev_close))
+        pd = 100.0 * up / true_range if true_range != 0.0 else 0.0
+        nd = 100.0 * down / true_range if true_range != 0.0 else 0.0
+
+        adx, plus_di, minus_di = self.values
+        plus_di = self._ema(pd, plus_di)
+        minus_di = self._ema(nd, minus_di)
+        total = plus_di + minus_di
+        dx = 100.0 * abs(plus_di - minus_di) / total if total != 0.0 else 0.0
+        adx = self._ema(dx, adx)
+
+        if commit:
+            self.prev = inputs
+            self.values = (adx, plus_di, minus_di)
+        return adx, plus_di, minus_di
+
+    def _batch(self, highs, lows, closes):
+        count = len(closes)
+        adx, plus_di, minus_di = empty(count), empty(count), empty(count)
+        up = np.maximum(highs[1:] - highs[:-1], 0.0)
+        down = np.maximum(lows[:-1] - lows[1:], 0.0)
+        up, down = np.where(up > down, up, 0.0), np.where(down > up, down, 0.0)
+        prev_closes = closes[:-1]
+        true_range = np.maximum(np.maximum(np.abs(highs[1:] - lows[1:]), np.abs(highs[1:] - prev_closes)),
+                                np.abs(lows[1:] - prev_closes))
+        factor = 1.0 - self.alpha
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pd = np.where(true_range != 0.0, 100.0 * up / true_range, 0.0)
+            nd = np.where(true_range != 0.0, 100.0 * down / true_range, 0.0)
+            plus_di[1:] = linear_recurrence(pd * self.alpha, factor, 0.0)
+            minus_di[1:] = linear_recurrence(nd * self.alpha, factor, 0.0)
+            total = plus_di[1:] + minus_di[1:]
+            dx = np.where(total != 0.0, 100.0 * np.abs(plus_di[1:] - minus_di[1:]) / total, 0.0)
+        adx[1:] = linear_recurrence(dx * self.alpha, factor, 0.0)
+        if count > 1:
+            self.values = (float(adx[-1]), float(plus_di[-1]), float(minus_di[-1]))
+        self.prev = (float(highs[-1]), float(lows[-1]), float(closes[-1]))
+        self.count = count
+        return adx, plus_di, minus_di
+
+
+#=============================================================================
+# Registry, batch mode, verification
+#=============================================================================
+# name -> (class, inputs taken from a bar)
+INDICATORS = {
+    'ma': (MovingAverage, 'price'),
+    'rsi': (RSI, 'price'),
+    'macd': (MACD, 'price'),
+    'bands': (Bands, 'price'),
+    'stochastic': (Stochastic, 'hlc'),
+    'atr': (ATR, 'hlc'),
+    'wpr': (WPR, 'hlc'),
+    'keltner': (Keltner, 'hlc'),
+    'ichimoku': (Ichimoku, 'hlc'),
+    'sar': (ParabolicSAR, 'hlc'),
+    'adx': (ADX, 'hlc'),
+}
+
+
+def batch(indicator, *series):
+    """
+    Run an indicator over whole series (price, or high/low/close sequences).
+    Returns a float array for single-buffer indicators, otherwise
+    {buffer: array}, with NaN where push() returns None. A fresh indicator
+    uses its array form; one that has already been pushed (or has no array
+    form) is pushed bar by bar. Either way it can push() the next bar after.
+    """
+    if np is None:
+        raise SystemExit("indicators.py batch() needs numpy: pip install numpy")
+    arrays = [np.asarray(values, dtype=float) for values in series]
+    columns = indicator._batch(*arrays) if indicator.count == 0 and len(arrays[0]) else None
+    if columns is None:
+        push = indicator.push
+        rows = [push(*inputs) for inputs in zip(*(array.tolist() for array in arrays))]
+        columns = np.array(rows, dtype=float).reshape(len(rows), len(indicator.buffers)).T
+    if len(indicator.buffers) == 1:
+        return columns[0]
+    return dict(zip(indicator.buffers, columns))
+
+
+def make_indicator(name, params):
+    cls, _ = INDICATORS[name]
+    return cls(*params)
+
+
+def read_export(path):
+    """Read a terminal export: columns time/open/high/low/close plus one column per buffer"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        rows = list(csv.DictReader(f, dialect=dialect))
+    return [{key.strip().lower(): value.strip() for key, value in row.items() if key} for row in rows]
+
+
+def verify(path, name, params, tolerance):
+    indicator = make_indicator(name, params)
+    rows = read_export(path)
+    shape = INDICATORS[name][1]
+    worst = {buffer: 0.0 for buffer in indicator.buffers}
+    compared = 0
+
+    for row in rows:
+        high, low, close = float(row['high']), float(row['low']), float(row['close'])
+        result = indicator.push(close) if shape == 'price' else indicator.push(high, low, close)
+        result = result if isinstance(result, tuple) else (result,)
+        for buffer, ours in zip(indicator.buffers, result):
+            theirs = row.get(buffer)
+            if ours is None or theirs in (None, '') or abs(float(theirs)) >= EMPTY_VALUE / 2:
+                continue
+            worst[buffer] = max(worst[buffer], abs(ours - float(theirs)))
+            compared += 1
+
+    ok = all(diff <= tolerance for diff in worst.values())
+    for buffer, diff in worst.items():
+        print(f"  {buffer:16s} max |diff| = {diff:.3e}")
+    print(f"{'OK' if ok else 'MISMATCH'}: {name}{tuple(params)} over {len(rows)} bars, {compared} values compared")
+    return ok
+
+
+def random_walk(bars, seed=1):
+    rng = random.Random(seed)
+    price = 1.1
+    highs, lows, closes = [], [], []
+    for _ in range(bars):
+        open_ = price
+        price += rng.gauss(0, 0.0005)
+        highs.append(max(open_, price) + abs(rng.gauss(0, 0.0002)))
+        lows.append(min(open_, price) - abs(rng.gauss(0, 0.0002)))
+        closes.append(price)
+    return highs, lows, closes
+
+
+def bench(bars, push_bars=200000):
+    highs, lows, closes = random_walk(bars)
+    print(f"{'indicator':12s} {'batch bars/s':>14s} {'push bars/s':>14s}")
+    for name, (cls, shape) in INDICATORS.items():
+        series = [closes] if shape == 'price' else [highs, lows, closes]
+        arrays = [np.asarray(values) for values in series]
+        started = time.perf_counter()
+        batch(cls(), *arrays)
+        batch_rate = bars / (time.perf_counter() - started)
+
+        push = cls().push
+        inputs = list(zip(*(values[:push_bars] for values in series)))
+        started = time.perf_counter()
+        for bar in inputs:
+            push(*bar)
+        push_rate = len(inputs) / (time.perf_counter() - started)
+        print(f"{name:12s} {batch_rate:14,.0f} {push_rate:14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming MetaTrader indicators")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_verify = sub.add_parser("verify", help="Compare against buffers exported from the terminal")
+    p_verify.add_argument("export", help="CSV with time,open,high,low,close and one column per buffer")
+    p_verify.add_argument("--indicator", required=True, choices=sorted(INDICATORS))
+    p_verify.add_argument("--params", default="", help="Comma-separated constructor arguments, e.g. 5,3,3")
+    p_verify.add_argument("--tolerance", type=float, default=1e-8, help="Max abs difference (exports are usually printed with 8 digits)")
+
+    p_bench = sub.add_parser("bench", help="Measure batch and push() throughput on a synthetic series")
+    p_bench.add_argument("--bars", type=int, default=1000000)
+
+    args = parser.parse_args()
+    if args.command == "verify":
+        params = [float(part) if '.' in part else int(part) for part in args.params.split(',') if part.strip()]
+        raise SystemExit(0 if verify(args.export, args.indicator, params, args.tolerance) else 1)
+    bench(args.bars)
+
+
+if __name__ == "__main__":
+    main()
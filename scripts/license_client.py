@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Asyncio license client for Python bots and monitors.
+
+Follows the same contract as the embedded MQL validator
+(ValidateLicense/PeriodicLicenseCheck in LICENSE_VALIDATOR_CODE): POST the
+{accountNumber, brokerName, eaCode, eaVersion, terminalType} JSON body to
+/api/validate with the key in X-API-Key, revalidate every
+LICENSE_CHECK_INTERVAL seconds and keep the last result for
+LICENSE_GRACE_PERIOD seconds while the server is unreachable.
+
+One LicenseClient serves any number of LicenseSessions:
+  - connections are pooled and kept alive (aiohttp when installed,
+    http.client on worker threads otherwise)
+  - concurrent checks of the same (key, eaCode, account) share one request
+  - results are cached for the check interval, so sessions of the same
+    license only cost one request per interval
+  - a 429 blocks the key until its retryAfter has passed; sessions ride on
+    their grace period instead of adding to the rate limit
+
+Unlike the EA, 429 and 5xx responses count as "server unreachable" rather
+than as a failed license, so a rate limit never revokes running sessions.
+
+Usage:
+    python3 scripts/license_client.py --key LICENSE_KEY --ea stochastic_scalper_ea \\
+        --account 12345678 [--account 87654321] [--broker "Broker Ltd"] [--sessions 1000]
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import time
+import urllib.parse
+
+LICENSE_API_URL = "https://myalgostack.com/api/validate"
+LICENSE_CHECK_INTERVAL = 43200  # Check every 12 hours (in seconds)
+LICENSE_GRACE_PERIOD = 86400    # 24 hours grace if server unreachable
+REQUEST_TIMEOUT = 10            # WebRequest timeout in the EAs
+MIN_KEY_LENGTH = 10
+NEGATIVE_TTL = 300              # Rejections are re-checked sooner than approvals
+POOL_SIZE = 8
+DEFAULT_RETRY_AFTER = 60
+
+
+class Validation:
+    """Outcome of one /api/validate call (or of a call that never reached the server)"""
+
+    __slots__ = ('valid', 'reachable', 'message', 'error_code', 'status', 'checked_at')
+
+    def __init__(self, valid, reachable, message="", error_code=None, status=None, checked_at=None):
+        self.valid = valid
+        self.reachable = reachable
+        self.message = message
+        self.error_code = error_code
+        self.status = status
+        self.checked_at = time.monotonic() if checked_at is None else checked_at
+
+    def __repr__(self):
+        return (f"Validation(valid={self.valid}, reachable={self.reachable}, "
+                f"status={self.status}, error_code={self.error_code!r}, message={self.message!r})")
+
+
+class HttpClientTransport:
+    """Keep-alive http.client connections, each request on a worker thread"""
+
+    errors = (OSError, http.client.HTTPException)
+
+    def __init__(self, url, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path = f"{self.path}?{parts.query}"
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(pool_size)
+        self.idle = []
+
+    def _send(self, connection, headers, body):
+        connection.request('POST', self.path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read(), response.will_close
+
+    async def post(self, headers, body):
+        async with self.slots:
+            reused = bool(self.idle)
+            connection = self.idle.pop() if reused else self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                status, data, will_close = await asyncio.to_thread(self._send, connection, headers, body)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a new one
+                connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+                try:
+                    status, data, will_close = await asyncio.to_thread(self._send, connection, headers, body)
+                except BaseException:
+                    connection.close()
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+            if will_close:
+                connection.close()
+            else:
+                self.idle.append(connection)
+        return status, data
+
+    async def close(self):
+        while self.idle:
+            self.idle.pop().close()
+
+
+class AiohttpTransport:
+    """aiohttp session with a bounded connection pool"""
+
+    def __init__(self, url, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        import aiohttp
+        self.aiohttp = aiohttp
+        self.errors = (OSError, aiohttp.ClientError)
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+
+    async def post(self, headers, body):
+        if self.session is None:
+            self.session = self.aiohttp.ClientSession(
+                connector=self.aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=self.aiohttp.ClientTimeout(total=self.timeout))
+        async with self.session.post(self.url, data=body, headers=headers) as response:
+            return response.status, await response.read()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def make_transport(kind, url, pool_size, timeout):
+    if kind in ('auto', 'aiohttp'):
+        try:
+            return AiohttpTransport(url, pool_size, timeout)
+        except ImportError:
+            if kind == 'aiohttp':
+                raise SystemExit("The aiohttp transport needs aiohttp: pip install aiohttp")
+    return HttpClientTransport(url, pool_size, timeout)
+
+
+def parse_response(status, data):
+    """Turn an HTTP response into a Validation, mirroring how the EAs read it"""
+    try:
+        payload = json.loads(data.decode('utf-8', errors='ignore'))
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return Validation(False, False, f"Unexpected response from license server (HTTP {status})", status=status)
+
+    message = payload.get('message') or ""
+    error_code = payload.get('errorCode')
+    if status == 429 or status >= 500:
+        return Validation(False, False, message or f"License server error (HTTP {status})", error_code, status)
+    if payload.get('valid') is True:
+        return Validation(True, True, message, error_code, status)
+    return Validation(False, True, message or "License validation failed. Check your License Key.", error_code, status)
+
+
+class LicenseClient:
+    """Shared transport, cache and request coalescing for many license sessions"""
+
+    def __init__(self, api_url=LICENSE_API_URL, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 check_interval=LICENSE_CHECK_INTERVAL, grace_period=LICENSE_GRACE_PERIOD,
+                 negative_ttl=NEGATIVE_TTL, transport='auto'):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.grace_period = grace_period
+        self.negative_ttl = negative_ttl
+        self.transport = make_transport(transport, api_url, pool_size, timeout) if isinstance(transport, str) else transport
+        self.cache = {}      # (key, eaCode, account) -> last authoritative Validation
+        self.inflight = {}   # (key, eaCode, account) -> Task of the request in progress
+        self.blocked = {}    # key -> monotonic time its rate limit lifts
+        self.stats = {'requests': 0, 'cached': 0, 'coalesced': 0, 'rate_limited': 0, 'failed': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        for task in list(self.inflight.values()):
+            task.cancel()
+        await self.transport.close()
+
+    def ttl(self, result):
+        return self.check_interval if result.valid else self.negative_ttl
+
+    def session(self, license_key, ea_code, account_number, broker_name="", ea_version="1.0.0", terminal_type="MT5"):
+        return LicenseSession(self, license_key, ea_code, account_number, broker_name, ea_version, terminal_type)
+
+    async def validate(self, license_key, ea_code, account_number, broker_name="", ea_version="1.0.0",
+                       terminal_type="MT5", max_age=None):
+        """Validate one license, answering from the cache or an in-flight request when possible"""
+        cache_key = (license_key, ea_code, str(account_number))
+        now = time.monotonic()
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            age = now - cached.checked_at
+            if age < self.ttl(cached) and (max_age is None or age < max_age):
+                self.stats['cached'] += 1
+                return cached
+
+        pending = self.inflight.get(cache_key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        blocked_until = self.blocked.get(license_key, 0)
+        if blocked_until > now:
+            self.stats['rate_limited'] += 1
+            return Validation(False, False, f"Rate limit exceeded. Retrying in {int(blocked_until - now) + 1}s",
+                              "RATE_LIMIT_EXCEEDED", 429, now)
+
+        body = json.dumps({
+            'accountNumber': str(account_number),
+            'brokerName': broker_name,
+            'eaCode': ea_code,
+            'eaVersion': ea_version,
+            'terminalType': terminal_type,
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'X-API-Key': license_key}
+
+        # The request runs as its own task and every caller, this one included, waits through
+        # shield(): cancelling one caller must not cancel the answer the others are waiting for
+        pending = asyncio.ensure_future(self._fetch(cache_key, license_key, headers, body))
+        pending.add_done_callback(lambda task: task.cancelled() or task.exception())  # retrieved if nobody waits
+        self.inflight[cache_key] = pending
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, cache_key, license_key, headers, body):
+        try:
+            result = await self._request(license_key, headers, body)
+            if result.reachable:
+                self.cache[cache_key] = result
+            return result
+        finally:
+            del self.inflight[cache_key]
+
+    async def _request(self, license_key, headers, body):
+        self.stats['requests'] += 1
+        try:
+            status, data = await asyncio.wait_for(self.transport.post(headers, body), self.timeout)
+        except (asyncio.TimeoutError, *self.transport.errors) as e:
+            self.stats['failed'] += 1
+            return Validation(False, False, f"Server connection failed. Error: {e or type(e).__name__}")
+
+        result = parse_response(status, data)
+        if status == 429:
+            try:
+                retry_after = int(json.loads(data).get('retryAfter') or DEFAULT_RETRY_AFTER)
+            except (ValueError, AttributeError):
+                retry_after = DEFAULT_RETRY_AFTER
+            self.blocked[license_key] = time.monotonic() + max(retry_after, 1)
+        elif not result.reachable:
+            self.stats['failed'] += 1
+        return result
+
+    def prune(self):
+        """Drop cache entries past any session's grace period"""
+        horizon = time.monotonic() - max(self.check_interval, self.grace_period)
+        for key in [key for key, result in self.cache.items() if result.checked_at < horizon]:
+            del self.cache[key]
+        now = time.monotonic()
+        for key in [key for key, until in self.blocked.items() if until <= now]:
+            del self.blocked[key]
+
+    async def check_all(self, sessions):
+        """PeriodicLicenseCheck for every session; returns the sessions that are no longer licensed"""
+        results = await asyncio.gather(*(session.periodic_check() for session in sessions))
+        return [session for session, licensed in zip(sessions, results) if not licensed]
+
+    async def watch(self, sessions, on_revoked, poll_interval=60):
+        """Run PeriodicLicenseCheck for all sessions every poll_interval seconds until cancelled.
+
+        on_revoked(session) is called once for each session that loses its license
+        (the equivalent of ExpertRemove in the EAs) and the session is dropped.
+        """
+        sessions = list(sessions)
+        while sessions:
+            revoked = await self.check_all(sessions)
+            for session in revoked:
+                on_revoked(session)
+            if revoked:
+                gone = set(map(id, revoked))
+                sessions = [session for session in sessions if id(session) not in gone]
+            self.prune()
+            await asyncio.sleep(poll_interval)
+
+
+class LicenseSession:
+    """Per-bot license state, the Python side of g_isLicensed/g_lastValidation/g_licenseError"""
+
+    def __init__(self, client, license_key, ea_code, account_number, broker_name="", ea_version="1.0.0",
+                 terminal_type="MT5"):
+        self.client = client
+        self.license_key = license_key
+        self.ea_code = ea_code
+        self.account_number = str(account_number)
+        self.broker_name = broker_name
+        self.ea_version = ea_version
+        self.terminal_type = terminal_type
+        self.is_licensed = False
+        self.last_validation = None
+        self.error = ""
+
+    def __repr__(self):
+        return f"LicenseSession({self.ea_code}, account={self.account_number}, licensed={self.is_licensed})"
+
+    async def validate(self, max_age=None):
+        """ValidateLicense(): ask the server, falling back on the grace period when it can't be reached"""
+        if len(self.license_key) < MIN_KEY_LENGTH:
+            self.error = "Invalid License Key. Get your key from the dashboard."
+            return False
+
+        result = await self.client.validate(self.license_key, self.ea_code, self.account_number,
+                                            self.broker_name, self.ea_version, self.terminal_type, max_age)
+        if not result.reachable:
+            self.error = result.message
+            if self.last_validation is not None and time.monotonic() - self.last_validation < self.client.grace_period:
+                return self.is_licensed
+            return False
+
+        if not result.valid:
+            self.error = result.message
+        # Adopt the time of the (possibly shared) result so sessions of one license revalidate together
+        self.last_validation = result.checked_at
+        self.is_licensed = result.valid
+        return result.valid
+
+    async def periodic_check(self):
+        """PeriodicLicenseCheck(): revalidate once the check interval has passed"""
+        if not self.is_licensed:
+            return False
+        if time.monotonic() - self.last_validation < self.client.check_interval:
+            return True
+        return await self.validate(max_age=self.client.check_interval)
+
+
+async def run_check(args):
+    async with LicenseClient(args.url, pool_size=args.pool_size, transport=args.transport) as client:
+        sessions = [client.session(args.key, args.ea, account, args.broker, args.ea_version, args.terminal)
+                    for account in args.account for _ in range(args.sessions)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(session.validate() for session in sessions))
+        elapsed = time.perf_counter() - start
+
+        for account in args.account:
+            session = next(s for s in sessions if s.account_number == account)
+            status = "VALID" if session.is_licensed else f"INVALID - {session.error}"
+            print(f"{args.ea} @ {account}: {status}")
+        stats = client.stats
+        print(f"\n{len(sessions)} sessions, {sum(results)} licensed in {elapsed:.2f}s: "
+              f"{stats['requests']} requests, {stats['coalesced']} coalesced, {stats['cached']} cached, "
+              f"{stats['rate_limited']} rate limited, {stats['failed']} failed "
+              f"({type(client.transport).__name__})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate EA licenses against /api/validate")
+    parser.add_argument("--key", required=True, help="License key (X-API-Key)")
+    parser.add_argument("--ea", required=True, help="EA code, e.g. stochastic_scalper_ea")
+    parser.add_argument("--account", action="append", required=True, help="MT account number (repeatable)")
+    parser.add_argument("--broker", default="", help="Broker name")
+    parser.add_argument("--ea-version", default="1.0.0", help="EA version (default: 1.0.0)")
+    parser.add_argument("--terminal", choices=["MT4", "MT5"], default="MT5", help="Terminal type (default: MT5)")
+    parser.add_argument("--url", default=LICENSE_API_URL, help=f"Validation endpoint (default: {LICENSE_API_URL})")
+    parser.add_argument("--sessions", type=int, default=1, help="Concurrent sessions per account (default: 1)")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help=f"Pooled connections (default: {POOL_SIZE})")
+    parser.add_argument("--transport", choices=["auto", "aiohttp", "stdlib"], default="auto",
+                        help="HTTP transport (default: aiohttp if installed)")
+    args = parser.parse_args()
+
+    asyncio.run(run_check(args))
+
+
+if __name__ == "__main__":
+    main()
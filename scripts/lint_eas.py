@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Check the EA sources for the invariants the transform scripts rely on.
+
+  property-strict          #property strict is present (update_mql5_license.py
+                           inserts the license block after it)
+  input-declared           MagicNumber, LotSize and StopLoss are declared as
+                           inputs wherever the code uses them (GetLotSize,
+                           ManagePositions and the injected lot logic
+                           reference them by name)
+  request-volume           MQL5: every OrderSend of a TRADE_ACTION_DEAL or
+                           TRADE_ACTION_PENDING request assigns <request>.volume
+                           first (upgrade_ea_features.py rewrites that line)
+  manage-positions-early   ManagePositions() is called within the first
+                           500 characters of OnTick, the window the upgrade
+                           scripts check before injecting the call again
+
+Each #include <EALicense/...> file (see find_duplicate_blocks.py
+--extract) is checked in place of its directive, as the compiler sees it;
+findings inside one are reported on the #include line.
+
+Each file is parsed once (masked text and function table) and every rule
+runs on that parse. Results are cached in .lint_cache.json by content hash,
+keyed on the linter, mql_source.py and the EALicense include files, so a
+warm run only stats the files. Cache misses are linted in parallel.
+
+Usage:
+    python3 scripts/lint_eas.py [--jobs N] [--no-cache] [FILE ...]
+
+As a pre-commit hook (.git/hooks/pre-commit):
+    git diff --cached --name-only --diff-filter=ACM -- '*.mq4' '*.mq5' | xargs -r python3 scripts/lint_eas.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import mql_source
+
+CACHE_PATH = os.path.join(mql_source.REPO_ROOT, ".lint_cache.json")
+REQUIRED_INPUTS = ['MagicNumber', 'LotSize', 'StopLoss']
+MANAGE_POSITIONS_WINDOW = 500  # Same window as upgrade_ea_features.py
+PARALLEL_THRESHOLD = 8
+
+PROPERTY_STRICT_PATTERN = re.compile(r'^[ \t]*#property[ \t]+strict\b', re.MULTILINE)
+INPUT_DECLARATION_PATTERN = re.compile(r'^[ \t]*s?input\s+\w+\s+(?P<name>\w+)', re.MULTILINE)
+ORDER_SEND_PATTERN = re.compile(r'\bOrderSend\s*\(\s*(?P<request>\w+)\s*,')
+MANAGE_POSITIONS_CALL_PATTERN = re.compile(r'\bManagePositions\s*\(\s*\)\s*;')
+OPENING_ACTIONS = ('TRADE_ACTION_DEAL', 'TRADE_ACTION_PENDING')
+
+
+class SourceFile:
+    """
+    The shared parse of one EA: masked text, inputs and top-level functions.
+
+    The text has the EALicense includes expanded in place, and offsets
+    (`masked`, `functions`) refer to it; line() maps them back to the file.
+    """
+
+    def __init__(self, path, content):
+        self.path = path
+        self.content = content
+        self.dialect = mql_source.dialect_of(path)
+        text, self.spans = mql_source.expand_shared_includes(content, self.dialect)
+        self.masked = mql_source.code_mask(text)
+        self.inputs = {match.group('name') for match in INPUT_DECLARATION_PATTERN.finditer(self.masked)}
+        self.functions = {}
+        for function in mql_source.find_functions(text, self.masked):
+            self.functions.setdefault(function['name'], function)
+
+    def provides(self, name):
+        return name in self.functions
+
+    def line(self, offset):
+        return mql_source.line_of(self.content, mql_source.source_offset(self.spans, offset))
+
+
+#=============================================================================
+# Rules: each yields (offset, message)
+#=============================================================================
+def check_property_strict(source):
+    if not PROPERTY_STRICT_PATTERN.search(source.masked):
+        yield 0, "missing #property strict"
+
+
+def check_input_declared(source):
+    for name in REQUIRED_INPUTS:
+        if name in source.inputs:
+            continue
+        reference = re.search(rf'\b{name}\b', source.masked)
+        if reference:
+            yield reference.start(), f"{name} is used but not declared as an input"
+
+
+def check_request_volume(source):
+    if source.dialect != 'mql5':
+        return
+    for function in source.functions.values():
+        body = source.masked[function['start']:function['end']]
+        for call in ORDER_SEND_PATTERN.finditer(body):
+            request = call.group('request')
+            before = body[:call.start()]
+            actions = re.findall(rf'\b{request}\s*\.\s*action\s*=\s*(\w+)', before)
+            if not actions or actions[-1] not in OPENING_ACTIONS:
+                continue
+            volume = [m.start() for m in re.finditer(rf'\b{request}\s*\.\s*volume\s*=[^=]', before)]
+            reset = [m.start() for m in re.finditer(rf'\bZeroMemory\s*\(\s*{request}\s*\)', before)]
+            if not volume or (reset and reset[-1] > volume[-1]):
+                yield function['start'] + call.start(), \
+                    f"OrderSend({request}, ...) in {function['name']}() without {request}.volume assigned"
+
+
+def check_manage_positions_early(source):
+    if not source.provides('ManagePositions'):
+        return
+    on_tick = source.functions.get('OnTick')
+    if on_tick is None:
+        defined = source.functions.get('ManagePositions')
+        yield defined['start'] if defined else 0, "ManagePositions() is defined but there is no OnTick()"
+        return
+    body_start = source.masked.index('{', on_tick['start']) + 1
+    window = source.masked[body_start:body_start + MANAGE_POSITIONS_WINDOW]
+    if not MANAGE_POSITIONS_CALL_PATTERN.search(window):
+        yield on_tick['start'], (f"OnTick() does not call ManagePositions() in its first "
+                                 f"{MANAGE_POSITIONS_WINDOW} characters")
+
+
+RULES = [
+    ('property-strict', check_property_strict),
+    ('input-declared', check_input_declared),
+    ('request-volume', check_request_volume),
+    ('manage-positions-early', check_manage_positions_early),
+]
+
+
+def lint_source(path, content):
+    """Return sorted [line, rule, message] findings for one file"""
+    source = SourceFile(path, content)
+    findings = []
+    for rule, check in RULES:
+        for offset, message in check(source):
+            findings.append([source.line(offset), rule, message])
+    return sorted(findings)
+
+
+def lint_file(path):
+    """Worker: read, hash and lint one file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return path, hashlib.sha256(data).hexdigest(), lint_source(path, data.decode('utf-8', errors='ignore'))
+
+
+#=============================================================================
+# Cache
+#=============================================================================
+def rules_hash():
+    """Changing the linter, the shared parser or an EALicense include invalidates every cached result"""
+    digest = hashlib.sha256()
+    paths = [os.path.abspath(__file__), os.path.abspath(mql_source.__file__)] + mql_source.shared_include_files()
+    for module_path in paths:
+        digest.update(module_path.encode('utf-8'))
+        with open(module_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_cache(path, version):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('rulesHash') != version:
+        return {'rulesHash': version, 'files': {}, 'results': {}}
+    return cache
+
+
+def save_cache(path, cache):
+    live = {f"{mql_source.dialect_of(rel)}:{entry[2]}" for rel, entry in cache['files'].items()}
+    cache['results'] = {key: value for key, value in cache['results'].items() if key in live}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def lint(paths, jobs=None, use_cache=True, cache_path=CACHE_PATH):
+    """Return ({path: findings}, number of files answered from the cache)"""
+    cache = load_cache(cache_path, rules_hash()) if use_cache else {'files': {}, 'results': {}}
+    results = {}
+    misses = []
+    hits = 0
+    for path in paths:
+        rel = os.path.relpath(path, mql_source.REPO_ROOT)
+        stat = os.stat(path)
+        known = cache['files'].get(rel)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            digest = known[2]
+        else:
+            digest = file_hash(path)
+            cache['files'][rel] = [stat.st_size, stat.st_mtime_ns, digest]
+        key = f"{mql_source.dialect_of(path)}:{digest}"
+        if key in cache['results']:
+            results[path] = cache['results'][key]
+            hits += 1
+        else:
+            misses.append(path)
+
+    if len(misses) > PARALLEL_THRESHOLD and jobs != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            linted = list(pool.map(lint_file, misses, chunksize=4))
+    else:
+        linted = [lint_file(path) for path in misses]
+
+    for path, digest, findings in linted:
+        results[path] = findings
+        stat = os.stat(path)
+        cache['files'][os.path.relpath(path, mql_source.REPO_ROOT)] = [stat.st_size, stat.st_mtime_ns, digest]
+        cache['results'][f"{mql_source.dialect_of(path)}:{digest}"] = findings
+
+    if use_cache and (misses or len(cache['files']) != hits):
+        save_cache(cache_path, cache)
+    return results, hits
+
+
+def main():
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Check EA sources for pipeline invariants")
+    parser.add_argument("files", nargs="*", help="Files to check (default: every EA in both dialects)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers for uncached files (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update .lint_cache.json")
+    args = parser.parse_args()
+
+    if args.files:
+        paths = [os.path.abspath(path) for path in args.files
+                 if path.endswith(('.mq4', '.mq5')) and os.path.basename(os.path.dirname(os.path.abspath(path))) == "Experts"]
+    else:
+        paths = mql_source.list_sources('mql5') + mql_source.list_sources('mql4')
+
+    results, hits = lint(paths, args.jobs, not args.no_cache)
+
+    count = 0
+    for path in paths:
+        rel = os.path.relpath(path, mql_source.REPO_ROOT)
+        for line, rule, message in results[path]:
+            print(f"{rel}:{line}: [{rule}] {message}")
+            count += 1
+    print(f"{len(paths)} files, {count} findings ({hits} cached) in "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms", file=sys.stderr)
+    return 1 if count else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar store for broker bar and tick history.
+
+Broker CSV exports are converted once into one fixed-width binary file per
+column, laid out as:
+
+    <store>/<SYMBOL>/<TIMEFRAME>/<column>.bin   (TIMEFRAME is M1..MN1 or TICK)
+    <store>/<SYMBOL>/<TIMEFRAME>/meta.json      dtypes, row count, first/last time
+
+Readers np.memmap the column files read-only, so a date range is a
+searchsorted on the sorted time column followed by slicing: the returned
+arrays are views into the page cache, shared by every process reading the
+same symbol. The row count in meta.json is the commit point. Imports append
+to the column files first and rewrite meta.json last, so a concurrent
+reader never sees a half-written row.
+
+Other timeframes are resampled on the fly with reduceat over bucket
+boundaries, from the coarsest stored timeframe that divides them (fewest
+rows to aggregate: H4 from H1 rather than M1), or from ticks. MN1 is only
+built from D1 or finer, since weeks straddle month boundaries.
+
+MT5 tick exports leave BID/ASK/LAST blank when they did not change, so
+imports forward-fill them from the previous tick (across chunks and from
+the last stored tick) before anything is written.
+
+Supported CSV layouts (detected from the first line):
+  - MT5 bars:  <DATE> <TIME> <OPEN> <HIGH> <LOW> <CLOSE> <TICKVOL> <VOL> <SPREAD>
+  - MT5 ticks: <DATE> <TIME> <BID> <ASK> <LAST> <VOLUME> <FLAGS>
+  - MT4 history: 2024.01.02,00:00,open,high,low,close,volume (no header)
+
+Needs numpy.
+
+Usage:
+    python3 scripts/market_data.py import EURUSD M1 EURUSD_M1.csv [--store DIR]
+    python3 scripts/market_data.py info [--store DIR]
+    python3 scripts/market_data.py show EURUSD H4 --from 2024-01-01 --to 2024-02-01
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("market_data.py needs numpy: pip install numpy")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE = os.path.join(REPO_ROOT, ".market_data")
+
+CHUNK_LINES = 500000
+
+TIMEFRAMES = {
+    'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H4': 14400, 'D1': 86400, 'W1': 604800, 'MN1': None,
+}
+# MetaTrader weeks start on Sunday; the epoch (1970-01-01) is a Thursday
+WEEK_OFFSET = 4 * 86400
+
+BAR_COLUMNS = [
+    ('time', 'int64'),          # bar open time, epoch seconds
+    ('open', 'float64'),
+    ('high', 'float64'),
+    ('low', 'float64'),
+    ('close', 'float64'),
+    ('tick_volume', 'int64'),
+    ('real_volume', 'int64'),
+    ('spread', 'int32'),
+]
+
+# Quote columns MT5 leaves blank when unchanged; forward-filled on import
+QUOTE_COLUMNS = ('bid', 'ask', 'last')
+
+TICK_COLUMNS = [
+    ('time', 'int64'),          # epoch milliseconds
+    ('bid', 'float64'),
+    ('ask', 'float64'),
+    ('last', 'float64'),
+    ('volume', 'float64'),
+    ('flags', 'int32'),
+]
+
+
+def columns_for(timeframe):
+    return TICK_COLUMNS if timeframe == 'TICK' else BAR_COLUMNS
+
+
+#=============================================================================
+# CSV parsing
+#=============================================================================
+def parse_times(dates, times):
+    """'2024.01.02' + '13:45[:30[.250]]' -> epoch milliseconds (vectorized)"""
+    stamps = np.char.add(np.char.add(np.char.replace(np.asarray(dates), '.', '-'), 'T'), np.asarray(times))
+    return stamps.astype('datetime64[ms]').astype(np.int64)
+
+
+def detect_layout(first_line):
+    """Return (layout, delimiter, has_header)"""
+    delimiter = '\t' if '\t' in first_line else (',' if ',' in first_line else None)
+    fields = first_line.strip().split(delimiter)
+    if fields[0].startswith('<'):
+        names = [field.strip('<>').upper() for field in fields]
+        return ('mt5_ticks' if 'BID' in names else 'mt5_bars'), delimiter, True
+    if len(fields) >= 6 and re.match(r'\d{4}\.\d{2}\.\d{2}$', fields[0]):
+        return 'mt4_bars', delimiter, False
+    raise SystemExit(f"Unrecognised CSV layout: {first_line.strip()[:80]}")
+
+
+def float_column(rows, idx, blank='nan'):
+    return np.array([row[idx] if idx < len(row) and row[idx] else blank for row in rows], dtype=np.float64)
+
+
+def int_column(rows, idx, dtype):
+    return np.array([row[idx] if idx < len(row) and row[idx] else 0 for row in rows], dtype=np.float64).astype(dtype)
+
+
+def rows_to_columns(rows, layout):
+    """Convert split CSV rows to {column: array}"""
+    dates = [row[0] for row in rows]
+    clock = [row[1] for row in rows]
+    millis = parse_times(dates, clock)
+
+    if layout == 'mt5_ticks':
+        return {
+            'time': millis,
+            'bid': float_column(rows, 2),
+            'ask': float_column(rows, 3),
+            'last': float_column(rows, 4),
+            'volume': float_column(rows, 5, blank=0),
+            'flags': int_column(rows, 6, np.int32),
+        }
+
+    columns = {
+        'time': millis // 1000,
+        'open': float_column(rows, 2),
+        'high': float_column(rows, 3),
+        'low': float_column(rows, 4),
+        'close': float_column(rows, 5),
+        'tick_volume': int_column(rows, 6, np.int64),
+    }
+    if layout == 'mt5_bars':
+        columns['real_volume'] = int_column(rows, 7, np.int64)
+        columns['spread'] = int_column(rows, 8, np.int32)
+    else:
+        columns['real_volume'] = np.zeros(len(rows), dtype=np.int64)
+        columns['spread'] = np.zeros(len(rows), dtype=np.int32)
+    return columns
+
+
+def fill_forward(values, previous=np.nan):
+    """Replace NaNs with the last value before them; leading NaNs take previous"""
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    source = np.where(missing, 0, np.arange(len(values)))
+    np.maximum.accumulate(source, out=source)
+    filled = values[source]
+    # Rows before the first known value in this chunk
+    filled[np.isnan(filled) & (source == 0)] = previous
+    return filled
+
+
+def read_csv_chunks(path):
+    """Yield (layout, {column: array}) chunks of CHUNK_LINES rows"""
+    with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        first = f.readline()
+        layout, delimiter, has_header = detect_layout(first)
+        rows = [] if has_header else [first.strip().split(delimiter)]
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(line.split(delimiter))
+            if len(rows) >= CHUNK_LINES:
+                yield layout, rows_to_columns(rows, layout)
+                rows = []
+        if rows:
+            yield layout, rows_to_columns(rows, layout)
+
+
+#=============================================================================
+# Store
+#=============================================================================
+class MarketStore:
+    """Read/append access to a store directory"""
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+
+    def series_dir(self, symbol, timeframe):
+        return os.path.join(self.root, symbol.upper(), timeframe.upper())
+
+    def meta(self, symbol, timeframe):
+        path = os.path.join(self.series_dir(symbol, timeframe), 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_meta(self, symbol, timeframe, meta):
+        directory = self.series_dir(symbol, timeframe)
+        tmp_path = os.path.join(directory, 'meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+    def series(self):
+        """Return [(symbol, timeframe, meta)] for everything in the store"""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for symbol in sorted(os.listdir(self.root)):
+            symbol_dir = os.path.join(self.root, symbol)
+            if not os.path.isdir(symbol_dir):
+                continue
+            for timeframe in sorted(os.listdir(symbol_dir)):
+                meta = self.meta(symbol, timeframe)
+                if meta:
+                    result.append((symbol, timeframe, meta))
+        return result
+
+    #-------------------------------------------------------------------------
+    # Import
+    #-------------------------------------------------------------------------
+    def append(self, symbol, timeframe, columns):
+        """
+        Append rows newer than the stored last time. Returns the number of
+        rows written. Ticks at exactly the stored last time are kept unless
+        the same row is already stored (several ticks can share a
+        millisecond); a bar at that time is the stored bar and is dropped.
+        """
+        timeframe = timeframe.upper()
+        directory = self.series_dir(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        spec = columns_for(timeframe)
+        meta = self.meta(symbol, timeframe) or {
+            'symbol': symbol.upper(), 'timeframe': timeframe, 'rows': 0,
+            'columns': {name: dtype for name, dtype in spec}, 'first': None, 'last': None,
+        }
+
+        times = columns['time']
+        if len(times) > 1 and np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            columns = {name: values[order] for name, values in columns.items()}
+            times = columns['time']
+        if meta['last'] is not None:
+            start = int(np.searchsorted(times, meta['last'], side='left'))
+            end = int(np.searchsorted(times, meta['last'], side='right'))
+            keep = np.arange(end, len(times))
+            if timeframe == 'TICK' and end > start:
+                keep = np.concatenate((self.unstored_ticks(symbol, columns, start, end), keep))
+            columns = {name: values[keep] for name, values in columns.items()}
+            times = columns['time']
+        if not len(times):
+            return 0
+
+        # Truncate to the committed row count first, so a previously
+        # interrupted append cannot leave stray rows behind.
+        for name, dtype in spec:
+            path = os.path.join(directory, f"{name}.bin")
+            with open(path, 'ab') as f:
+                f.truncate(meta['rows'] * np.dtype(dtype).itemsize)
+                np.ascontiguousarray(columns[name], dtype=dtype).tofile(f)
+
+        meta['rows'] += len(times)
+        meta['first'] = int(times[0]) if meta['first'] is None else meta['first']
+        meta['last'] = int(times[-1])
+        self.write_meta(symbol, timeframe, meta)
+        return len(times)
+
+    def unstored_ticks(self, symbol, columns, start, end):
+        """Indexes in [start, end) of incoming ticks at the stored last time that are not stored rows already"""
+        stored = self.open_columns(symbol, 'TICK')
+        times = stored['time']
+        lo = int(np.searchsorted(times, times[-1], side='left'))
+        names = [name for name, _ in TICK_COLUMNS]
+        # Counted, so N identical ticks stored and N + 1 incoming keep one; NaN quotes compare equal as None
+        pending = Counter(row_key(stored[name][lo:] for name in names))
+        keep = []
+        for index, key in enumerate(row_key(np.asarray(columns[name][start:end], dtype=dtype)
+                                            for name, dtype in TICK_COLUMNS), start):
+            if pending[key]:
+                pending[key] -= 1
+            else:
+                keep.append(index)
+        return np.array(keep, dtype=np.int64)
+
+    def last_quotes(self, symbol):
+        """{column: value} of the last stored tick's bid/ask/last (NaN when nothing is stored)"""
+        columns = self.open_columns(symbol, 'TICK', QUOTE_COLUMNS)
+        if not columns or not len(columns['time']):
+            return {name: np.nan for name in QUOTE_COLUMNS}
+        return {name: float(columns[name][-1]) for name in QUOTE_COLUMNS}
+
+    def import_csv(self, symbol, timeframe, path):
+        written = 0
+        quotes = None
+        for layout, columns in read_csv_chunks(path):
+            if (layout == 'mt5_ticks') != (timeframe.upper() == 'TICK'):
+                raise SystemExit(f"{os.path.basename(path)} holds {'ticks' if layout == 'mt5_ticks' else 'bars'}, "
+                                 f"not {timeframe}")
+            if layout == 'mt5_ticks':
+                quotes = self.last_quotes(symbol) if quotes is None else quotes
+                for name in QUOTE_COLUMNS:
+                    columns[name] = fill_forward(columns[name], quotes[name])
+                    if len(columns[name]):
+                        quotes[name] = columns[name][-1]
+            written += self.append(symbol, timeframe, columns)
+        return written
+
+    #-------------------------------------------------------------------------
+    # Read
+    #-------------------------------------------------------------------------
+    def open_columns(self, symbol, timeframe, names=None):
+        """Read-only memmaps of the committed rows of a stored series"""
+        meta = self.meta(symbol, timeframe)
+        if meta is None:
+            return None
+        directory = self.series_dir(symbol, timeframe)
+        result = {}
+        for name, dtype in meta['columns'].items():
+            if names and name not in names and name != 'time':
+                continue
+            if meta['rows'] == 0:
+                result[name] = np.zeros(0, dtype=dtype)
+                continue
+            result[name] = np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode='r',
+                                     shape=(meta['rows'],))
+        return result
+
+    def resample_source(self, symbol, timeframe):
+        """
+        Stored timeframe to build timeframe from: timeframe itself, else the
+        coarsest stored one that divides it, else TICK (None if neither)
+        """
+        timeframe = timeframe.upper()
+        stored = {tf for sym, tf, _ in self.series() if sym == symbol.upper()}
+        if timeframe in stored:
+            return timeframe
+        # Months are whole days but not whole weeks, so MN1 needs a source no coarser than D1
+        target = TIMEFRAMES[timeframe] or TIMEFRAMES['D1']
+        candidates = [tf for tf in stored if tf in TIMEFRAMES and TIMEFRAMES[tf]
+                      and TIMEFRAMES[tf] <= target and target % TIMEFRAMES[tf] == 0]
+        if candidates:
+            return max(candidates, key=lambda tf: TIMEFRAMES[tf])
+        return 'TICK' if 'TICK' in stored else None
+
+    def bars(self, symbol, timeframe, start=None, end=None, names=None):
+        """
+        Bars in [start, end) as {column: array}. Stored timeframes are
+        returned as zero-copy memmap views; others are resampled from the
+        coarsest stored series that divides them (or from ticks). start/end are epoch seconds
+        or 'YYYY-MM-DD[ HH:MM]' strings.
+        """
+        timeframe = timeframe.upper()
+        source = self.resample_source(symbol, timeframe)
+        if source is None:
+            raise SystemExit(f"No data for {symbol} {timeframe} in {self.root}")
+
+        scale = 1000 if source == 'TICK' else 1
+        columns = self.open_columns(symbol, source, names)
+        lo, hi = time_slice(columns['time'], to_epoch(start), to_epoch(end), scale)
+        view = {name: values[lo:hi] for name, values in columns.items()}
+        if source == timeframe:
+            return view
+        if source == 'TICK':
+            return resample_ticks(view, timeframe)
+        return resample(view, timeframe)
+
+    def ticks(self, symbol, start=None, end=None, names=None):
+        """Ticks in [start, end) as zero-copy memmap views"""
+        columns = self.open_columns(symbol, 'TICK', names)
+        if columns is None:
+            raise SystemExit(f"No tick data for {symbol} in {self.root}")
+        lo, hi = time_slice(columns['time'], to_epoch(start), to_epoch(end), 1000)
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+
+def row_key(columns):
+    """Hashable per-row tuples from column arrays, NaN as None"""
+    return zip(*([None if value != value else value for value in values.tolist()] for values in columns))
+
+
+def to_epoch(value):
+    """Epoch seconds from None, a number or a 'YYYY-MM-DD[ HH:MM[:SS]]' string"""
+    if value is None or isinstance(value, (int, float, np.integer)):
+        return value
+    return int(np.datetime64(str(value).replace(' ', 'T').replace('.', '-'), 's').astype(np.int64))
+
+
+def time_slice(times, start, end, scale=1):
+    """Row range [lo, hi) of a sorted time column for [start, end) in epoch seconds"""
+    lo = 0 if start is None else int(np.searchsorted(times, start * scale, side='left'))
+    hi = len(times) if end is None else int(np.searchsorted(times, end * scale, side='left'))
+    return lo, max(lo, hi)
+
+
+#=============================================================================
+# Resampling
+#=============================================================================
+def bucket_starts(times, timeframe):
+    """Open time of the target bar for each source time (epoch seconds)"""
+    if timeframe == 'MN1':
+        return times.astype('datetime64[s]').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+    period = TIMEFRAMES[timeframe]
+    if timeframe == 'W1':
+        return (times + WEEK_OFFSET) // period * period - WEEK_OFFSET
+    return times // period * period
+
+
+def group_bounds(buckets):
+    """Start offsets of runs of equal bucket values"""
+    if not len(buckets):
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+
+
+def resample(bars, timeframe):
+    """Aggregate bars into a coarser timeframe"""
+    times = np.asarray(bars['time'])
+    buckets = bucket_starts(times, timeframe)
+    starts = group_bounds(buckets)
+    if not len(starts):
+        return {name: np.zeros(0, dtype=values.dtype) for name, values in bars.items()}
+    ends = np.append(starts[1:], len(times)) - 1
+
+    result = {'time': buckets[starts]}
+    for name, values in bars.items():
+        if name == 'time':
+            continue
+        values = np.asarray(values)
+        if name == 'open':
+            result[name] = values[starts]
+        elif name == 'close':
+            result[name] = values[ends]
+        elif name == 'high':
+            result[name] = np.maximum.reduceat(values, starts)
+        elif name == 'low':
+            result[name] = np.minimum.reduceat(values, starts)
+        elif name in ('tick_volume', 'real_volume'):
+            result[name] = np.add.reduceat(values, starts)
+        elif name == 'spread':
+            result[name] = np.minimum.reduceat(values, starts)
+    return result
+
+
+def resample_ticks(ticks, timeframe):
+    """Build bid bars from ticks; spread_price is the minimum ask - bid in each bar"""
+    seconds = np.asarray(ticks['time']) // 1000
+    buckets = bucket_starts(seconds, timeframe)
+    starts = group_bounds(buckets)
+    if not len(starts):
+        empty = {name: np.zeros(0, dtype=dtype) for name, dtype in BAR_COLUMNS if name != 'spread'}
+        if 'ask' in ticks:
+            empty['spread_price'] = np.zeros(0)
+        return empty
+    ends = np.append(starts[1:], len(seconds)) - 1
+    bid = np.asarray(ticks['bid'])
+    counts = np.diff(np.append(starts, len(seconds)))
+
+    result = {
+        'time': buckets[starts],
+        'open': bid[starts],
+        'high': np.maximum.reduceat(bid, starts),
+        'low': np.minimum.reduceat(bid, starts),
+        'close': bid[ends],
+        'tick_volume': counts.astype(np.int64),
+        'real_volume': np.zeros(len(starts), dtype=np.int64),
+    }
+    if 'ask' in ticks:
+        spread = np.asarray(ticks['ask']) - bid
+        result['spread_price'] = np.minimum.reduceat(spread, starts)
+    return result
+
+
+def day_bounds(times):
+    """Row offsets where each calendar day starts (for session logic such as the London breakout)"""
+    return group_bounds(np.asarray(times) // 86400)
+
+
+#=============================================================================
+# CLI
+#=============================================================================
+def format_time(value):
+    return str(np.datetime64(int(value), 's')).replace('T', ' ')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped OHLC/tick store")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Store directory (default: .market_data)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Convert broker CSV exports into the store")
+    p_import.add_argument("symbol")
+    p_import.add_argument("timeframe", choices=list(TIMEFRAMES) + ['TICK'])
+    p_import.add_argument("files", nargs="+")
+
+    sub.add_parser("info", help="List stored series")
+
+    p_show = sub.add_parser("show", help="Print bars for a range (resampled if needed)")
+    p_show.add_argument("symbol")
+    p_show.add_argument("timeframe", choices=list(TIMEFRAMES))
+    p_show.add_argument("--from", dest="start")
+    p_show.add_argument("--to", dest="end")
+    p_show.add_argument("--limit", type=int, default=20, help="Rows to print from the end")
+
+    args = parser.parse_args()
+    store = MarketStore(args.store)
+
+    if args.command == "import":
+        for path in args.files:
+            started = time.perf_counter()
+            written = store.import_csv(args.symbol, args.timeframe, path)
+            elapsed = time.perf_counter() - started
+            print(f"{os.path.basename(path)}: {written} new rows in {elapsed:.1f}s "
+                  f"({written / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    elif args.command == "info":
+        for symbol, timeframe, meta in store.series():
+            scale = 1000 if timeframe == 'TICK' else 1
+            span = (f"{format_time(meta['first'] // scale)} .. {format_time(meta['last'] // scale)}"
+                    if meta['rows'] else "empty")
+            print(f"{symbol:10s} {timeframe:5s} {meta['rows']:>12,d} rows  {span}")
+
+    elif args.command == "show":
+        started = time.perf_counter()
+        bars = store.bars(args.symbol, args.timeframe, args.start, args.end)
+        elapsed = time.perf_counter() - started
+        count = len(bars['time'])
+        print(f"{'time':19s} {'open':>10s} {'high':>10s} {'low':>10s} {'close':>10s} {'volume':>10s}")
+        for idx in range(max(0, count - args.limit), count):
+            print(f"{format_time(bars['time'][idx])} {bars['open'][idx]:10.5f} {bars['high'][idx]:10.5f} "
+                  f"{bars['low'][idx]:10.5f} {bars['close'][idx]:10.5f} {int(bars['tick_volume'][idx]):10d}")
+        print(f"\n{count} {args.timeframe} bars in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo ruin analysis for the martingale-family EAs (21-30).
+
+Each EA's lot progression is re-implemented as a vectorized rule that
+mirrors its CheckClosedTrades()/OnTick() logic, with parameters read from
+the EA's input defaults (via build_ea_catalog). Many independent trade
+sequences are simulated at once as NumPy arrays, one trade per step.
+
+Market model:
+  - Price is a driftless random walk and --spread points are charged per
+    trade. Trades run the injected ManagePositions(): with UseBreakEven
+    the stop moves to +BreakEvenLock once profit exceeds BreakEvenTrigger,
+    and with UseTrailingStop it follows TrailingStop points behind the
+    best price in TrailingStep increments. The distribution of exits
+    (TakeProfit, StopLoss, break even or trailed stop) is computed once per
+    parameter set from the running maximum of the walk, and a trade is a
+    win when it closes in profit. With both features off a trade closes
+    at TP or SL and wins with probability SL / (TP + SL), or --win-rate.
+  - Grid Martingale (24) has no SL/TP per position. Its price follows a
+    +/- GridStep/4 random walk, and one step is one price move. Break even
+    and trailing on individual grid positions are not modelled; a warning
+    is printed when they are enabled.
+  - Hybrid Martingale (30) is trending on each trade with probability
+    --trend-share (the ADX regime).
+  - Daily loss limits and cooling-period bars are not modelled, because
+    the simulation has no clock.
+
+Per EA and parameter set it reports the probability of ruin (equity at or
+below balance * (1 - ruin-drawdown%)), the probability of a margin call
+(free equity at the worst point of a trade below the margin call level),
+the share of runs where the EA stopped itself, drawdown percentiles and
+the median time to ruin.
+
+Needs numpy.
+
+Usage:
+    python3 scripts/martingale_risk.py [--ea 21,24] [--paths 50000] [--trades 1000] [--jobs N]
+    python3 scripts/martingale_risk.py --ea 21 --sweep LotMultiplier=1.5,2.0 --sweep MaxLot=0.5,1.0
+"""
+
+import abc
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("martingale_risk.py needs numpy: pip install numpy")
+
+import build_ea_catalog
+import mql_source
+
+BATCH_SIZE = 50000
+LABOUCHERE_CAPACITY = 256
+GRID_SUBSTEPS = 4
+
+
+#=============================================================================
+# Lot progression rules
+#=============================================================================
+def managed_exits(params):
+    """Whether the EA's injected ManagePositions() moves stops (break even or trailing)"""
+    return bool(params.get('UseBreakEven')) or bool(params.get('UseTrailingStop'))
+
+
+class LotRule(abc.ABC):
+    """
+    One simulated EA. State is a dict of arrays (one entry per path);
+    sample() draws the market for one step on every path and trade()
+    applies it.
+    """
+    # False when ManagePositions() acts on positions the rule does not model
+    models_managed_exits = True
+
+    def __init__(self, params, market):
+        self.params = params
+        self.market = market
+
+    @abc.abstractmethod
+    def start(self, n):
+        """Initial state for n paths"""
+
+    @abc.abstractmethod
+    def sample(self, rng, n):
+        """Market outcome of one step for n paths"""
+
+    @abc.abstractmethod
+    def trade(self, state, outcome):
+        """Return (pnl, lots, worst_loss) for one step on every path"""
+
+    def halted(self, state, equity, balance):
+        """Paths on which the EA stops trading by itself"""
+        return None
+
+    def take(self, state, keep):
+        return {key: value[keep] for key, value in state.items()}
+
+
+class ProgressionRule(LotRule):
+    """
+    One position per trade, closed at TakeProfit, StopLoss or a stop moved
+    by break even / trailing. Subclasses implement start(), lots() and
+    update() from the EA's CheckClosedTrades() logic.
+    """
+    def __init__(self, params, market):
+        super().__init__(params, market)
+        self.tp = params.get('TakeProfit', 100)
+        self.sl = params.get('StopLoss', 100)
+        points, probabilities = self.exit_distribution()
+        self.exit_points = points
+        self.exit_cdf = np.cumsum(probabilities)
+
+    def exit_distribution(self):
+        """(exit points, probabilities) of one trade relative to its entry"""
+        if not managed_exits(self.params):
+            p_win = self.market['win_rate']
+            if p_win is None:
+                p_win = self.sl / float(self.tp + self.sl)
+            return np.array([self.tp, -self.sl], dtype=np.float64), np.array([p_win, 1 - p_win])
+        if self.market['win_rate'] is not None:
+            raise SystemExit("--win-rate assumes trades close at TP or SL; disable break even and trailing "
+                             "(--set UseBreakEven=false --set UseTrailingStop=false) to use it")
+
+        # Walk the running maximum m one point at a time. ManagePositions()
+        # sets the stop from m; from there a driftless walk makes a new high
+        # before falling back to the stop with probability (m - stop) / (m + 1 - stop).
+        use_be = bool(self.params.get('UseBreakEven'))
+        use_trail = bool(self.params.get('UseTrailingStop'))
+        trigger = self.params.get('BreakEvenTrigger', 30)
+        lock = self.params.get('BreakEvenLock', 5)
+        distance = self.params.get('TrailingStop', 50)
+        step = self.params.get('TrailingStep', 10)
+
+        exits = {}
+        stop = -float(self.sl)
+        reach = 1.0
+        for m in range(int(np.ceil(self.tp))):
+            new_stop = stop
+            if use_be and m > trigger and lock > new_stop:
+                new_stop = lock
+            if use_trail and m > distance:
+                trailed = m - distance
+                if trailed > stop + step and trailed > new_stop:
+                    new_stop = trailed
+            if new_stop < m:  # the broker rejects a stop at or above the price
+                stop = new_stop
+            exit_share = reach / (m + 1 - stop)
+            exits[stop] = exits.get(stop, 0.0) + exit_share
+            reach -= exit_share
+        exits[float(self.tp)] = exits.get(float(self.tp), 0.0) + reach
+
+        points = np.array(sorted(exits), dtype=np.float64)
+        return points, np.array([exits[point] for point in points])
+
+    def sample(self, rng, n):
+        draws = np.searchsorted(self.exit_cdf, rng.random(n, dtype=np.float32), side='right')
+        return self.exit_points[np.minimum(draws, len(self.exit_points) - 1)]
+
+    @abc.abstractmethod
+    def lots(self, state):
+        """Lot size of the next trade on every path"""
+
+    @abc.abstractmethod
+    def update(self, state, win, pnl):
+        """Apply the closed trade to the progression"""
+
+    def trade(self, state, points):
+        lots = np.maximum(np.round(self.lots(state), 2), 0.01)
+        value = lots * self.market['point_value']
+        cost = self.market['spread'] * value
+        win = points > 0
+        pnl = points * value - cost
+        self.update(state, win, pnl)
+        return pnl, lots, self.sl * value + cost
+
+
+class MultiplierRule(ProgressionRule):
+    """
+    Classic (21) / Smooth (23): lot *= LotMultiplier after a loss, capped at
+    MaxLot, reset on a win or after MaxTrades consecutive losses.
+    """
+    def start(self, n):
+        return {'lot': np.full(n, self.params['InitialLot']), 'losses': np.zeros(n, dtype=np.int32)}
+
+    def lots(self, state):
+        reset = state['losses'] >= self.params['MaxTrades']
+        state['lot'][reset] = self.params['InitialLot']
+        state['losses'][reset] = 0
+        return state['lot']
+
+    def update(self, state, win, pnl):
+        state['losses'] = np.where(win, 0, state['losses'] + 1)
+        state['lot'] = np.where(win, self.params['InitialLot'],
+                                np.minimum(state['lot'] * self.params['LotMultiplier'], self.params['MaxLot']))
+
+    def halted(self, state, equity, balance):
+        if 'EquityStopPercent' not in self.params:
+            return None
+        return equity < balance * (1 - self.params['EquityStopPercent'] / 100.0)
+
+
+class AntiMartingaleRule(ProgressionRule):
+    """Anti (22): lot *= LotMultiplier after a win, reset on a loss or after MaxWinStreak wins"""
+    def start(self, n):
+        return {'lot': np.full(n, self.params['InitialLot']), 'wins': np.zeros(n, dtype=np.int32)}
+
+    def lots(self, state):
+        reset = state['wins'] >= self.params['MaxWinStreak']
+        state['lot'][reset] = self.params['InitialLot']
+        state['wins'][reset] = 0
+        return state['lot']
+
+    def update(self, state, win, pnl):
+        state['wins'] = np.where(win, state['wins'] + 1, 0)
+        state['lot'] = np.where(win, np.minimum(state['lot'] * self.params['LotMultiplier'], self.params['MaxLot']),
+                                self.params['InitialLot'])
+
+
+class FibonacciRule(ProgressionRule):
+    """Fibonacci (25): lot = BaseLot * fib(level), level+1 on a loss, level-2 on a win"""
+    def __init__(self, params, market):
+        super().__init__(params, market)
+        table = [1, 1]
+        while len(table) <= params['MaxFibLevel'] + 1:
+            table.append(table[-1] + table[-2])
+        # GetFibonacci(n) for n = 0, 1, 2, ... is 1, 1, 2, 3, 5, ...
+        self.table = np.array(table, dtype=np.float64)
+
+    def start(self, n):
+        return {'level': np.zeros(n, dtype=np.int32)}
+
+    def lots(self, state):
+        state['level'][state['level'] >= self.params['MaxFibLevel']] = 0
+        return self.params['BaseLot'] * self.table[state['level']]
+
+    def update(self, state, win, pnl):
+        state['level'] = np.where(win, np.maximum(state['level'] - 2, 0), state['level'] + 1)
+
+
+class DAlembertRule(ProgressionRule):
+    """D'Alembert (26): lot +/- LotIncrement on loss/win, clamped to [MinLot, MaxLot]"""
+    def start(self, n):
+        return {'lot': np.full(n, self.params['BaseLot'])}
+
+    def lots(self, state):
+        return state['lot']
+
+    def update(self, state, win, pnl):
+        step = np.where(win, -self.params['LotIncrement'], self.params['LotIncrement'])
+        state['lot'] = np.clip(state['lot'] + step, self.params['MinLot'], self.params['MaxLot'])
+
+
+class LabouchereRule(ProgressionRule):
+    """
+    Labouchere (27): bet = first + last of the sequence. A win removes both,
+    a loss appends the bet; an empty sequence resets to InitSequence. The
+    sequence is a ring buffer per path; a path that fills it stops.
+    """
+    def __init__(self, params, market):
+        super().__init__(params, market)
+        self.initial = [int(part) for part in str(params['InitSequence']).split(',') if part.strip()]
+
+    def start(self, n):
+        sequence = np.zeros((n, LABOUCHERE_CAPACITY), dtype=np.int64)
+        sequence[:, :len(self.initial)] = self.initial
+        return {'sequence': sequence, 'head': np.zeros(n, dtype=np.int64),
+                'size': np.full(n, len(self.initial), dtype=np.int64)}
+
+    def reset(self, state, rows):
+        state['sequence'][rows] = 0
+        state['sequence'][rows, :len(self.initial)] = self.initial
+        state['head'][rows] = 0
+        state['size'][rows] = len(self.initial)
+
+    def bet(self, state):
+        rows = np.arange(len(state['size']))
+        head, size = state['head'], state['size']
+        first = state['sequence'][rows, head % LABOUCHERE_CAPACITY]
+        last = state['sequence'][rows, (head + size - 1) % LABOUCHERE_CAPACITY]
+        return np.where(size >= 2, first + last, first)
+
+    def lots(self, state):
+        empty = np.flatnonzero(state['size'] == 0)
+        if len(empty):
+            self.reset(state, empty)
+        return self.params['UnitLot'] * self.bet(state)
+
+    def update(self, state, win, pnl):
+        bet = self.bet(state)
+        lose = ~win
+        rows = np.flatnonzero(lose)
+        state['sequence'][rows, (state['head'][rows] + state['size'][rows]) % LABOUCHERE_CAPACITY] = bet[rows]
+        state['size'] = np.where(lose, state['size'] + 1, np.maximum(state['size'] - 2, 0))
+        state['head'] = np.where(win & (state['size'] > 0), state['head'] + 1, state['head'])
+
+    def halted(self, state, equity, balance):
+        return state['size'] >= LABOUCHERE_CAPACITY - 1
+
+
+class ParlayRule(ProgressionRule):
+    """
+    Parlay (28): after a win the lot grows by 0.01 per TakeProfit-sized
+    profit accumulated at 1 lot; reset on a loss or after MaxParlays wins.
+    """
+    def start(self, n):
+        return {'lot': np.full(n, self.params['BaseLot']), 'count': np.zeros(n, dtype=np.int32),
+                'profit': np.zeros(n)}
+
+    def lots(self, state):
+        reset = state['count'] >= self.params['MaxParlays']
+        state['lot'][reset] = self.params['BaseLot']
+        state['count'][reset] = 0
+        state['profit'][reset] = 0
+        return state['lot']
+
+    def update(self, state, win, pnl):
+        profit = np.where(win, state['profit'] + pnl, 0)
+        extra = profit / (self.tp * self.market['point_value'])
+        state['profit'] = profit
+        state['count'] = np.where(win, state['count'] + 1, 0)
+        state['lot'] = np.where(win, np.round(self.params['BaseLot'] + extra * 0.01, 2), self.params['BaseLot'])
+
+
+class OscarGrindRule(ProgressionRule):
+    """Oscar's Grind (29): +1 unit after a win until the cycle is one unit up, same bet after a loss"""
+    def start(self, n):
+        return {'units': np.ones(n, dtype=np.int64), 'profit': np.zeros(n)}
+
+    def lots(self, state):
+        return self.params['UnitLot'] * state['units']
+
+    def update(self, state, win, pnl):
+        unit_value = self.params['UnitLot'] * self.tp * self.market['point_value']
+        profit = state['profit'] + pnl
+        complete = win & (profit >= unit_value)
+        needed = np.ceil((unit_value - profit) / unit_value).astype(np.int64)
+        grown = np.minimum(state['units'] + 1, np.minimum(needed, self.params['MaxUnits']))
+        state['units'] = np.where(complete, 1, np.where(win, grown, state['units']))
+        state['profit'] = np.where(complete, 0, profit)
+
+
+class HybridRule(ProgressionRule):
+    """
+    Hybrid (30): in a trending market wins multiply the lot by
+    AntiMartingaleMultiplier and losses reset it; when ranging, losses
+    multiply by MartingaleMultiplier and wins reset. Lots reset after
+    MaxConsecutiveLosses, and the EA stops at MaxDrawdownPercent.
+    """
+    def start(self, n):
+        return {'lot': np.full(n, self.params['BaseLot']), 'losses': np.zeros(n, dtype=np.int32),
+                'trending': np.zeros(n, dtype=bool)}
+
+    def lots(self, state):
+        state['trending'] = self.market['rng'].random(len(state['lot'])) < self.market['trend_share']
+        return state['lot']
+
+    def update(self, state, win, pnl):
+        base, cap = self.params['BaseLot'], self.params['MaxLot']
+        trending = state['trending']
+        losses = np.where(win, 0, state['losses'] + 1)
+        cooling = ~win & (losses >= self.params['MaxConsecutiveLosses'])
+        on_win = np.where(trending, np.minimum(state['lot'] * self.params['AntiMartingaleMultiplier'], cap), base)
+        on_loss = np.where(trending, base, np.minimum(state['lot'] * self.params['MartingaleMultiplier'], cap))
+        state['lot'] = np.where(win, on_win, np.where(cooling, base, on_loss))
+        state['losses'] = np.where(cooling, 0, losses)
+
+    def halted(self, state, equity, balance):
+        return (balance - equity) / balance * 100 >= self.params['MaxDrawdownPercent']
+
+
+class GridRule(LotRule):
+    """
+    Grid Martingale (24): opens InitialLot * LotMultiplier^level every
+    GridStep points against the position, up to MaxGridLevels and
+    MaxTotalLot, and closes everything once floating profit reaches
+    TakeProfitMoney. Equity is marked to market on every price step.
+    """
+    models_managed_exits = False
+
+    def sample(self, rng, n):
+        """True where the price steps up"""
+        p_up = 0.5 if self.market['win_rate'] is None else self.market['win_rate']
+        return rng.random(n, dtype=np.float32) < p_up
+
+    def start(self, n):
+        return {'price': np.zeros(n), 'last': np.zeros(n), 'level': np.zeros(n, dtype=np.int32),
+                'lots': np.zeros(n), 'entries': np.zeros(n), 'floating': np.zeros(n)}
+
+    def open_level(self, state, rows):
+        lot = np.round(self.params['InitialLot'] * np.power(self.params['LotMultiplier'], state['level'][rows]), 2)
+        entry = state['price'][rows] + self.market['spread']  # spread paid at entry
+        state['lots'][rows] += lot
+        state['entries'][rows] += lot * entry
+        state['last'][rows] = state['price'][rows]
+        state['level'][rows] += 1
+
+    def trade(self, state, up):
+        flat = np.flatnonzero(state['lots'] == 0)
+        if len(flat):
+            state['price'][flat] = 0
+            self.open_level(state, flat)
+
+        state['price'] += np.where(up, 1.0, -1.0) * (self.params['GridStep'] / float(GRID_SUBSTEPS))
+        deeper = ((state['level'] < self.params['MaxGridLevels']) & (state['lots'] < self.params['MaxTotalLot'])
+                  & (state['price'] <= state['last'] - self.params['GridStep']))
+        rows = np.flatnonzero(deeper)
+        if len(rows):
+            self.open_level(state, rows)
+
+        floating = (state['price'] * state['lots'] - state['entries']) * self.market['point_value']
+        pnl = floating - state['floating']
+        lots = state['lots'].copy()
+
+        done = floating >= self.params['TakeProfitMoney']
+        state['floating'] = np.where(done, 0, floating)
+        for key in ('lots', 'entries', 'level', 'last'):
+            state[key][done] = 0
+        return pnl, lots, np.zeros(len(pnl))
+
+
+RULES = {
+    21: MultiplierRule,
+    22: AntiMartingaleRule,
+    23: MultiplierRule,
+    24: GridRule,
+    25: FibonacciRule,
+    26: DAlembertRule,
+    27: LabouchereRule,
+    28: ParlayRule,
+    29: OscarGrindRule,
+    30: HybridRule,
+}
+
+
+#=============================================================================
+# Simulation
+#=============================================================================
+def simulate_batch(rule, n_paths, n_trades, market):
+    """Simulate n_paths sequences; returns per-path result arrays"""
+    rng = market['rng']
+    balance = market['balance']
+    ruin_level = balance * (1 - market['ruin_drawdown'] / 100.0)
+    margin_floor = market['margin_per_lot'] * market['margin_call_level'] / 100.0
+
+    final = np.empty(n_paths)
+    max_dd = np.empty(n_paths)
+    ruin_at = np.full(n_paths, -1, dtype=np.int64)
+    margin_call = np.zeros(n_paths, dtype=bool)
+    halted = np.zeros(n_paths, dtype=bool)
+
+    index = np.arange(n_paths)
+    equity = np.full(n_paths, float(balance))
+    peak = equity.copy()
+    dd = np.zeros(n_paths)
+    state = rule.start(n_paths)
+
+    for step in range(n_trades):
+        pnl, lots, worst = rule.trade(state, rule.sample(rng, len(index)))
+
+        called = equity - worst < lots * margin_floor
+        equity = np.where(called, equity - worst, equity + pnl)
+        np.maximum(peak, equity, out=peak)
+        np.maximum(dd, 1 - equity / peak, out=dd)
+
+        ruined = called | (equity <= ruin_level)
+        stopped = rule.halted(state, equity, balance)
+        finished = ruined if stopped is None else ruined | stopped
+
+        if finished.any():
+            ruin_at[index[ruined]] = step + 1
+            margin_call[index[called]] = True
+            if stopped is not None:
+                halted[index[stopped & ~ruined]] = True
+            final[index[finished]] = equity[finished]
+            max_dd[index[finished]] = dd[finished]
+
+            running = ~finished
+            index, equity, peak, dd = index[running], equity[running], peak[running], dd[running]
+            state = rule.take(state, running)
+            if not len(index):
+                break
+
+    final[index] = equity
+    max_dd[index] = dd
+    return final, max_dd, ruin_at, margin_call, halted
+
+
+def simulate(rule, n_paths, n_trades, market):
+    parts = [simulate_batch(rule, min(BATCH_SIZE, n_paths - start), n_trades, market)
+             for start in range(0, n_paths, BATCH_SIZE)]
+    return [np.concatenate(column) for column in zip(*parts)]
+
+
+def run_set(task):
+    """Worker: simulate one (EA, parameter set) with its own random stream"""
+    number, params, n_paths, n_trades, market, seed = task
+    market = dict(market, rng=np.random.default_rng(seed))
+    started = time.perf_counter()
+    stats = summarize(*simulate(RULES[number](params, market), n_paths, n_trades, market), market['balance'])
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def summarize(final, max_dd, ruin_at, margin_call, halted, balance):
+    ruined = ruin_at >= 0
+    drawdown = max_dd * 100
+    return {
+        'paths': len(final),
+        'ruinProbability': float(ruined.mean()),
+        'marginCallProbability': float(margin_call.mean()),
+        'haltedProbability': float(halted.mean()),
+        'profitProbability': float((final > balance).mean()),
+        'meanFinalEquity': float(final.mean()),
+        'drawdownP50': float(np.percentile(drawdown, 50)),
+        'drawdownP95': float(np.percentile(drawdown, 95)),
+        'drawdownP99': float(np.percentile(drawdown, 99)),
+        'medianTradesToRuin': float(np.median(ruin_at[ruined])) if ruined.any() else None,
+        'p10TradesToRuin': float(np.percentile(ruin_at[ruined], 10)) if ruined.any() else None,
+    }
+
+
+#=============================================================================
+# EA parameters
+#=============================================================================
+def load_eas(numbers, dialect):
+    """Return [(number, name, {input: default})] for the selected EAs"""
+    eas = []
+    for path in mql_source.list_sources(dialect):
+        prefix = os.path.basename(path).split('_', 1)[0]
+        if not prefix.isdigit() or int(prefix) not in numbers:
+            continue
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            entry = build_ea_catalog.parse_ea(path, f.read())
+        params = {item['name']: item['default'] for item in entry['inputs']}
+        eas.append((int(prefix), entry['name'], params))
+    return eas
+
+
+def parse_assignment(text):
+    name, _, value = text.partition('=')
+    if not value:
+        raise SystemExit(f"Expected Name=value, got {text!r}")
+    return name.strip(), [build_ea_catalog.parse_value(part) for part in value.split(',')]
+
+
+def parameter_sets(params, overrides, sweeps):
+    """Expand --set/--sweep into a list of (label, params)"""
+    base = dict(params)
+    base.update(overrides)
+    names = [name for name in sweeps if name in base]
+    if not names:
+        return [('defaults' if not overrides else ' '.join(f"{k}={v}" for k, v in overrides.items()), base)]
+    result = []
+    for values in itertools.product(*(sweeps[name] for name in names)):
+        current = dict(base, **dict(zip(names, values)))
+        result.append((' '.join(f"{name}={value}" for name, value in zip(names, values)), current))
+    return result
+
+
+def print_results(results):
+    header = f"{'EA':28s} {'Parameters':28s} {'P(ruin)':>8s} {'P(MC)':>7s} {'P(stop)':>8s} {'DD50%':>6s} {'DD95%':>6s} {'DD99%':>6s} {'T-ruin':>7s} {'Mean eq':>10s}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        s = row['stats']
+        ttr = f"{s['medianTradesToRuin']:.0f}" if s['medianTradesToRuin'] is not None else '-'
+        print(f"{row['ea'][:28]:28s} {row['parameters'][:28]:28s} {s['ruinProbability']:8.4f} {s['marginCallProbability']:7.4f} "
+              f"{s['haltedProbability']:8.4f} {s['drawdownP50']:6.1f} {s['drawdownP95']:6.1f} {s['drawdownP99']:6.1f} "
+              f"{ttr:>7s} {s['meanFinalEquity']:10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo ruin analysis for martingale EAs")
+    parser.add_argument("--ea", default="21-30", help="EA numbers, e.g. 21,24 or 21-30 (default: 21-30)")
+    parser.add_argument("--dialect", choices=["mql5", "mql4"], default="mql5", help="Source to read input defaults from")
+    parser.add_argument("--paths", type=int, default=50000, help="Simulated sequences per parameter set")
+    parser.add_argument("--trades", type=int, default=1000, help="Trades (grid: price steps) per sequence")
+    parser.add_argument("--balance", type=float, default=10000.0, help="Starting balance ($)")
+    parser.add_argument("--win-rate", type=float, default=None, help="Win probability (default: SL/(TP+SL))")
+    parser.add_argument("--spread", type=float, default=10.0, help="Cost per trade in points")
+    parser.add_argument("--point-value", type=float, default=1.0, help="$ per point for 1.0 lot")
+    parser.add_argument("--margin-per-lot", type=float, default=1000.0, help="Margin required per 1.0 lot ($)")
+    parser.add_argument("--margin-call-level", type=float, default=100.0, help="Margin level (%%) that counts as a margin call")
+    parser.add_argument("--ruin-drawdown", type=float, default=50.0, help="Drawdown from balance (%%) that counts as ruin")
+    parser.add_argument("--trend-share", type=float, default=0.5, help="Share of trending trades for the Hybrid EA")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="Override an input")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2", help="Simulate each value of an input")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    numbers = set()
+    for part in args.ea.split(','):
+        low, _, high = part.partition('-')
+        numbers.update(range(int(low), int(high or low) + 1))
+    numbers &= set(RULES)
+
+    overrides = {name: values[0] for name, values in map(parse_assignment, args.set)}
+    sweeps = dict(map(parse_assignment, args.sweep))
+    market = {
+        'balance': args.balance,
+        'win_rate': args.win_rate,
+        'spread': args.spread,
+        'point_value': args.point_value,
+        'margin_per_lot': args.margin_per_lot,
+        'margin_call_level': args.margin_call_level,
+        'ruin_drawdown': args.ruin_drawdown,
+        'trend_share': args.trend_share,
+    }
+
+    results = []
+    tasks = []
+    for number, name, params in load_eas(numbers, args.dialect):
+        for label, current in parameter_sets(params, overrides, sweeps):
+            if managed_exits(current) and not RULES[number].models_managed_exits:
+                print(f"WARNING: {name} ({label}): break even / trailing stop on individual positions is not "
+                      f"modelled; these figures assume they are off", file=sys.stderr)
+            results.append({'ea': name, 'number': number, 'parameters': label})
+            tasks.append((number, current, args.paths, args.trades, market))
+    seeds = np.random.SeedSequence(args.seed).spawn(len(tasks))
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for row, stats in zip(results, pool.map(run_set, [task + (seed,) for task, seed in zip(tasks, seeds)])):
+            row['stats'] = stats
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print_results(results)
+    total = sum(row['stats']['paths'] for row in results) * args.trades
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(results)} parameter sets, {total / 1e6:.0f}M simulated trades in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
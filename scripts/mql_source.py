@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for scanning MQL4/MQL5 source text.
+
+Only the structure the scripts need is recognised: comments, string/char
+literals, brace nesting and top-level function definitions. This is not a
+full MQL parser.
+"""
+
+import os
+import re
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MQL5_EXPERTS_DIR = os.path.join(REPO_ROOT, "mql", "MQL5", "Experts")
+MQL4_EXPERTS_DIR = os.path.join(REPO_ROOT, "mql", "MQL4", "Experts")
+MQL5_INCLUDE_DIR = os.path.join(REPO_ROOT, "mql", "MQL5", "Include")
+MQL4_INCLUDE_DIR = os.path.join(REPO_ROOT, "mql", "MQL4", "Include")
+
+EXPERTS_DIRS = {
+    'mql5': (MQL5_EXPERTS_DIR, '.mq5'),
+    'mql4': (MQL4_EXPERTS_DIR, '.mq4'),
+}
+
+INCLUDE_DIRS = {
+    'mql5': MQL5_INCLUDE_DIR,
+    'mql4': MQL4_INCLUDE_DIR,
+}
+
+# #include of a shared file, e.g. the ones written by find_duplicate_blocks.py --extract
+SHARED_INCLUDE_PATTERN = re.compile(r'^[ \t]*#include[ \t]*<(?P<path>EALicense/[^>]+\.mqh)>', re.MULTILINE)
+# Header line of the files find_duplicate_blocks.py --extract writes
+GENERATED_INCLUDE_MARKER = "generated by find_duplicate_blocks.py"
+
+# Return type, name and parameter list of a top-level function definition
+FUNCTION_HEADER_PATTERN = re.compile(
+    r'^(?:static\s+|virtual\s+)?(?P<type>[A-Za-z_]\w*(?:<[^>]*>)?[\s\*&]+)(?P<name>[A-Za-z_]\w*)\s*\((?P<params>[^;{}]*)\)\s*(?:const\s*)?(?:\{\s*)?$'
+)
+
+
+def list_sources(dialect, directory=None):
+    """Return sorted .mq4/.mq5 paths for a dialect"""
+    default_dir, extension = EXPERTS_DIRS[dialect]
+    directory = directory or default_dir
+    if not os.path.exists(directory):
+        return []
+    return [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(extension)]
+
+
+def dialect_of(filepath):
+    return 'mql4' if filepath.endswith(('.mq4', '.ex4')) else 'mql5'
+
+
+def shared_include_files():
+    """Every Include/EALicense/*.mqh of both dialects, for cache fingerprints"""
+    paths = []
+    for dialect in ('mql5', 'mql4'):
+        shared_dir = os.path.join(INCLUDE_DIRS[dialect], 'EALicense')
+        if os.path.isdir(shared_dir):
+            paths += sorted(os.path.join(shared_dir, name) for name in os.listdir(shared_dir) if name.endswith('.mqh'))
+    return paths
+
+
+def shared_include_directives(content, dialect):
+    """Return [(include path, text, directive start, directive end)] for the existing EALicense includes"""
+    included = []
+    for match in SHARED_INCLUDE_PATTERN.finditer(code_mask(content, blank_strings=False)):
+        path = os.path.join(INCLUDE_DIRS[dialect], *match.group('path').split('/'))
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                included.append((path, f.read(), match.start(), match.end()))
+    return included
+
+
+def expand_shared_includes(content, dialect):
+    """
+    Return (text, spans): content with each EALicense #include directive
+    replaced by the file's text, in place, as the compiler sees it, and
+    [(text start, text end, directive start, directive end)] per include.
+    """
+    parts = []
+    spans = []
+    position = length = 0
+    for _, text, start, end in shared_include_directives(content, dialect):
+        parts += [content[position:start], text]
+        length += start - position
+        spans.append((length, length + len(text), start, end))
+        length += len(text)
+        position = end
+    parts.append(content[position:])
+    return ''.join(parts), spans
+
+
+def source_offset(spans, offset):
+    """Offset in the file for an offset in expand_shared_includes() text; included text maps to its directive"""
+    shift = 0
+    for text_start, text_end, start, end in spans:
+        if offset < text_start:
+            break
+        if offset < text_end:
+            return start
+        shift = text_end - end
+    return offset - shift
+
+
+def with_shared_includes(content, dialect):
+    """
+    Return content with the EALicense includes it uses expanded in place.
+
+    Anything that reads what an EA declares must look here rather than at
+    the file alone, since find_duplicate_blocks.py --extract moves shared
+    functions and input groups into those includes: presence checks ("is
+    ValidateLicense already there?"), lint_eas.py, and the inputs that
+    build_ea_catalog.py and martingale_risk.py read.
+    """
+    return expand_shared_includes(content, dialect)[0]
+
+
+def code_mask(content, blank_strings=True):
+    """
+    Return a copy of content with comments (and, by default, string/char
+    literal contents) blanked out. Newlines are kept so offsets still line
+    up with the original text.
+    """
+    out = list(content)
+    i = 0
+    length = len(content)
+    while i < length:
+        ch = content[i]
+        nxt = content[i + 1] if i + 1 < length else ''
+        if ch == '/' and nxt == '/':
+            end = content.find('\n', i)
+            end = length if end == -1 else end
+            for j in range(i, end):
+                out[j] = ' '
+            i = end
+        elif ch == '/' and nxt == '*':
+            end = content.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            for j in range(i, end):
+                if out[j] != '\n':
+                    out[j] = ' '
+            i = end
+        elif ch == '"' or ch == "'":
+            j = i + 1
+            while j < length and content[j] != ch and content[j] != '\n':
+                j += 2 if content[j] == '\\' else 1
+            end = min(j + 1, length)
+            if blank_strings:
+                for k in range(i + 1, end - 1):
+                    out[k] = ' '
+            i = end
+        else:
+            i += 1
+    return ''.join(out)
+
+
+def find_block_end(masked, open_idx):
+    """Given the offset of '{' in masked text, return the offset just past its matching '}'"""
+    depth = 0
+    for idx in range(open_idx, len(masked)):
+        if masked[idx] == '{':
+            depth += 1
+        elif masked[idx] == '}':
+            depth -= 1
+            if depth == 0:
+                return idx + 1
+    return None
+
+
+def find_functions(content, masked=None):
+    """
+    Return top-level function definitions as dicts with name, type, params,
+    start/end offsets (header through closing brace) and start_line.
+    """
+    masked = masked if masked is not None else code_mask(content)
+    functions = []
+    depth = 0
+    offset = 0
+    lines = masked.split('\n')
+
+    for line_no, line in enumerate(lines):
+        line_start = offset
+        offset += len(line) + 1
+
+        if depth == 0 and line and not line[0].isspace():
+            match = FUNCTION_HEADER_PATTERN.match(line.rstrip())
+            if match and match.group('type').strip() not in ('return', 'else', 'new', 'delete'):
+                open_idx = masked.find('{', line_start)
+                between = masked[line_start + len(line):open_idx] if open_idx != -1 else ''
+                if open_idx != -1 and (open_idx < line_start + len(line) or not between.strip()):
+                    end = find_block_end(masked, open_idx)
+                    if end:
+                        functions.append({
+                            'name': match.group('name'),
+                            'type': match.group('type').strip(),
+                            'params': match.group('params').strip(),
+                            'start': line_start,
+                            'end': end,
+                            'start_line': line_no + 1,
+                        })
+
+        depth += line.count('{') - line.count('}')
+        depth = max(depth, 0)
+
+    return functions
+
+
+def function_by_name(content, name, masked=None):
+    for function in find_functions(content, masked):
+        if function['name'] == name:
+            return function
+    return None
+
+
+def leading_comment_start(content, start):
+    """Extend start upwards over the contiguous // comment banner directly above it"""
+    lines_before = content[:start].split('\n')
+    # lines_before[-1] is the (empty) prefix of the header line itself
+    idx = len(lines_before) - 1
+    while idx > 0 and lines_before[idx - 1].lstrip().startswith('//'):
+        idx -= 1
+    return len('\n'.join(lines_before[:idx])) + (1 if idx > 0 else 0)
+
+
+def line_of(content, offset):
+    return content.count('\n', 0, offset) + 1
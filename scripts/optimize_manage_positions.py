@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Codemod to upgrade the injected ManagePositions() helper in every EA.
+
+The helper appended by upgrade_ea_features.py / upgrade_ea_features_mql4.py
+re-reads symbol properties for every position and can send two SL
+modifications per position per tick (break even, then trailing). The
+optimized version:
+  - reads point/digits/bid/ask once per pass,
+  - merges break even and trailing into at most one modification per position,
+  - honours a ManageIntervalMs input to throttle modification passes.
+"""
+
+import os
+import re
+
+import mql_source
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MQL5_EXPERTS_DIR = os.path.join(REPO_ROOT, "mql", "MQL5", "Experts")
+MQL4_EXPERTS_DIR = os.path.join(REPO_ROOT, "mql", "MQL4", "Experts")
+
+# Marker present only in the optimized helper
+OPTIMIZED_MARKER = "ManageIntervalMs"
+
+INTERVAL_INPUT = "input int      ManageIntervalMs   = 0;      // Min ms between SL updates (0 = every tick)\n"
+
+MQL5_MANAGE_POSITIONS = """void ManagePositions()
+{
+   if(!UseBreakEven && !UseTrailingStop) return;
+   if(PositionsTotal() == 0) return;
+
+   //--- Throttle modification passes (0 = every tick)
+   static uint lastManageTick = 0;
+   uint nowTick = GetTickCount();
+   if(ManageIntervalMs > 0 && lastManageTick != 0 && nowTick - lastManageTick < (uint)ManageIntervalMs) return;
+   lastManageTick = nowTick;
+
+   //--- Symbol data (read once per pass)
+   double point = SymbolInfoDouble(_Symbol, SYMBOL_POINT);
+   if(point == 0) return;
+   int digits = (int)SymbolInfoInteger(_Symbol, SYMBOL_DIGITS);
+   double bid = SymbolInfoDouble(_Symbol, SYMBOL_BID);
+   double ask = SymbolInfoDouble(_Symbol, SYMBOL_ASK);
+   double beTrigger = BreakEvenTrigger * point;
+   double beLock = BreakEvenLock * point;
+   double trailDistance = TrailingStop * point;
+   double trailStep = TrailingStep * point;
+
+   for(int i = PositionsTotal() - 1; i >= 0; i--)
+   {
+      ulong ticket = PositionGetTicket(i);
+      if(ticket == 0) continue;
+
+      if(PositionGetInteger(POSITION_MAGIC) != {magic} || PositionGetString(POSITION_SYMBOL) != _Symbol) continue;
+
+      // Data
+      bool isBuy = (PositionGetInteger(POSITION_TYPE) == POSITION_TYPE_BUY);
+      double openPrice = PositionGetDouble(POSITION_PRICE_OPEN);
+      double currentSL = PositionGetDouble(POSITION_SL);
+      double currentPrice = isBuy ? bid : ask;
+      double profit = isBuy ? currentPrice - openPrice : openPrice - currentPrice;
+      double newSL = currentSL;
+
+      //--- BREAK EVEN ---
+      if(UseBreakEven && profit > beTrigger)
+      {
+         if(isBuy)
+         {
+            double beSL = openPrice + beLock;
+            if(beSL > newSL) newSL = beSL;
+         }
+         else
+         {
+            double beSL = openPrice - beLock;
+            if(beSL < newSL || newSL == 0) newSL = beSL;
+         }
+      }
+
+      //--- TRAILING STOP ---
+      if(UseTrailingStop && profit > trailDistance)
+      {
+         if(isBuy)
+         {
+            double trailSL = currentPrice - trailDistance;
+            if(trailSL > currentSL + trailStep && trailSL > newSL) newSL = trailSL;
+         }
+         else
+         {
+            double trailSL = currentPrice + trailDistance;
+            if((trailSL < currentSL - trailStep || currentSL == 0) && (trailSL < newSL || newSL == 0)) newSL = trailSL;
+         }
+      }
+
+      //--- Single modification per position ---
+      newSL = NormalizeDouble(newSL, digits);
+      if(newSL == NormalizeDouble(currentSL, digits)) continue;
+
+      MqlTradeRequest request = {};
+      MqlTradeResult result = {};
+      request.action = TRADE_ACTION_SLTP;
+      request.position = ticket;
+      request.sl = newSL;
+      request.tp = PositionGetDouble(POSITION_TP);
+      request.symbol = _Symbol;
+      if(!OrderSend(request, result))
+         Print("Failed to move SL/TP: ", GetLastError());
+   }
+}"""
+
+MQL4_MANAGE_POSITIONS = """void ManagePositions()
+{
+   if(!UseBreakEven && !UseTrailingStop) return;
+   if(OrdersTotal() == 0) return;
+
+   //--- Throttle modification passes (0 = every tick)
+   static uint lastManageTick = 0;
+   uint nowTick = GetTickCount();
+   if(ManageIntervalMs > 0 && lastManageTick != 0 && nowTick - lastManageTick < (uint)ManageIntervalMs) return;
+   lastManageTick = nowTick;
+
+   //--- Symbol data (read once per pass)
+   double point = Point;
+   if(point == 0) return;
+   double beTrigger = BreakEvenTrigger * point;
+   double beLock = BreakEvenLock * point;
+   double trailDistance = TrailingStop * point;
+   double trailStep = TrailingStep * point;
+
+   for(int i = OrdersTotal() - 1; i >= 0; i--)
+   {
+      if(!OrderSelect(i, SELECT_BY_POS, MODE_TRADES)) continue;
+
+      if(OrderMagicNumber() != {magic} || OrderSymbol() != Symbol()) continue;
+
+      int type = OrderType();
+      if(type != OP_BUY && type != OP_SELL) continue;
+
+      // Data
+      bool isBuy = (type == OP_BUY);
+      double openPrice = OrderOpenPrice();
+      double currentSL = OrderStopLoss();
+      double currentPrice = isBuy ? Bid : Ask;
+      double profit = isBuy ? currentPrice - openPrice : openPrice - currentPrice;
+      double newSL = currentSL;
+
+      //--- BREAK EVEN ---
+      if(UseBreakEven && profit > beTrigger)
+      {
+         if(isBuy)
+         {
+            double beSL = openPrice + beLock;
+            if(beSL > newSL) newSL = beSL;
+         }
+         else
+         {
+            double beSL = openPrice - beLock;
+            if(beSL < newSL || newSL == 0) newSL = beSL;
+         }
+      }
+
+      //--- TRAILING STOP ---
+      if(UseTrailingStop && profit > trailDistance)
+      {
+         if(isBuy)
+         {
+            double trailSL = currentPrice - trailDistance;
+            if(trailSL > currentSL + trailStep && trailSL > newSL) newSL = trailSL;
+         }
+         else
+         {
+            double trailSL = currentPrice + trailDistance;
+            if((trailSL < currentSL - trailStep || currentSL == 0) && (trailSL < newSL || newSL == 0)) newSL = trailSL;
+         }
+      }
+
+      //--- Single modification per position ---
+      newSL = NormalizeDouble(newSL, Digits);
+      if(newSL == NormalizeDouble(currentSL, Digits)) continue;
+
+      if(!OrderModify(OrderTicket(), openPrice, newSL, OrderTakeProfit(), 0, clrNONE))
+         Print("Failed to move SL: ", GetLastError());
+   }
+}"""
+
+MANAGE_POSITIONS_TEMPLATES = {
+    '.mq5': MQL5_MANAGE_POSITIONS,
+    '.mq4': MQL4_MANAGE_POSITIONS,
+}
+
+MANAGE_POSITIONS_DEF_PATTERN = re.compile(r'^void\s+ManagePositions\s*\(\s*\)\s*\{?\s*$', re.MULTILINE)
+MAGIC_PATTERN = re.compile(r'(?:POSITION_MAGIC\)|OrderMagicNumber\(\))\s*!=\s*(\w+)')
+BREAK_EVEN_LOCK_INPUT_PATTERN = re.compile(r'^input\s+int\s+BreakEvenLock\b[^\n]*\n', re.MULTILINE)
+
+
+def find_function_span(content, start):
+    """Return (start, end) of the function whose header begins at start, by brace matching"""
+    open_idx = content.find('{', start)
+    if open_idx == -1:
+        return None
+
+    depth = 0
+    for idx in range(open_idx, len(content)):
+        if content[idx] == '{':
+            depth += 1
+        elif content[idx] == '}':
+            depth -= 1
+            if depth == 0:
+                return start, idx + 1
+    return None
+
+
+def optimize_content(content, extension):
+    """Return content with the injected ManagePositions() replaced by the optimized version"""
+    template = MANAGE_POSITIONS_TEMPLATES[extension]
+
+    match = MANAGE_POSITIONS_DEF_PATTERN.search(content)
+    if not match:
+        return content
+
+    span = find_function_span(content, match.start())
+    if not span:
+        return content
+
+    body = content[span[0]:span[1]]
+    if OPTIMIZED_MARKER in body:
+        return content
+
+    # Only touch the helper injected by the upgrade scripts
+    if "BreakEvenTrigger" not in body or "TrailingStep" not in body:
+        return content
+
+    magic_match = MAGIC_PATTERN.search(body)
+    if not magic_match:
+        return content
+
+    new_body = template.replace("{magic}", magic_match.group(1))
+    content = content[:span[0]] + new_body + content[span[1]:]
+
+    # Add the throttle input next to the other Break Even inputs
+    # The feature inputs may live in an EALicense include (find_duplicate_blocks.py --extract)
+    present = mql_source.with_shared_includes(content, 'mql5' if extension == '.mq5' else 'mql4')
+    if not re.search(r'input\s+int\s+' + OPTIMIZED_MARKER + r'\b', present):
+        input_match = BREAK_EVEN_LOCK_INPUT_PATTERN.search(content)
+        if input_match:
+            content = content[:input_match.end()] + INTERVAL_INPUT + content[input_match.end():]
+        else:
+            content = content[:span[0]] + INTERVAL_INPUT + "\n" + content[span[0]:]
+
+    return content
+
+
+def process_file(filepath):
+    """Optimize a single EA file in place"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    extension = os.path.splitext(filepath)[1]
+    new_content = optimize_content(content, extension)
+
+    if new_content != content:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        print(f"OPTIMIZED: {os.path.basename(filepath)}")
+        return True
+    else:
+        print(f"OK: {os.path.basename(filepath)}")
+        return False
+
+
+def main():
+    """Main function to optimize ManagePositions() in all EAs"""
+    optimized = 0
+    ok = 0
+
+    for directory, extension in ((MQL5_EXPERTS_DIR, '.mq5'), (MQL4_EXPERTS_DIR, '.mq4')):
+        if not os.path.exists(directory):
+            print(f"Experts directory not found: {directory}")
+            continue
+
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(extension):
+                if process_file(os.path.join(directory, filename)):
+                    optimized += 1
+                else:
+                    ok += 1
+
+    print(f"\nCompleted: {optimized} optimized, {ok} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Build per-customer download bundles of the compiled EAs.
+
+Each customer gets one zip with the .ex4/.ex5 files of every EA they have
+enabled, unexpired UserEaAccess to (laid out as MQL4/Experts and
+MQL5/Experts), plus any per-customer variant builds.
+
+  - Artifacts are ingested once into a content-addressed store under
+    .downloads/store: identical binaries are stored (and deflated) once no
+    matter how many customers or EA files share them.
+  - Zips are streamed straight from the store by copying the pre-deflated
+    data; nothing is staged or recompressed per bundle.
+  - A bundle is keyed on its file list and content hashes, so after a
+    release only the bundles whose contents changed are rewritten, in
+    parallel.
+  - .downloads/manifest.json lists every bundle with its zip hash and the
+    path, size and sha256 of each file in it.
+
+Entitlements come from the database (user_ea_access joined with active
+users and EAs) or from a JSON file {"userId": ["ea_code", ...]}. Variant
+builds live in --variants DIR/<userId>/<file>.ex5 and replace the standard
+file of the same name for that customer.
+
+Usage:
+    python3 scripts/package_downloads.py build --db sqlite:///path.db [--variants DIR] [--jobs N]
+    python3 scripts/package_downloads.py build --entitlements access.json [--artifact-dir DIR]
+    python3 scripts/package_downloads.py stream USER_ID > bundle.zip
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import build_ea_catalog
+import mql_source
+
+MANIFEST_VERSION = 1
+DEFAULT_ROOT = os.path.join(mql_source.REPO_ROOT, ".downloads")
+CHUNK_SIZE = 1 << 20
+
+ARTIFACT_EXTENSIONS = {'mql5': '.ex5', 'mql4': '.ex4'}
+TERMINAL_FOLDERS = {'mql5': 'MQL5', 'mql4': 'MQL4'}
+
+ENTITLEMENTS_SQL = (
+    'SELECT a."userId", e."eaCode", a."expiresAt" FROM user_ea_access a '
+    'JOIN expert_advisors e ON e.id = a."eaId" '
+    'JOIN users u ON u.id = a."userId" '
+    'WHERE a."isEnabled" AND e."isActive" AND u."isActive" AND u."isApproved"'
+)
+
+# Zip records (APPNOTE 4.3.7 / 4.3.12 / 4.3.16)
+LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<4sHHHHHHIIIHHHHHII')
+END_RECORD = struct.Struct('<4sHHHHIIH')
+ZIP_VERSION = 20
+ZIP_MADE_BY = (3 << 8) | ZIP_VERSION  # unix, so the file mode below is honoured
+ZIP_UTF8_FLAG = 0x800
+ZIP_FILE_MODE = 0o100644 << 16
+
+
+#=============================================================================
+# Entitlements
+#=============================================================================
+def is_expired(value, now):
+    """expiresAt as stored by Prisma: datetime (PostgreSQL), epoch ms or ISO text (SQLite)"""
+    if value is None:
+        return False
+    if isinstance(value, datetime):
+        expires = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    elif isinstance(value, (int, float)):
+        expires = datetime.fromtimestamp(value / 1000, timezone.utc)
+    else:
+        expires = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if not expires.tzinfo:
+            expires = expires.replace(tzinfo=timezone.utc)
+    return expires <= now
+
+
+def load_entitlements_db(url):
+    if url.startswith('sqlite:///'):
+        connection = sqlite3.connect(url[len('sqlite:///'):])
+    elif url.startswith(('postgres://', 'postgresql://')):
+        try:
+            import psycopg2
+        except ImportError:
+            raise SystemExit("PostgreSQL entitlements need psycopg2: pip install psycopg2-binary")
+        connection = psycopg2.connect(url)
+    else:
+        raise SystemExit(f"Unsupported --db URL: {url}")
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(ENTITLEMENTS_SQL)
+        rows = cursor.fetchall()
+    finally:
+        connection.close()
+
+    now = datetime.now(timezone.utc)
+    entitlements = {}
+    for user_id, ea_code, expires_at in rows:
+        if not is_expired(expires_at, now):
+            entitlements.setdefault(user_id, set()).add(ea_code)
+    return entitlements
+
+
+def load_entitlements_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {user_id: set(ea_codes) for user_id, ea_codes in data.items()}
+
+
+#=============================================================================
+# Content-addressed store
+#=============================================================================
+class ArtifactStore:
+    """Deflated artifacts keyed by the sha256 of their content.
+
+    objects/<ab>/<sha256> holds the zip payload (raw deflate, or the bytes
+    as-is when deflating doesn't help) and objects/<ab>/<sha256>.json its
+    size, crc32, method and timestamp. The .json is written last and marks
+    the object as complete. index.json remembers the hash of each ingested
+    path by size and mtime so unchanged artifacts aren't re-read.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.metas = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def meta(self, digest):
+        if digest not in self.metas:
+            with open(self.object_path(digest) + ".json", 'r', encoding='utf-8') as f:
+                self.metas[digest] = json.load(f)
+        return self.metas[digest]
+
+    def cached_digest(self, path):
+        """Hash of path from the index if its size and mtime still match"""
+        stat = os.stat(path)
+        known = self.index.get(path)
+        if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime_ns \
+                and os.path.exists(self.object_path(known['sha256']) + ".json"):
+            return known['sha256']
+        return None
+
+    def ingest(self, path):
+        """Add one artifact; returns (sha256, True if a new object was written)"""
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        self.index[path] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest}
+
+        object_path = self.object_path(digest)
+        if os.path.exists(object_path + ".json"):
+            return digest, False
+
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        method = 8  # deflate
+        if len(payload) >= len(data):
+            payload, method = data, 0  # stored
+        meta = {'size': len(data), 'crc32': zlib.crc32(data), 'method': method,
+                'compressedSize': len(payload), 'mtime': int(stat.st_mtime)}
+
+        write_atomic(object_path, payload)
+        write_atomic(object_path + ".json", json.dumps(meta).encode('utf-8'))
+        self.metas[digest] = meta
+        return digest, True
+
+    def save_index(self):
+        write_atomic(self.index_path, json.dumps(self.index, separators=(',', ':')).encode('utf-8'))
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+#=============================================================================
+# Streaming zip writer
+#=============================================================================
+def dos_datetime(timestamp):
+    t = time.gmtime(max(timestamp, 315532800))  # zip dates start in 1980
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+           ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class ZipStream:
+    """Writes a zip to any writable stream (no seeking) from store objects.
+
+    Sizes and CRCs are known up front, so each entry is a local header
+    followed by the stored payload copied as-is.
+    """
+
+    def __init__(self, out, store):
+        self.out = out
+        self.store = store
+        self.offset = 0
+        self.central = []
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.out.write(data)
+        self.digest.update(data)
+        self.offset += len(data)
+
+    def add(self, name, sha256):
+        meta = self.store.meta(sha256)
+        encoded = name.encode('utf-8')
+        dos_time, dos_date = dos_datetime(meta['mtime'])
+        if self.offset + meta['compressedSize'] > 0xFFFFFFFF or len(self.central) >= 0xFFFF:
+            raise ValueError("Bundle too large for a zip without zip64")
+
+        fields = (ZIP_UTF8_FLAG, meta['method'], dos_time, dos_date,
+                  meta['crc32'], meta['compressedSize'], meta['size'])
+        self.central.append(CENTRAL_HEADER.pack(
+            b'PK\x01\x02', ZIP_MADE_BY, ZIP_VERSION, *fields, len(encoded), 0, 0, 0, 0,
+            ZIP_FILE_MODE, self.offset) + encoded)
+        self.write(LOCAL_HEADER.pack(b'PK\x03\x04', ZIP_VERSION, *fields, len(encoded), 0) + encoded)
+        with open(self.store.object_path(sha256), 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.write(chunk)
+
+    def close(self):
+        start = self.offset
+        for record in self.central:
+            self.write(record)
+        self.write(END_RECORD.pack(b'PK\x05\x06', 0, 0, len(self.central), len(self.central),
+                                   self.offset - start, start, 0))
+        return self.offset, self.digest.hexdigest()
+
+
+def stream_bundle(store, files, out):
+    """Write a bundle for [{'path', 'sha256'}] to out; returns (size, sha256 of the zip)"""
+    stream = ZipStream(out, store)
+    for entry in files:
+        stream.add(entry['path'], entry['sha256'])
+    return stream.close()
+
+
+#=============================================================================
+# Build
+#=============================================================================
+def ea_artifacts(catalog, artifact_dir=None):
+    """eaCode -> [(bundle path, artifact path)] for every compiled dialect"""
+    artifacts = {}
+    for entry in catalog['files']:
+        if not entry['eaCode']:
+            continue
+        source = os.path.join(mql_source.REPO_ROOT, entry['file'])
+        name = os.path.splitext(os.path.basename(source))[0] + ARTIFACT_EXTENSIONS[entry['dialect']]
+        path = os.path.join(artifact_dir or os.path.dirname(source), name)
+        artifacts.setdefault(entry['eaCode'], []).append(
+            (f"{TERMINAL_FOLDERS[entry['dialect']]}/Experts/{name}", path))
+    return artifacts
+
+
+def bundle_key(files):
+    digest = hashlib.sha256()
+    for entry in files:
+        digest.update(f"{entry['path']}\0{entry['sha256']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('manifestVersion') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('bundles', {})
+
+
+def write_bundle(store, files, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            size, digest = stream_bundle(store, files, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size, digest
+
+
+def build(entitlements, root=DEFAULT_ROOT, artifact_dir=None, variants_dir=None, jobs=None, force=False):
+    started = time.time()
+    store = ArtifactStore(os.path.join(root, "store"))
+    bundles_dir = os.path.join(root, "bundles")
+    manifest_path = os.path.join(root, "manifest.json")
+    previous = {} if force else load_manifest(manifest_path)
+
+    catalog = build_ea_catalog.build_catalog(build_ea_catalog.DEFAULT_OUTPUT)
+    artifacts = ea_artifacts(catalog, artifact_dir)
+
+    # Resolve each customer's file list before touching any content
+    plans = {}
+    missing = set()
+    unknown = set()
+    for user_id in sorted(entitlements):
+        variant_dir = os.path.join(variants_dir, user_id) if variants_dir else None
+        files = {}
+        for ea_code in sorted(entitlements[user_id]):
+            if ea_code not in artifacts:
+                unknown.add(ea_code)
+                continue
+            for bundle_path, path in artifacts[ea_code]:
+                if variant_dir:
+                    variant = os.path.join(variant_dir, os.path.basename(path))
+                    if os.path.isfile(variant):
+                        path = variant
+                if os.path.isfile(path):
+                    files[bundle_path] = path
+                else:
+                    missing.add(path)
+        if files:
+            plans[user_id] = files
+
+    # Ingest each distinct artifact once
+    paths = sorted({path for files in plans.values() for path in files.values()})
+    digests = {path: store.cached_digest(path) for path in paths}
+    to_ingest = [path for path in paths if digests[path] is None]
+    created = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for path, (digest, new) in zip(to_ingest, pool.map(store.ingest, to_ingest)):
+            digests[path] = digest
+            created += new
+    store.save_index()
+
+    # Rebuild only bundles whose contents changed
+    bundles = {}
+    to_build = []
+    for user_id, files in plans.items():
+        entries = [{'path': bundle_path, 'sha256': digests[path], 'size': store.meta(digests[path])['size']}
+                   for bundle_path, path in sorted(files.items())]
+        key = bundle_key(entries)
+        bundle = {'file': f"bundles/{user_id}.zip", 'key': key, 'files': entries}
+        old = previous.get(user_id)
+        output = os.path.join(bundles_dir, f"{user_id}.zip")
+        if old and old['key'] == key and os.path.exists(output) and os.path.getsize(output) == old['size']:
+            bundle.update(size=old['size'], sha256=old['sha256'])
+        else:
+            to_build.append((user_id, bundle, output))
+        bundles[user_id] = bundle
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(lambda job: write_bundle(store, job[1]['files'], job[2]), to_build)
+        for (user_id, bundle, output), (size, digest) in zip(to_build, results):
+            bundle.update(size=size, sha256=digest)
+
+    removed = 0
+    for user_id in set(previous) - set(bundles):
+        stale = os.path.join(root, previous[user_id]['file'])
+        if os.path.exists(stale):
+            os.remove(stale)
+        removed += 1
+
+    manifest = {
+        'manifestVersion': MANIFEST_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+        'bundles': {user_id: bundles[user_id] for user_id in sorted(bundles)},
+    }
+    write_atomic(manifest_path, json.dumps(manifest, indent=1).encode('utf-8'))
+
+    for ea_code in sorted(unknown):
+        print(f"WARNING: EA code {ea_code} not found in the catalog")
+    for path in sorted(missing):
+        print(f"WARNING: artifact missing: {os.path.relpath(path, mql_source.REPO_ROOT)}")
+    total_files = sum(len(bundle['files']) for bundle in bundles.values())
+    print(f"\n{len(bundles)} bundles ({total_files} files from {len(set(digests.values()))} distinct artifacts) "
+          f"in {time.time() - started:.1f}s: {len(to_build)} built, {len(bundles) - len(to_build)} unchanged, "
+          f"{removed} removed; {created} new store objects")
+    return manifest
+
+
+def stream(user_id, root=DEFAULT_ROOT, out=None):
+    """Write one customer's bundle to out (stdout by default) straight from the store"""
+    bundles = load_manifest(os.path.join(root, "manifest.json"))
+    if user_id not in bundles:
+        raise SystemExit(f"No bundle for user {user_id} in the manifest; run build first")
+    store = ArtifactStore(os.path.join(root, "store"))
+    size, digest = stream_bundle(store, bundles[user_id]['files'], out or sys.stdout.buffer)
+    print(f"Streamed {size} bytes, sha256 {digest}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-customer EA download bundles")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Store, bundles and manifest folder (default: .downloads)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Refresh every customer bundle")
+    source = build_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="sqlite:///path.db or postgresql://... URL")
+    source.add_argument("--entitlements", help='JSON file {"userId": ["ea_code", ...]}')
+    build_parser.add_argument("--artifact-dir", help="Folder with the .ex4/.ex5 files (default: next to the sources)")
+    build_parser.add_argument("--variants", help="Per-customer overrides in DIR/<userId>/<file>")
+    build_parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count + 4)")
+    build_parser.add_argument("--force", action="store_true", help="Rewrite every bundle")
+
+    stream_parser = subparsers.add_parser("stream", help="Write one bundle to stdout")
+    stream_parser.add_argument("user_id")
+    stream_parser.add_argument("--out", help="Write to this file instead of stdout")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        entitlements = load_entitlements_db(args.db) if args.db else load_entitlements_file(args.entitlements)
+        build(entitlements, args.root, args.artifact_dir, args.variants, args.jobs, args.force)
+    elif args.out:
+        with open(args.out, 'wb') as f:
+            stream(args.user_id, args.root, f)
+    else:
+        stream(args.user_id, args.root)
+
+
+if __name__ == "__main__":
+    main()
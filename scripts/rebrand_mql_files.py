@@ -15,14 +15,16 @@ REPLACEMENTS = [
     ("ea-license-system-one.vercel.app", "myalgostack.com"),
 ]
 
+def rebrand_content(content):
+    for old, new in REPLACEMENTS:
+        content = content.replace(old, new)
+    return content
+
 def process_file(filepath):
     with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+        original = f.read()
     
-    original = content
-    
-    for old, new in REPLACEMENTS:
-        content = content.replace(old, new)
+    content = rebrand_content(original)
     
     if content != original:
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Run the full MQL transform pipeline in a single pass per file.
+
+Instead of invoking update_mql5_license.py, fix_missing_functions.py,
+cleanup_mql5.py, upgrade_ea_features.py, optimize_manage_positions.py and
+rebrand_mql_files.py one after another (each re-reading and rewriting the
+whole tree), every file is read once, passed through the ordered chain of
+transforms in memory and written once. The report lists which transform
+changed which file. With --verify, a file is only written if
+verify_transforms.py finds its trading logic unchanged. The chain is
+idempotent and the committed tree is its output, so a run reports 0
+changes until an EA or a transform changes.
+
+Usage:
+    python3 scripts/run_pipeline.py [--dry-run] [--verify] [--mql-dir PATH]
+"""
+
+import argparse
+import contextlib
+import difflib
+import io
+import os
+
+import cleanup_mql5
+import fix_missing_functions
+import mql_source
+import optimize_manage_positions
+import rebrand_mql_files
+import update_mql5_license
+import upgrade_ea_features
+import upgrade_ea_features_mql4
+import verify_transforms
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MQL_DIR = os.path.join(REPO_ROOT, "mql")
+
+
+def upgrade_mql5(content, filepath):
+    filename = os.path.basename(filepath)
+    if filename in upgrade_ea_features.SKIP_FILES:
+        return content
+    return upgrade_ea_features.upgrade_content(content, filename)
+
+
+def upgrade_mql4(content, filepath):
+    filename = os.path.basename(filepath)
+    if filename in upgrade_ea_features_mql4.SKIP_FILES:
+        return content
+    return upgrade_ea_features_mql4.upgrade_content(content, filename)
+
+
+def optimize_positions(content, filepath):
+    return optimize_manage_positions.optimize_content(content, os.path.splitext(filepath)[1])
+
+
+# Ordered transform chains: (name, transform(content, filepath) -> content)
+MQL5_EXPERT_CHAIN = [
+    ("update_mql5_license", update_mql5_license.update_content),
+    ("fix_missing_functions", lambda content, filepath: fix_missing_functions.fix_content(content)),
+    ("upgrade_ea_features", upgrade_mql5),
+    ("optimize_manage_positions", optimize_positions),
+    ("rebrand_mql_files", lambda content, filepath: rebrand_mql_files.rebrand_content(content)),
+    # Last: it collapses the blank lines the other transforms leave around inserted blocks,
+    # so a second run finds nothing to change
+    ("cleanup_mql5", lambda content, filepath: cleanup_mql5.cleanup_content(content)),
+]
+
+MQL4_EXPERT_CHAIN = [
+    ("upgrade_ea_features_mql4", upgrade_mql4),
+    ("optimize_manage_positions", optimize_positions),
+    ("rebrand_mql_files", lambda content, filepath: rebrand_mql_files.rebrand_content(content)),
+]
+
+INCLUDE_CHAIN = [
+    ("rebrand_mql_files", lambda content, filepath: rebrand_mql_files.rebrand_content(content)),
+]
+
+
+def select_chain(filepath):
+    """Return the transform chain for a file, or None if it is not part of the pipeline"""
+    parent = os.path.basename(os.path.dirname(filepath))
+    if filepath.endswith('.mqh'):
+        return INCLUDE_CHAIN
+    if parent != "Experts":
+        return None
+    if filepath.endswith('.mq5'):
+        return MQL5_EXPERT_CHAIN
+    if filepath.endswith('.mq4'):
+        return MQL4_EXPERT_CHAIN
+    return None
+
+
+def count_changed_lines(before, after):
+    """Return (added, removed) line counts between two versions of a file"""
+    added = 0
+    removed = 0
+    for line in difflib.unified_diff(before.splitlines(), after.splitlines(), n=0, lineterm=''):
+        if line.startswith('+++') or line.startswith('---'):
+            continue
+        if line.startswith('+'):
+            added += 1
+        elif line.startswith('-'):
+            removed += 1
+    return added, removed
+
+
+def run_chain(content, filepath, chain):
+    """Apply every transform in order. Returns (content, [(name, added, removed, notes), ...])"""
+    changes = []
+    for name, transform in chain:
+        # Transforms print their own progress notes; keep them with the report
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            new_content = transform(content, filepath)
+        if new_content != content:
+            added, removed = count_changed_lines(content, new_content)
+            notes = [line.strip() for line in output.getvalue().splitlines() if line.strip()]
+            changes.append((name, added, removed, notes))
+            content = new_content
+    return content, changes
+
+
+def process_file(filepath, chain, dry_run=False, verifier=None):
+    """Read once, transform in memory, write once. Returns the list of changes"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        original = f.read()
+
+    content, changes = run_chain(original, filepath, chain)
+
+    if verifier is not None and content != original and not filepath.endswith('.mqh'):
+        differences = verifier.check(original, content, mql_source.dialect_of(filepath))
+        if differences:
+            raise verify_transforms.NotEquivalent(
+                "transforms changed code outside the managed blocks\n" + verify_transforms.describe(differences))
+
+    if content != original and not dry_run:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    return changes
+
+
+def collect_files(mql_dir):
+    files = []
+    for root, dirs, filenames in os.walk(mql_dir):
+        dirs.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(('.mq4', '.mq5', '.mqh')):
+                files.append(os.path.join(root, filename))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all MQL transforms in a single pass per file")
+    parser.add_argument("--mql-dir", default=MQL_DIR, help="Root folder containing MQL4/ and MQL5/")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing files")
+    parser.add_argument("--verify", action="store_true",
+                        help="Don't write files whose changes reach outside the managed blocks")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.mql_dir):
+        print(f"MQL directory not found: {args.mql_dir}")
+        return
+
+    changed = 0
+    unchanged = 0
+    errors = 0
+    per_transform = {}
+    verifier = None
+    if args.verify:
+        verifier = verify_transforms.Verifier()
+
+    for filepath in collect_files(args.mql_dir):
+        chain = select_chain(filepath)
+        if chain is None:
+            continue
+
+        filename = os.path.basename(filepath)
+        try:
+            changes = process_file(filepath, chain, args.dry_run, verifier)
+        except Exception as e:
+            print(f"ERROR: {filename}: {str(e)}")
+            errors += 1
+            continue
+
+        if not changes:
+            unchanged += 1
+            continue
+
+        changed += 1
+        print(f"{'WOULD UPDATE' if args.dry_run else 'UPDATED'}: {filename}")
+        for name, added, removed, notes in changes:
+            print(f"  [{name}] +{added} -{removed} lines")
+            for note in notes:
+                print(f"      {note}")
+            per_transform[name] = per_transform.get(name, 0) + 1
+
+    if verifier is not None:
+        verifier.save()
+
+    print(f"\nCompleted: {changed} changed, {unchanged} unchanged, {errors} errors")
+    for name, count in per_transform.items():
+        print(f"  {name}: {count} files")
+
+
+if __name__ == "__main__":
+    main()
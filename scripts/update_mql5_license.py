@@ -98,6 +98,27 @@ bool PeriodicLicenseCheck()
 }
 '''
 
+# Replaces the CLicenseValidator initialization in OnInit
+LICENSE_INIT_CODE = '''Print("Validating license...");
+   
+   if(!ValidateLicense())
+   {
+      Print("LICENSE ERROR: ", g_licenseError);
+      Alert("License Error: ", g_licenseError);
+      return INIT_FAILED;
+   }
+   
+   Print("License validated successfully!");
+   Print("Account: ", AccountInfoInteger(ACCOUNT_LOGIN), " | Broker: ", AccountInfoString(ACCOUNT_COMPANY));'''
+
+# Replaces g_license.PeriodicCheck() in OnTick
+LICENSE_TICK_CHECK = '''if(!PeriodicLicenseCheck())
+   {
+      Print("License expired or invalid: ", g_licenseError);
+      ExpertRemove();
+      return;
+   }'''
+
 def extract_ea_code(filename):
     """Extract EA code from filename for LICENSE_EA_CODE define"""
     # Remove .mq5 extension and number prefix
@@ -108,16 +129,12 @@ def extract_ea_code(filename):
     name = name.lower()
     return name
 
-def process_file(filepath):
-    """Process a single MQL5 EA file to update the license format"""
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+def update_content(content, filepath):
+    """Return content converted to the embedded license format"""
     
     # Skip if already updated (has LICENSE_API_URL define)
     if '#define LICENSE_API_URL' in content:
-        print(f"SKIP (already updated): {os.path.basename(filepath)}")
-        return False
+        return content
     
     # Extract EA code
     ea_code = extract_ea_code(filepath)
@@ -166,21 +183,9 @@ def process_file(filepath):
         r'g_license\s*=\s*new\s+CLicenseValidator\s*\(\s*\)\s*;\s*\n\s*g_license\.Initialize\s*\([^)]+\)\s*;\s*\n\s*if\s*\(\s*!\s*g_license\.ValidateLicense\s*\(\s*\)\s*\)\s*\{\s*Print\s*\(\s*"License failed"\s*\)\s*;\s*return\s+INIT_FAILED\s*;\s*\}',
     ]
     
-    new_init = '''Print("Validating license...");
-   
-   if(!ValidateLicense())
-   {
-      Print("LICENSE ERROR: ", g_licenseError);
-      Alert("License Error: ", g_licenseError);
-      return INIT_FAILED;
-   }
-   
-   Print("License validated successfully!");
-   Print("Account: ", AccountInfoInteger(ACCOUNT_LOGIN), " | Broker: ", AccountInfoString(ACCOUNT_COMPANY));'''
-    
     for pattern in old_init_patterns:
         if re.search(pattern, content, re.DOTALL):
-            content = re.sub(pattern, new_init, content, flags=re.DOTALL)
+            content = re.sub(pattern, LICENSE_INIT_CODE, content, flags=re.DOTALL)
             break
     
     # Update OnDeinit to remove license cleanup
@@ -190,16 +195,26 @@ def process_file(filepath):
     
     # Update OnTick to use PeriodicLicenseCheck
     content = re.sub(r'if\s*\(\s*!\s*g_license\.PeriodicCheck\s*\(\s*\)\s*\)\s*return\s*;', 
-                     '''if(!PeriodicLicenseCheck())
-   {
-      Print("License expired or invalid: ", g_licenseError);
-      ExpertRemove();
-      return;
-   }''', content)
+                     LICENSE_TICK_CHECK, content)
     
     # Clean up any double newlines
     content = re.sub(r'\n{3,}', '\n\n', content)
     
+    return content
+
+def process_file(filepath):
+    """Process a single MQL5 EA file to update the license format"""
+    
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Skip if already updated (has LICENSE_API_URL define)
+    if '#define LICENSE_API_URL' in content:
+        print(f"SKIP (already updated): {os.path.basename(filepath)}")
+        return False
+    
+    content = update_content(content, filepath)
+    
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(content)
     
@@ -1,8 +1,15 @@
 import os
 import re
 
+import mql_source
+
 EXPERTS_DIR = "/Users/nut/Downloads/ea-license-system/mql/MQL5/Experts"
 
+# 01_MA_Crossover is the reference EA that already carries the features. Trade_Reporter
+# only reports trades (no LotSize/MagicNumber inputs for the helpers), and Grid_Trader
+# spaces fixed per-level TPs that trailing/break-even SL moves would cut short.
+SKIP_FILES = ["01_MA_Crossover_EA.mq5", "43_Grid_Trader_EA.mq5", "Trade_Reporter_EA.mq5"]
+
 # Code Blocks to Inject
 INPUTS_BLOCK = """
 //--- MONEY MANAGEMENT ---
@@ -168,15 +175,29 @@ void ManagePositions()
 }
 """
 
-def process_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+# Injected at the top of OnTick
+MANAGE_POSITIONS_CALL = "\n   // Manage open positions (Trailing Stop & BreakEven)\n   ManagePositions();"
 
-    filename = os.path.basename(filepath)
-    print(f"Processing {filename}...")
+# Lot calculation injected before the order is sent
+LOT_LOGIC_BLOCK = """
+   // Calculate Lot Size
+   double tradeVolume = LotSize;
+   if(UseMoneyManagement)
+   {
+      double riskSL = StopLoss; // Risk distance in points
+      if(riskSL <= 0) riskSL = 100; // Default safety
+      tradeVolume = GetLotSize(riskSL);
+   }
+   
+   request.volume = tradeVolume;"""
+
+def upgrade_content(content, filename):
+    """Return content with MM/trailing inputs, OnTick hook and helper functions injected"""
+    # Inputs and helpers may live in EALicense includes after find_duplicate_blocks.py --extract
+    present = mql_source.with_shared_includes(content, 'mql5')
 
     # 1. Insert Inputs and Forward Declarations (Only if missing)
-    if "UseMoneyManagement" not in content:
+    if "UseMoneyManagement" not in present:
         # Find the last "input" line
         last_input_idx = -1
         for match in re.finditer(r'input\s+.*?;', content):
@@ -207,40 +228,39 @@ def process_file(filepath):
         
         if "ManagePositions();" not in on_tick_body_snippet:
             # Insert call at the start of the function
-            content = content[:on_tick_start] + "\n   // Manage open positions (Trailing Stop & BreakEven)\n   ManagePositions();" + content[on_tick_start:]
+            content = content[:on_tick_start] + MANAGE_POSITIONS_CALL + content[on_tick_start:]
             print(f"  > Added ManagePositions() call to OnTick")
     else:
          print(f"  WARNING: Could not find 'void OnTick() {{' pattern in {filename}")
 
     # 3. Update OpenPosition Logic
-    if "GetLotSize(riskSL)" not in content:
+    if "GetLotSize(riskSL)" not in present:
         lot_assignment_pattern = r'request\.volume\s*=\s*(LotSize|.*_LotSize);'
-        
-        new_lot_logic = """
-   // Calculate Lot Size
-   double tradeVolume = LotSize;
-   if(UseMoneyManagement)
-   {
-      double riskSL = StopLoss; // Risk distance in points
-      if(riskSL <= 0) riskSL = 100; // Default safety
-      tradeVolume = GetLotSize(riskSL);
-   }
-   
-   request.volume = tradeVolume;"""
 
         if re.search(lot_assignment_pattern, content):
-            content = re.sub(lot_assignment_pattern, new_lot_logic, content)
+            content = re.sub(lot_assignment_pattern, LOT_LOGIC_BLOCK, content)
             print(f"  > Updated OpenPosition lot calculation")
 
     # 4. Append Helper Functions
     # Check if the Helper Function BODY is present. 
     # The forward declaration "void ManagePositions();" might be there, so we check for the definition header without semicolon
-    if "void ManagePositions()\n{" not in content and "void ManagePositions() \n{" not in content and "void ManagePositions(){" not in content:
+    if "void ManagePositions()\n{" not in present and "void ManagePositions() \n{" not in present and "void ManagePositions(){" not in present:
         # Check if we didn't already append it (double check unique string inside)
-        if "double moneyPerPointPerLot =" not in content:
+        if "double moneyPerPointPerLot =" not in present:
             content += "\n" + HELPER_FUNCTIONS_BLOCK
             print(f"  > Appended Helper Functions")
 
+    return content
+
+def process_file(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    filename = os.path.basename(filepath)
+    print(f"Processing {filename}...")
+
+    content = upgrade_content(content, filename)
+
     # Write back
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(content)
@@ -254,7 +274,7 @@ def main():
     files.sort()
 
     for filename in files:
-        if filename == "01_MA_Crossover_EA.mq5":
+        if filename in SKIP_FILES:
             continue
         
         filepath = os.path.join(EXPERTS_DIR, filename)
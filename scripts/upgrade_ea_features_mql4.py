@@ -1,8 +1,15 @@
 import os
 import re
 
+import mql_source
+
 EXPERTS_DIR = "/Users/nut/Downloads/ea-license-system/mql/MQL4/Experts"
 
+# 01_MA_Crossover is the reference EA that already carries the features. Trade_Reporter
+# only reports trades (no LotSize/MagicNumber inputs for the helpers), and Grid_Trader
+# spaces fixed per-level TPs that trailing/break-even SL moves would cut short.
+SKIP_FILES = ["01_MA_Crossover_EA.mq4", "43_Grid_Trader_EA.mq4", "Trade_Reporter_EA.mq4"]
+
 # MQL4 Inputs Code Block
 INPUTS_BLOCK = """
 //--- MONEY MANAGEMENT ---
@@ -140,15 +147,29 @@ void ManagePositions()
 }
 """
 
-def process_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+# Injected at the top of OnTick
+MANAGE_POSITIONS_CALL = "\n   // Manage open positions (Trailing Stop & BreakEven)\n   ManagePositions();"
 
-    filename = os.path.basename(filepath)
-    print(f"Processing {filename}...")
+# Lot calculation injected before the order is sent
+LOT_LOGIC_BLOCK = """
+   // Calculate Lot Size
+   double tradeVolume = LotSize;
+   if(UseMoneyManagement)
+   {
+      double riskSL = StopLoss; // Risk distance in points
+      if(riskSL <= 0) riskSL = 100; // Default safety
+      tradeVolume = GetLotSize(riskSL);
+   }
+
+"""
+
+def upgrade_content(content, filename):
+    """Return content with MM/trailing inputs, OnTick hook and helper functions injected"""
+    # Inputs and helpers may live in EALicense includes after find_duplicate_blocks.py --extract
+    present = mql_source.with_shared_includes(content, 'mql4')
 
     # 1. Insert Inputs and Forward Declarations
-    if "UseMoneyManagement" not in content:
+    if "UseMoneyManagement" not in present:
         # Find the last "input" line
         last_input_idx = -1
         for match in re.finditer(r'input\s+.*?;', content):
@@ -177,14 +198,14 @@ def process_file(filepath):
         on_tick_body_snippet = content[on_tick_start:on_tick_start+500]
         
         if "ManagePositions();" not in on_tick_body_snippet:
-            content = content[:on_tick_start] + "\n   // Manage open positions (Trailing Stop & BreakEven)\n   ManagePositions();" + content[on_tick_start:]
+            content = content[:on_tick_start] + MANAGE_POSITIONS_CALL + content[on_tick_start:]
             print(f"  > Added ManagePositions() call to OnTick")
     else:
          print(f"  WARNING: Could not find 'void OnTick() {{' pattern in {filename}")
 
     # 3. Update OpenOrder/OrderSend Logic
     # MQL4 OrderSend
-    if "GetLotSize(riskSL)" not in content:
+    if "GetLotSize(riskSL)" not in present:
         # Match OrderSend call: OrderSend(..., LotSize, ...)
         # We need to capture the whole line to replace it properly
         # pattern: int ticket = OrderSend(...);
@@ -195,23 +216,11 @@ def process_file(filepath):
         if match:
             original_line = match.group(1)
             if "LotSize" in original_line:
-                # Construct Replacement
-                new_lot_logic = """
-   // Calculate Lot Size
-   double tradeVolume = LotSize;
-   if(UseMoneyManagement)
-   {
-      double riskSL = StopLoss; // Risk distance in points
-      if(riskSL <= 0) riskSL = 100; // Default safety
-      tradeVolume = GetLotSize(riskSL);
-   }
-
-"""
                 # Replace LotSize with tradeVolume in the OrderSend call
                 modified_line = original_line.replace("LotSize", "tradeVolume")
                 
                 # Combine
-                replacement = new_lot_logic + "   " + modified_line
+                replacement = LOT_LOGIC_BLOCK + "   " + modified_line
                 
                 content = content.replace(original_line, replacement)
                 print(f"  > Updated OrderSend lot calculation")
@@ -220,12 +229,23 @@ def process_file(filepath):
 
     # 4. Append Helper Functions
     # Check if "double GetLotSize" definition exists
-    if "double GetLotSize(double slPoints)\n{" not in content and "double GetLotSize(double slPoints) \n{" not in content:
+    if "double GetLotSize(double slPoints)\n{" not in present and "double GetLotSize(double slPoints) \n{" not in present:
         # Avoid duplicate append
-        if "double moneyPerPointPerLot =" not in content:
+        if "double moneyPerPointPerLot =" not in present:
             content += "\n" + HELPER_FUNCTIONS_BLOCK
             print(f"  > Appended Helper Functions")
 
+    return content
+
+def process_file(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    filename = os.path.basename(filepath)
+    print(f"Processing {filename}...")
+
+    content = upgrade_content(content, filename)
+
     # Write back
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(content)
@@ -239,7 +259,7 @@ def main():
     files.sort()
 
     for filename in files:
-        if filename == "01_MA_Crossover_EA.mq4":
+        if filename in SKIP_FILES:
             continue
         
         filepath = os.path.join(EXPERTS_DIR, filename)
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Check that the MQL transforms leave EA trading logic untouched.
+
+The license and feature transforms are regex rewrites, and some of them act
+on the whole file (cleanup_mql5.py collapses every run of blank lines, for
+example). This stage compares the pre- and post-transform versions of each
+EA as token streams:
+
+  - comments and whitespace are dropped (mql_source.code_mask), string
+    literals get the rebrand replacements, directives are compared as one
+    normalized token per line;
+  - statements that are exactly what a transform inserts are masked on
+    both sides, matched against the transforms' own templates: the
+    license defines, input, validator and OnInit/OnTick checks, the
+    feature inputs, GetLotSize/ManagePositions with their forward
+    declarations, the ManagePositions() call and the lot logic; so are the
+    legacy CLicenseValidator code the license transform removes and the
+    ManagePositions() helper optimize_manage_positions.py replaces. An EA's
+    own statements are compared even when they use the same names
+    (RiskPercent, LotSize, ...);
+  - tradeVolume reads as LotSize only in the order's volume
+    (<request>.volume = ... and the volume argument of OrderSend);
+  - includes written by find_duplicate_blocks.py --extract are expanded
+    in place, so extraction itself reads as no change;
+  - everything left must be token-identical.
+
+By default every EA is run through the run_pipeline.py chain in memory and
+checked. With --against REV, files already rewritten in the working tree
+are compared with their version at REV. Results are cached in
+.verify_cache.json by the hashes of both versions, and files are checked
+in parallel.
+
+Usage:
+    python3 scripts/verify_transforms.py [--jobs N] [--against REV] [--no-cache] [FILE ...]
+    python3 scripts/run_pipeline.py --verify
+"""
+
+import argparse
+import bisect
+import difflib
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+
+import fix_missing_functions
+import mql_source
+import optimize_manage_positions
+import rebrand_mql_files
+import update_mql5_license
+import upgrade_ea_features
+import upgrade_ea_features_mql4
+
+CACHE_PATH = os.path.join(mql_source.REPO_ROOT, ".verify_cache.json")
+MAX_DIFFERENCES = 5
+PARALLEL_THRESHOLD = 8
+
+# Stands for the parts of a template the transform fills in (EA code, magic
+# number variable, Initialize() arguments)
+TEMPLATE_WILDCARD = '__template_wildcard__'
+
+# Legacy CLicenseValidator code update_mql5_license.py removes, one
+# statement per line, matching what its regexes accept
+LEGACY_LICENSE_CODE = f"""
+#include <EALicense/LicenseValidator.mqh>
+input string EA_ApiKey = "";
+input string EA_ApiSecret = "";
+input string InpApiKey = "";
+input string InpApiSecret = "";
+CLicenseValidator g_license;
+CLicenseValidator *g_license;
+CLicenseValidator *g_license = NULL;
+CLicenseValidator *g_licenseValidator = NULL;
+bool g_isLicensed = false;
+datetime g_lastRevalidation = 0;
+g_license = new CLicenseValidator();
+g_license.Initialize({TEMPLATE_WILDCARD});
+g_isLicensed = g_license.ValidateLicense();
+if(!g_isLicensed) {{ Print("License validation failed: ", g_license.GetLastError()); return INIT_FAILED; }}
+if(!g_license.ValidateLicense()) {{ Print("License failed"); return INIT_FAILED; }}
+if(g_license != NULL) {{ delete g_license; g_license = NULL; }}
+if(g_licenseValidator != NULL) {{ delete g_licenseValidator; g_licenseValidator = NULL; }}
+if(!g_license.PeriodicCheck()) return;
+"""
+
+# The MQL5 EAs carried the injected ManagePositions() with the request and
+# result zeroed before optimize_manage_positions.py rewrote it
+LEGACY_ZERO_MEMORY = ('MqlTradeResult result = {};',
+                      'MqlTradeResult result = {}; ZeroMemory(request); ZeroMemory(result);')
+
+# Local introduced by the lot logic, read as the input it replaces in the
+# order's volume (request.volume = tradeVolume; OrderSend(sym, cmd, tradeVolume, ...))
+VOLUME_ALIASES = {'tradeVolume': 'LotSize'}
+ORDER_SEND_VOLUME_ARGUMENT = 2
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<directive>\#[^\n]*)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+  | (?P<number>0[xX][0-9A-Fa-f]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>::|->|\+\+|--|<<=?|>>=?|&&|\|\||[-+*/%&|^!=<>]=?|[^\s])
+''', re.VERBOSE)
+
+
+class NotEquivalent(Exception):
+    """Raised by run_pipeline.py --verify when a transform touched unmanaged code"""
+
+
+#=============================================================================
+# Tokens
+#=============================================================================
+def generated_include(directive, dialect):
+    """Text of the find_duplicate_blocks.py include a directive names, or None"""
+    match = mql_source.SHARED_INCLUDE_PATTERN.match(directive)
+    if not match or dialect is None:
+        return None
+    path = os.path.join(mql_source.INCLUDE_DIRS[dialect], *match.group('path').split('/'))
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    return text if mql_source.GENERATED_INCLUDE_MARKER in text else None
+
+
+def tokenize(content, dialect=None, depth=0):
+    """
+    Return [(kind, text, line)] for the code in content, comments and whitespace dropped.
+
+    With a dialect, includes written by find_duplicate_blocks.py --extract are
+    expanded in place (at the directive's line), so extracting a function or
+    input block compares equal to leaving it inline.
+    """
+    masked = mql_source.code_mask(content, blank_strings=False)
+    newlines = [match.start() for match in re.finditer('\n', masked)]
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(masked):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'directive':
+            text = ' '.join(text.split())
+            included = generated_include(text, dialect) if depth < 4 else None
+            if included is not None:
+                line = bisect.bisect_left(newlines, match.start()) + 1
+                tokens.extend((kind, text, line) for kind, text, _ in tokenize(included, dialect, depth + 1))
+                continue
+        if kind in ('directive', 'string'):
+            for old, new in rebrand_mql_files.REPLACEMENTS:
+                text = text.replace(old, new)
+        tokens.append((kind, text, bisect.bisect_left(newlines, match.start()) + 1))
+    return tokens
+
+
+def matching_brace(tokens, start, end):
+    depth = 0
+    for index in range(start, end):
+        text = tokens[index][1]
+        if text == '{':
+            depth += 1
+        elif text == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+    return end - 1
+
+
+def next_statement(tokens, start, end):
+    """Return (stop, blocks) for the statement at start; blocks are (open, close) brace indexes"""
+    if tokens[start][0] == 'directive':
+        return start + 1, []
+    blocks = []
+    depth = 0
+    index = start
+    while index < end:
+        text = tokens[index][1]
+        if text in ('(', '['):
+            depth += 1
+        elif text in (')', ']'):
+            depth -= 1
+        elif depth <= 0 and text == ';':
+            return index + 1, blocks
+        elif depth <= 0 and text == '{':
+            close = matching_brace(tokens, index, end)
+            blocks.append((index, close))
+            following = tokens[close + 1][1] if close + 1 < end else None
+            if following == ';':
+                return close + 2, blocks
+            if following == 'else' or (following == 'while' and tokens[start][1] == 'do'):
+                index = close + 1
+                continue
+            return close + 1, blocks
+        index += 1
+    return end, blocks
+
+
+#=============================================================================
+# Managed blocks
+#=============================================================================
+def template_sources():
+    """The text every transform inserts, plus the legacy code the license transform removes"""
+    sources = [
+        update_mql5_license.LICENSE_TEMPLATE.format(ea_code=TEMPLATE_WILDCARD),
+        update_mql5_license.LICENSE_VALIDATOR_CODE,
+        update_mql5_license.LICENSE_INIT_CODE,
+        update_mql5_license.LICENSE_TICK_CHECK,
+        fix_missing_functions.LICENSE_VALIDATOR_CODE,
+        LEGACY_LICENSE_CODE,
+        optimize_manage_positions.INTERVAL_INPUT,
+    ]
+    for module in (upgrade_ea_features, upgrade_ea_features_mql4):
+        sources += [module.INPUTS_BLOCK, module.HELPER_FUNCTIONS_BLOCK, module.MANAGE_POSITIONS_CALL,
+                    module.LOT_LOGIC_BLOCK]
+    sources += [template.replace('{magic}', TEMPLATE_WILDCARD)
+                for template in optimize_manage_positions.MANAGE_POSITIONS_TEMPLATES.values()]
+    sources += legacy_manage_positions()
+    return sources
+
+
+def legacy_manage_positions():
+    """The ManagePositions() helpers optimize_manage_positions.py replaces, with any magic number variable"""
+    helpers = []
+    for module in (upgrade_ea_features, upgrade_ea_features_mql4):
+        block = module.HELPER_FUNCTIONS_BLOCK
+        match = optimize_manage_positions.MANAGE_POSITIONS_DEF_PATTERN.search(block)
+        start, end = optimize_manage_positions.find_function_span(block, match.start())
+        helper = re.sub(r'!=\s*MagicNumber\b', '!= ' + TEMPLATE_WILDCARD, block[start:end])
+        helpers += [helper, helper.replace(*LEGACY_ZERO_MEMORY)]
+    return helpers
+
+
+def statement_key(texts):
+    """Index key of a statement: its first token, or the first two words of a directive"""
+    return ' '.join(texts[0].split()[:2]) if texts[0].startswith('#') else texts[0]
+
+
+def build_template_index():
+    """{statement key: [(token count or None, pattern)]} for every top-level template statement"""
+    index = {}
+    seen = set()
+    for source in template_sources():
+        tokens = tokenize(source)
+        position = 0
+        while position < len(tokens):
+            stop, _ = next_statement(tokens, position, len(tokens))
+            statement = tokens[position:stop]
+            position = stop
+            texts = [token[1] for token in statement]
+            # request.volume = tradeVolume; replaces the EA's own assignment, which is compared through the alias
+            if [token[1] for token in alias_volume(statement)] != texts:
+                continue
+            joined = '\n'.join(texts)
+            if joined in seen:
+                continue
+            seen.add(joined)
+            # A wildcard can stand for several tokens, so those templates have no fixed length
+            wildcard = TEMPLATE_WILDCARD in joined
+            pattern = re.compile(re.escape(joined).replace(TEMPLATE_WILDCARD, r'[^()]*?'))
+            index.setdefault(statement_key(texts), []).append((None if wildcard else len(texts), pattern))
+    return index
+
+
+
+def is_managed(statement):
+    """Whether a whole statement (blocks included) is exactly one the transforms insert or remove"""
+    if not statement:
+        return False
+    texts = [token[1] for token in statement]
+    candidates = TEMPLATE_INDEX.get(statement_key(texts))
+    if not candidates:
+        return False
+    joined = None
+    for count, pattern in candidates:
+        if count is not None and count != len(texts):
+            continue
+        joined = '\n'.join(texts) if joined is None else joined
+        if pattern.fullmatch(joined):
+            return True
+    return False
+
+
+def argument_span(tokens, open_index, number):
+    """(start, stop) of argument `number` of the call whose '(' is at open_index, or None"""
+    depth = 0
+    argument = 0
+    start = open_index + 1
+    for index in range(open_index, len(tokens)):
+        text = tokens[index][1]
+        if text in ('(', '['):
+            depth += 1
+        elif text in (')', ']'):
+            depth -= 1
+            if depth == 0:
+                return (start, index) if argument == number else None
+        elif text == ',' and depth == 1:
+            if argument == number:
+                return start, index
+            argument += 1
+            start = index + 1
+    return None
+
+
+def alias_volume(tokens):
+    """Read tradeVolume as LotSize where the lot logic puts it, and nowhere else: the order's volume"""
+    if not any(token[1] in VOLUME_ALIASES for token in tokens):
+        return tokens
+    spans = []
+    for index, (kind, text, line) in enumerate(tokens):
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        # <request>.volume = <expression>;
+        if text == 'volume' and index > 0 and tokens[index - 1][1] == '.' and following == '=':
+            stop = index + 2
+            while stop < len(tokens) and tokens[stop][1] != ';':
+                stop += 1
+            spans.append((index + 2, stop))
+        # OrderSend(symbol, cmd, <volume>, ...)
+        elif kind == 'name' and text == 'OrderSend' and following == '(':
+            span = argument_span(tokens, index + 1, ORDER_SEND_VOLUME_ARGUMENT)
+            if span:
+                spans.append(span)
+    if not spans:
+        return tokens
+    tokens = list(tokens)
+    for start, stop in spans:
+        for index in range(start, stop):
+            kind, text, line = tokens[index]
+            if kind == 'name' and text in VOLUME_ALIASES:
+                tokens[index] = (kind, VOLUME_ALIASES[text], line)
+    return tokens
+
+
+TEMPLATE_INDEX = build_template_index()
+
+
+def unmanaged_tokens(tokens, start=0, end=None, out=None):
+    """Tokens outside the managed blocks, in order, with the order volume aliased"""
+    end = len(tokens) if end is None else end
+    out = [] if out is None else out
+    index = start
+    while index < end:
+        stop, blocks = next_statement(tokens, index, end)
+        if not is_managed(tokens[index:stop]):
+            position = index
+            for open_index, close_index in blocks:
+                out.extend(alias_volume(tokens[position:open_index + 1]))
+                unmanaged_tokens(tokens, open_index + 1, close_index, out)
+                position = close_index
+            out.extend(alias_volume(tokens[position:stop]))
+        index = stop
+    return out
+
+
+#=============================================================================
+# Comparison
+#=============================================================================
+def compare(before, after, dialect=None):
+    """Return a list of differences outside the managed blocks (empty when equivalent).
+
+    Each difference is {'before': [line, text], 'after': [line, text]} with up
+    to a few tokens of context either side. The dialect locates generated
+    EALicense includes; without it they stay single directive tokens.
+    """
+    tokens_before = unmanaged_tokens(tokenize(before, dialect))
+    tokens_after = unmanaged_tokens(tokenize(after, dialect))
+    texts_before = [token[1] for token in tokens_before]
+    texts_after = [token[1] for token in tokens_after]
+    if texts_before == texts_after:
+        return []
+
+    def excerpt(tokens, start, stop):
+        if start < stop:
+            return [tokens[start][2], ' '.join(token[1] for token in tokens[start:stop])]
+        anchor = tokens[min(start, len(tokens) - 1)][2] if tokens else 0
+        return [anchor, '']
+
+    differences = []
+    matcher = difflib.SequenceMatcher(None, texts_before, texts_after, autojunk=False)
+    for op, b_start, b_stop, a_start, a_stop in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        differences.append({'before': excerpt(tokens_before, b_start, b_stop),
+                             'after': excerpt(tokens_after, a_start, a_stop)})
+        if len(differences) >= MAX_DIFFERENCES:
+            break
+    return differences
+
+
+def describe(differences):
+    lines = []
+    for difference in differences:
+        before_line, before_text = difference['before']
+        after_line, after_text = difference['after']
+        lines.append(f"  before:{before_line}: {before_text or '(nothing)'}")
+        lines.append(f"  after:{after_line}: {after_text or '(nothing)'}")
+    return '\n'.join(lines)
+
+
+def checker_hash():
+    """Changing the checker, the shared masking, a transform template or an EALicense include invalidates the cache"""
+    digest = hashlib.sha256()
+    # The transform modules define the templates that are masked
+    modules = [__file__, mql_source.__file__, rebrand_mql_files.__file__, fix_missing_functions.__file__,
+               optimize_manage_positions.__file__, update_mql5_license.__file__, upgrade_ea_features.__file__,
+               upgrade_ea_features_mql4.__file__]
+    for module in modules + mql_source.shared_include_files():
+        digest.update(os.path.abspath(module).encode('utf-8'))
+        with open(os.path.abspath(module), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def compare_job(job):
+    """Worker: (key, before, after, dialect) -> (key, differences)"""
+    key, before, after, dialect = job
+    return key, compare(before, after, dialect)
+
+
+class Verifier:
+    """compare() with a cache keyed by the hashes of both versions"""
+
+    def __init__(self, cache_path=CACHE_PATH, use_cache=True):
+        self.cache_path = cache_path if use_cache else None
+        self.version = checker_hash()
+        self.results = {}
+        self.used = set()
+        self.hits = 0
+        if self.cache_path:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache.get('checkerHash') == self.version:
+                    self.results = cache.get('results', {})
+            except (OSError, ValueError):
+                pass
+
+    def key(self, before, after, dialect):
+        return f"{dialect}:{content_hash(before)}:{content_hash(after)}"
+
+    def check_many(self, pairs, jobs=None):
+        """pairs: [(before, after, dialect)] -> [differences] in the same order"""
+        keys = [self.key(before, after, dialect) for before, after, dialect in pairs]
+        self.used.update(keys)
+        pending = {}
+        for key, (before, after, dialect) in zip(keys, pairs):
+            if key in self.results:
+                self.hits += 1
+            elif before == after:
+                self.results[key] = []
+            else:
+                pending[key] = (key, before, after, dialect)
+
+        if len(pending) > PARALLEL_THRESHOLD and jobs != 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                self.results.update(pool.map(compare_job, pending.values(), chunksize=4))
+        else:
+            self.results.update(map(compare_job, pending.values()))
+        return [self.results[key] for key in keys]
+
+    def check(self, before, after, dialect=None):
+        return self.check_many([(before, after, dialect)], jobs=1)[0]
+
+    def save(self, prune=False):
+        """Write the cache; prune keeps only the results used in this run"""
+        if not self.cache_path:
+            return
+        results = {key: value for key, value in self.results.items() if key in self.used} if prune else self.results
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'checkerHash': self.version, 'results': results}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+
+
+#=============================================================================
+# Corpus runs
+#=============================================================================
+def pipeline_output(filepath, content):
+    import run_pipeline
+    chain = run_pipeline.select_chain(filepath)
+    return run_pipeline.run_chain(content, filepath, chain)[0] if chain else content
+
+
+def git_version(revision, filepath):
+    """File content at a git revision, or None if it didn't exist there"""
+    rel = os.path.relpath(filepath, mql_source.REPO_ROOT).replace(os.sep, '/')
+    result = subprocess.run(['git', 'show', f"{revision}:{rel}"], capture_output=True, cwd=mql_source.REPO_ROOT)
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode('utf-8', errors='ignore')
+
+
+def main():
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Check that MQL transforms only change managed blocks")
+    parser.add_argument("files", nargs="*", help="EA sources (default: every EA in both dialects)")
+    parser.add_argument("--against", metavar="REV", help="Compare the working tree with this git revision "
+                                                         "instead of running the pipeline in memory")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update .verify_cache.json")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in args.files] or \
+        mql_source.list_sources('mql5') + mql_source.list_sources('mql4')
+
+    pairs = []
+    checked = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            current = f.read()
+        if args.against:
+            before = git_version(args.against, path)
+            if before is None:
+                continue
+            pairs.append((before, current, mql_source.dialect_of(path)))
+        else:
+            pairs.append((current, pipeline_output(path, current), mql_source.dialect_of(path)))
+        checked.append(path)
+
+    verifier = Verifier(use_cache=not args.no_cache)
+    results = verifier.check_many(pairs, args.jobs)
+    verifier.save(prune=not args.files)
+
+    failed = 0
+    for path, (before, after, dialect), differences in zip(checked, pairs, results):
+        rel = os.path.relpath(path, mql_source.REPO_ROOT)
+        if differences:
+            failed += 1
+            print(f"NOT EQUIVALENT: {rel}")
+            print(describe(differences))
+        elif before != after:
+            print(f"EQUIVALENT: {rel}")
+
+    changed = sum(1 for before, after, dialect in pairs if before != after)
+    print(f"\n{len(pairs)} files, {changed} changed, {failed} not equivalent "
+          f"({verifier.hits} cached) in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,6 +9,7 @@ import { Input } from "@/components/ui/input"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { Download, Bot, Loader2, Search, Package, AlertTriangle, Wrench, TrendingUp } from "lucide-react"
 import { useToast } from "@/hooks/use-toast"
+import type { EACategory } from "@/lib/ea-catalog"
 
 interface ExpertAdvisor {
   id: string
@@ -17,10 +18,12 @@ interface ExpertAdvisor {
   description: string | null
   currentVersion: string
   isActive: boolean
+  // From mql/catalog.json (src/lib/ea-catalog.ts), set by /api/eas
+  category: EACategory
   expiresAt: string | null
 }
 
-type Category = "all" | "basic" | "advanced" | "martingale" | "utility"
+type Category = "all" | EACategory
 
 const categoryInfo: Record<Category, { label: string; icon: React.ElementType; description: string }> = {
   all: { label: "All EAs", icon: Package, description: "All available Expert Advisors" },
@@ -30,27 +33,6 @@ const categoryInfo: Record<Category, { label: string; icon: React.ElementType; d
   utility: { label: "Utilities & Tools", icon: Wrench, description: "Trading utilities and helpers (31-40)" },
 }
 
-function getCategory(eaCode: string): Category {
-  const code = eaCode.toLowerCase()
-  if (code.includes("martingale") || code.includes("dalembert") || code.includes("labouchere") ||
-    code.includes("parlay") || code.includes("oscar") || code.includes("hybrid_martingale")) {
-    return "martingale"
-  }
-  if (code.includes("manager") || code.includes("calculator") || code.includes("protector") ||
-    code.includes("monitor") || code.includes("copier") || code.includes("session") ||
-    code.includes("block") || code.includes("journal") || code.includes("news_filter_utility")) {
-    return "utility"
-  }
-  // Advanced EAs (11-20)
-  if (code.includes("multi_timeframe") || code.includes("fibonacci_retracement") ||
-    code.includes("price_action") || code.includes("momentum") || code.includes("london") ||
-    code.includes("mean_reversion") || code.includes("keltner") || code.includes("williams") ||
-    code.includes("parabolic") || code.includes("hedge")) {
-    return "advanced"
-  }
-  return "basic"
-}
-
 export default function DownloadsPage() {
   const { toast } = useToast()
   const [searchQuery, setSearchQuery] = useState("")
@@ -121,12 +103,12 @@ export default function DownloadsPage() {
     const matchesSearch = ea.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
       ea.eaCode.toLowerCase().includes(searchQuery.toLowerCase()) ||
       ea.description?.toLowerCase().includes(searchQuery.toLowerCase())
-    const matchesCategory = activeCategory === "all" || getCategory(ea.eaCode) === activeCategory
+    const matchesCategory = activeCategory === "all" || ea.category === activeCategory
     return matchesSearch && matchesCategory
   }) || []
 
   const categoryCounts = data?.eas?.reduce((acc: Record<Category, number>, ea: ExpertAdvisor) => {
-    const cat = getCategory(ea.eaCode)
+    const cat = ea.category
     acc[cat] = (acc[cat] || 0) + 1
     acc.all = (acc.all || 0) + 1
     return acc
@@ -192,7 +174,7 @@ export default function DownloadsPage() {
           ) : filteredEAs.length > 0 ? (
             <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
               {filteredEAs.map((ea: ExpertAdvisor) => {
-                const category = getCategory(ea.eaCode)
+                const category = ea.category
                 const CategoryIcon = categoryInfo[category].icon
 
                 return (
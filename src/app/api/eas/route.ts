@@ -2,6 +2,7 @@ import { NextResponse } from "next/server"
 import { getServerSession } from "next-auth"
 import { authOptions } from "@/lib/auth"
 import { prisma } from "@/lib/db"
+import { getEaCatalog } from "@/lib/ea-catalog"
 
 export async function GET() {
   try {
@@ -25,10 +26,12 @@ export async function GET() {
       },
     })
 
+    const catalog = getEaCatalog()
     const eas = userEaAccess
       .filter((access: { ea: { isActive: boolean } }) => access.ea.isActive)
-      .map((access: { ea: Record<string, unknown>; expiresAt: Date | null }) => ({
+      .map((access: { ea: Record<string, unknown> & { eaCode: string }; expiresAt: Date | null }) => ({
         ...access.ea,
+        category: catalog[access.ea.eaCode]?.category ?? "basic",
         expiresAt: access.expiresAt,
       }))
 
@@ -204,7 +204,8 @@ export async function GET(request: NextRequest) {
 
         return NextResponse.json({
             success: true,
-            trades,
+            // ticket is a BigInt column, which JSON cannot serialize; MT tickets fit in a double
+            trades: trades.map((trade) => ({ ...trade, ticket: Number(trade.ticket) })),
             total,
             limit,
             offset,
@@ -0,0 +1,48 @@
+import { readFileSync } from "fs"
+import { join } from "path"
+
+// Generated by scripts/build_ea_catalog.py from the EA sources; rebuild it after changing an EA
+const CATALOG_PATH = join(process.cwd(), "mql", "catalog.json")
+const CATALOG_VERSION = 2
+
+export type EACategory = "basic" | "advanced" | "martingale" | "utility"
+export type EADialect = "mql4" | "mql5"
+
+export interface CatalogEA {
+  name: string
+  version: string | null
+  description: string | null
+  // NN_ prefix of the source file; null for templates and helper EAs that are not sold
+  number: number | null
+  category: EACategory | null
+  // Source paths relative to the repo root, e.g. mql/MQL5/Experts/01_MA_Crossover_EA.mq5
+  files: Partial<Record<EADialect, string>>
+}
+
+let catalog: Record<string, CatalogEA> | null = null
+
+export function getEaCatalog(): Record<string, CatalogEA> {
+  if (!catalog) {
+    const data = JSON.parse(readFileSync(CATALOG_PATH, "utf-8"))
+    if (data.catalogVersion !== CATALOG_VERSION) {
+      throw new Error(`Unsupported EA catalog version ${data.catalogVersion}, rebuild mql/catalog.json`)
+    }
+    catalog = data.eas as Record<string, CatalogEA>
+  }
+  return catalog
+}
+
+// EAs offered to customers, in product order
+export function getProductEas(): Array<CatalogEA & { eaCode: string }> {
+  return Object.entries(getEaCatalog())
+    .filter(([, ea]) => ea.number !== null)
+    .map(([eaCode, ea]) => ({ eaCode, ...ea }))
+    .sort((a, b) => (a.number ?? 0) - (b.number ?? 0))
+}
+
+// Path of the compiled .ex4/.ex5 for an EA, relative to the repo root
+export function getEaArtifactPath(eaCode: string, terminal: "MT4" | "MT5"): string | null {
+  const source = getEaCatalog()[eaCode]?.files[terminal === "MT4" ? "mql4" : "mql5"]
+  if (!source) return null
+  return source.replace(/\.mq([45])$/, ".ex$1")
+}